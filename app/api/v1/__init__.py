@@ -9,6 +9,10 @@ from .planning import router as planning_router
 from .notifications import router as notifications_router
 from .documents import router as documents_router
 from .filters import router as filters_router
+from .scheduler import router as scheduler_router
+from .reports import router as reports_router
+from .dashboard import router as dashboard_router
+from .search import router as search_router
 
 __all__ = [
     "auth_router",
@@ -19,5 +23,9 @@ __all__ = [
     "planning_router",
     "notifications_router",
     "documents_router",
-    "filters_router"
+    "filters_router",
+    "scheduler_router",
+    "reports_router",
+    "dashboard_router",
+    "search_router"
 ]
@@ -19,7 +19,7 @@ router = APIRouter(
     summary="Connexion utilisateur",
     description="Authentifie un utilisateur avec email + mot de passe. Retourne un token JWT si valide."
 )
-def login(
+async def login(
     email: str = Form(...),
     password: str = Form(...),
     db: Session = Depends(get_db)
@@ -30,7 +30,7 @@ def login(
     - Retourne un token JWT avec rôle embarqué.
     - Utilisé dans le header `Authorization: Bearer <token>`
     """
-    return authenticate_user(db, email, password)
+    return await authenticate_user(db, email, password)
 
 @router.post(
     "/login",
@@ -38,7 +38,7 @@ def login(
     summary="Connexion utilisateur (username/password)",
     description="Authentifie un utilisateur avec username + mot de passe. Retourne un token JWT si valide."
 )
-def login_username(
+async def login_username(
     username: str = Form(...),
     password: str = Form(...),
     db: Session = Depends(get_db)
@@ -46,7 +46,7 @@ def login_username(
     """
     Endpoint de login via username pour compatibilité avec certains tests.
     """
-    return authenticate_user_by_username(db, username, password)
+    return await authenticate_user_by_username(db, username, password)
 
 # ======= ROUTE /me (infos utilisateur courant via JWT) =========
 
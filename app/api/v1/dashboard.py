@@ -0,0 +1,70 @@
+# app/api/v1/dashboard.py
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import List, Optional, Union
+from app.db.database import get_db
+from app.db.dashboard_counters import rebuild_dashboard_counters
+from app.models.client import Client
+from app.schemas.dashboard import KPIAdmin, KPIResponsable, KPITechnicien, KPIClient, EquipementHealth
+from app.services.dashboard_service import get_kpi_for_user
+from app.services.equipement_health_service import get_fleet_health_page
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.rbac import get_current_user, admin_required, require_roles
+
+router = APIRouter(
+    prefix="/dashboard",
+    tags=["dashboard"],
+    responses={404: {"description": "Profil non trouvé"}}
+)
+
+
+@router.get(
+    "/kpi",
+    response_model=Union[KPIAdmin, KPIResponsable, KPITechnicien, KPIClient],
+    summary="KPI du tableau de bord",
+    description="Indicateurs adaptés au rôle de l'utilisateur (administrateur, responsable, "
+                "technicien ou client), lus dans les compteurs agrégés."
+)
+def get_kpi(db: Session = Depends(get_db), user=Depends(get_current_user)):
+    return get_kpi_for_user(db, user)
+
+
+@router.post(
+    "/kpi/rebuild",
+    summary="Recalculer les compteurs du tableau de bord",
+    description="Réconciliation complète des compteurs à partir des interventions (admin uniquement).",
+    dependencies=[Depends(admin_required)]
+)
+def rebuild_kpi(db: Session = Depends(get_db)):
+    return {"success": True, "compteurs": rebuild_dashboard_counters(db)}
+
+
+@router.get(
+    "/equipements/sante",
+    response_model=List[EquipementHealth],
+    summary="Santé du parc d'équipements",
+    description="Score de fiabilité, disponibilité et temps d'arrêt du mois, maintenance, pour tout le parc "
+                "(ou le parc d'un client), trié par score : les plus fragiles d'abord (ordre=desc pour l'inverse). "
+                "Pagination par curseur (en-tête X-Next-Cursor). Un client ne voit que son propre parc."
+)
+def get_fleet_health(
+    response: Response,
+    client_id: Optional[int] = Query(None, description="Restreindre au parc d'un client"),
+    ordre: str = Query("asc", pattern="^(asc|desc)$", description="Tri par score de fiabilité"),
+    limit: Optional[int] = Query(None, ge=1, description="Taille de page (plafonnée par PAGINATION_MAX_LIMIT)"),
+    cursor: Optional[str] = Query(None, description="Curseur renvoyé par la page précédente"),
+    db: Session = Depends(get_db),
+    user: dict = Depends(require_roles("admin", "responsable", "client")),
+):
+    if user.get("role") == "client":
+        client_id = db.execute(select(Client.id).where(Client.user_id == user.get("user_id"))).scalar()
+        if client_id is None:
+            raise HTTPException(status_code=404, detail="Profil client introuvable")
+    items, next_cursor = get_fleet_health_page(
+        db, client_id=client_id, limit=limit, cursor=cursor, descending=ordre == "desc"
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
@@ -1,13 +1,24 @@
 # app/api/v1/documents.py
 
-from fastapi import APIRouter, Depends, UploadFile, File, status
-from sqlalchemy.orm import Session
+import mimetypes
+from fastapi import APIRouter, Depends, UploadFile, File, Request, Response, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
 from app.models.document import Document
-from app.schemas.document import DocumentOut
-from app.services.document_service import create_document
-from app.core.rbac import technicien_required, responsable_required, admin_required
+from app.schemas.document import DocumentOut, DocumentBlobOut, DocumentFromHash, BlobGCResult
+from app.services.document_service import (
+    create_document,
+    create_document_from_hash,
+    get_blob_by_hash,
+    delete_document,
+    get_document_for_download,
+    get_derivative_for_download,
+    collect_orphan_blobs,
+)
+from app.core.rbac import get_current_user, technicien_required, responsable_required, admin_required
 
 router = APIRouter(
     prefix="/documents",
@@ -23,15 +34,16 @@ router = APIRouter(
     response_model=DocumentOut,
     status_code=status.HTTP_201_CREATED,
     summary="Uploader un document",
-    description="Upload d’un fichier lié à une intervention (photo, rapport, preuve, etc.).",
+    description="Upload d’un fichier lié à une intervention (photo, rapport, preuve, etc.). "
+                "Taille limitée à UPLOAD_MAX_BYTES (413 au-delà) ; le SHA-256 est calculé à la réception.",
     dependencies=[Depends(admin_required)]
 )
-def upload_document(
+async def upload_document(
     intervention_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return create_document(db, file, intervention_id)
+    return await create_document(db, file, intervention_id)
 
 # Alias attendu par certains tests: /documents/upload
 @router.post(
@@ -41,12 +53,107 @@ def upload_document(
     summary="Uploader un document (alias)",
     dependencies=[Depends(admin_required)]
 )
-def upload_document_alias(
+async def upload_document_alias(
     intervention_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return create_document(db, file, intervention_id)
+    return await create_document(db, file, intervention_id)
+
+@router.get(
+    "/blobs/{hash_sha256}",
+    response_model=DocumentBlobOut,
+    summary="Pré-contrôle d'upload par empreinte",
+    description="200 si un contenu de ce SHA-256 est déjà stocké (l'associer via /documents/from-hash), 404 sinon.",
+    dependencies=[Depends(admin_required)]
+)
+async def get_blob(hash_sha256: str, db: AsyncSession = Depends(get_async_db)):
+    return await get_blob_by_hash(db, hash_sha256)
+
+@router.post(
+    "/from-hash",
+    response_model=DocumentOut,
+    status_code=status.HTTP_201_CREATED,
+    summary="Associer un contenu déjà stocké",
+    description="Crée un document à partir d'un contenu existant, sans renvoyer le fichier.",
+    dependencies=[Depends(admin_required)]
+)
+async def attach_document_from_hash(data: DocumentFromHash, db: AsyncSession = Depends(get_async_db)):
+    return await create_document_from_hash(db, data)
+
+@router.post(
+    "/blobs/gc",
+    response_model=BlobGCResult,
+    summary="Purger les contenus sans référence",
+    dependencies=[Depends(admin_required)]
+)
+def gc_blobs(db: Session = Depends(get_db)):
+    return BlobGCResult(supprimes=collect_orphan_blobs(db))
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Comparaison faible (RFC 9110) : W/"x" équivaut à "x"
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+@router.get(
+    "/{document_id}/download",
+    summary="Télécharger un document",
+    description="Contenu du document si l'intervention est accessible à l'utilisateur. "
+                "Gère Range/If-Range (lecture partielle des vidéos) et If-None-Match "
+                "(ETag = SHA-256 du contenu, 304 si inchangé). Le fichier est envoyé par blocs.",
+    responses={206: {"description": "Contenu partiel"}, 304: {"description": "Non modifié"}},
+)
+async def download_document(
+    document_id: int,
+    request: Request,
+    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    document, path = await get_document_for_download(db, document_id, user)
+    headers = {"Cache-Control": "private, no-cache"}
+    if document.hash_sha256:
+        etag = f'"{document.hash_sha256}"'
+        headers["ETag"] = etag
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    media_type = mimetypes.guess_type(document.nom_fichier)[0] or "application/octet-stream"
+    # FileResponse : envoi par blocs, Range/If-Range, et zero-copy
+    # (http.response.pathsend) quand le serveur ASGI le propose
+    return FileResponse(path, media_type=media_type, filename=document.nom_fichier, headers=headers)
+
+@router.get(
+    "/{document_id}/derives/{taille}.{fmt}",
+    summary="Miniature ou aperçu d'une image",
+    description="Dérivé généré en tâche de fond (taille : thumbnail|preview, format : webp|jpeg). "
+                "404 tant qu'il n'est pas prêt. Mêmes droits que le téléchargement.",
+    responses={304: {"description": "Non modifié"}},
+)
+async def download_derivative(
+    document_id: int,
+    taille: str,
+    fmt: str,
+    request: Request,
+    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    document, path = await get_derivative_for_download(db, document_id, taille, fmt, user)
+    etag = f'"{document.hash_sha256}-{taille}-{fmt}"'
+    headers = {"Cache-Control": "private, no-cache", "ETag": etag}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FileResponse(path, media_type=f"image/{fmt}", headers=headers)
+
+@router.delete(
+    "/{document_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Supprimer un document",
+    dependencies=[Depends(admin_required)]
+)
+def remove_document(document_id: int, db: Session = Depends(get_db)):
+    delete_document(db, document_id)
 
 @router.get(
     "/",
@@ -56,7 +163,7 @@ def upload_document_alias(
     dependencies=[Depends(admin_required)]
 )
 def list_documents(db: Session = Depends(get_db)):
-    return db.query(Document).all()
+    return db.query(Document).options(selectinload(Document.blob)).all()
 
 # Endpoint attendu par tests: /documents/{intervention_id}
 @router.get(
@@ -66,4 +173,9 @@ def list_documents(db: Session = Depends(get_db)):
     dependencies=[Depends(admin_required)]
 )
 def list_documents_by_intervention(intervention_id: int, db: Session = Depends(get_db)):
-    return db.query(Document).filter(Document.intervention_id == intervention_id).all()
+    return (
+        db.query(Document)
+        .options(selectinload(Document.blob))
+        .filter(Document.intervention_id == intervention_id)
+        .all()
+    )
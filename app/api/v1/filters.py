@@ -1,11 +1,14 @@
 # app/api/v1/filters.py
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.db.database import get_db
-from app.models.intervention import Intervention, StatutIntervention, InterventionType
-from app.schemas.intervention import InterventionOut
+from app.core.pagination import NEXT_CURSOR_HEADER, TOTAL_ESTIMATE_HEADER
+from app.db.database import get_async_db
+from app.models.intervention import StatutIntervention, InterventionType, PrioriteIntervention
+from app.schemas.intervention import InterventionListOut, TriIntervention
+from app.services.intervention_search_service import search_interventions_async
 from app.core.rbac import get_current_user  # Authentification requise
 
 router = APIRouter(
@@ -15,32 +18,64 @@ router = APIRouter(
 )
 
 # Dépendance DB
-# utilise get_db central
+# utilise get_async_db central (lecture seule, handler async)
+
+
+def _utc_naif(valeur: Optional[datetime]) -> Optional[datetime]:
+    """Ramène une date avec fuseau (ex. ...Z, +02:00) en UTC naïf, comme les colonnes."""
+    if valeur is None or valeur.tzinfo is None:
+        return valeur
+    return valeur.astimezone(timezone.utc).replace(tzinfo=None)
+
 
 @router.get(
     "/interventions",
-    response_model=List[InterventionOut],
+    response_model=List[InterventionListOut],
     summary="Recherche filtrée d’interventions",
-    description="Recherche avancée sur les interventions par statut, urgence, type ou technicien."
+    description=(
+        "Recherche multicritère sur les interventions (statuts, priorités, type, urgence, "
+        "technicien, client, équipement, plages de dates, retard), triée puis paginée par "
+        "curseur. Le curseur de la page suivante est renvoyé dans l’en-tête X-Next-Cursor, "
+        "le nombre total estimé de résultats dans X-Total-Estimate."
+    )
 )
-def filter_interventions(
-    statut: Optional[StatutIntervention] = Query(None, description="Statut de l’intervention"),
+async def filter_interventions(
+    response: Response,
+    statut: Optional[List[StatutIntervention]] = Query(None, description="Statut(s) de l’intervention"),
+    priorite: Optional[List[PrioriteIntervention]] = Query(None, description="Priorité(s)"),
     urgence: Optional[bool] = Query(None, description="Filtrer par urgence (True/False)"),
     type: Optional[InterventionType] = Query(None, description="Type d’intervention"),
     technicien_id: Optional[int] = Query(None, description="ID du technicien affecté"),
-    db: Session = Depends(get_db),
+    client_id: Optional[int] = Query(None, description="ID du client"),
+    equipement_id: Optional[int] = Query(None, description="ID de l’équipement"),
+    date_creation_min: Optional[datetime] = Query(None, description="Créées à partir de cette date"),
+    date_creation_max: Optional[datetime] = Query(None, description="Créées jusqu’à cette date"),
+    date_limite_min: Optional[datetime] = Query(None, description="Échéance à partir de cette date"),
+    date_limite_max: Optional[datetime] = Query(None, description="Échéance jusqu’à cette date"),
+    en_retard: bool = Query(False, description="Seulement les interventions actives à l’échéance dépassée"),
+    tri: TriIntervention = Query(TriIntervention.date_creation_desc, description="Ordre des résultats"),
+    limit: Optional[int] = Query(None, ge=1, description="Taille de page (plafonnée par PAGINATION_MAX_LIMIT)"),
+    cursor: Optional[str] = Query(None, description="Curseur renvoyé par la page précédente"),
+    db: AsyncSession = Depends(get_async_db),
     user: dict = Depends(get_current_user)
 ):
-    query = db.query(Intervention)
-
-    if statut:
-        query = query.filter(Intervention.statut == statut)
-    if urgence is not None:
-        query = query.filter(Intervention.urgence == urgence)
-    if type:
-        # Attribut ORM est 'type_intervention' (colonne DB 'type')
-        query = query.filter(Intervention.type_intervention == type)
-    if technicien_id:
-        query = query.filter(Intervention.technicien_id == technicien_id)
-
-    return query.all()
+    filtres = {
+        "statut": statut,
+        "priorite": priorite,
+        "urgence": urgence,
+        "type": type,
+        "technicien_id": technicien_id,
+        "client_id": client_id,
+        "equipement_id": equipement_id,
+        "date_creation_min": _utc_naif(date_creation_min),
+        "date_creation_max": _utc_naif(date_creation_max),
+        "date_limite_min": _utc_naif(date_limite_min),
+        "date_limite_max": _utc_naif(date_limite_max),
+    }
+    interventions, next_cursor, total = await search_interventions_async(
+        db, filtres, tri=tri, en_retard=en_retard, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    response.headers[TOTAL_ESTIMATE_HEADER] = str(total)
+    return interventions
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.database import get_db
-from app.schemas.intervention import InterventionCreate, InterventionOut, StatutIntervention
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Optional
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.db.database import get_db, get_async_db
+from app.schemas.intervention import (
+    InterventionCreate, InterventionOut, InterventionListOut, StatutIntervention,
+    AffectationProposee, AffectationPropositionRequest, AffectationBulkRequest, AffectationItem
+)
 from app.services.intervention_service import (
     create_intervention,
-    get_intervention_by_id,
-    get_all_interventions,
+    get_intervention_by_id_async,
+    get_interventions_page_async,
+    stream_interventions_async,
     update_statut_intervention
 )
+from app.services.affectation_service import proposer_affectations, appliquer_affectations
 from app.core.rbac import get_current_user, technicien_required, responsable_required
 from app.services.user_service import ensure_user_for_email
 
@@ -42,14 +50,84 @@ def create_new_intervention(
             user_id = ensured.id
     return create_intervention(db, data, user_id=int(user_id))
 
+async def _ndjson_lines(interventions: AsyncIterator) -> AsyncIterator[str]:
+    # Une intervention sérialisée par ligne, au fil de la lecture du curseur
+    async for intervention in interventions:
+        yield InterventionListOut.model_validate(intervention).model_dump_json(by_alias=True) + "\n"
+
 @router.get(
     "/", 
-    response_model=List[InterventionOut],
+    response_model=List[InterventionListOut],
     summary="Lister les interventions",
-    description="Retourne toutes les interventions du système (authentification requise)"
+    description=(
+        "Retourne les interventions, les plus récentes d’abord, paginées par curseur "
+        "(authentification requise). Le curseur de la page suivante est renvoyé dans "
+        "l’en-tête X-Next-Cursor. Avec format=ndjson, toutes les interventions sont "
+        "envoyées en flux (une par ligne)."
+    )
+)
+async def list_interventions(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, description="Taille de page (plafonnée par PAGINATION_MAX_LIMIT)"),
+    cursor: Optional[str] = Query(None, description="Curseur renvoyé par la page précédente"),
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_async_db),
+    user: dict = Depends(get_current_user)
+):
+    if output_format == "ndjson":
+        return StreamingResponse(
+            _ndjson_lines(await stream_interventions_async(db, cursor)),
+            media_type="application/x-ndjson"
+        )
+    interventions, next_cursor = await get_interventions_page_async(db, limit=limit, cursor=cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return interventions
+
+@router.post(
+    "/affectations/propositions",
+    response_model=List[AffectationProposee],
+    summary="Proposer des affectations automatiques",
+    description="Classe les techniciens pour un lot d’interventions affectables, sans rien modifier. (admin, responsable uniquement)",
+    dependencies=[Depends(responsable_required)]
+)
+def propose_affectations(
+    data: AffectationPropositionRequest,
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user)
+):
+    return proposer_affectations(db, intervention_ids=data.intervention_ids, top_k=data.top_k)
+
+@router.post(
+    "/affectations",
+    response_model=List[InterventionListOut],
+    summary="Affecter des interventions en lot",
+    description=(
+        "Applique les affectations fournies, ou à défaut les affectations automatiques "
+        "calculées sur intervention_ids, en une seule transaction. (admin, responsable uniquement)"
+    ),
+    dependencies=[Depends(responsable_required)]
 )
-def list_interventions(db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
-    return get_all_interventions(db)
+def bulk_affectations(
+    data: AffectationBulkRequest,
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user)
+):
+    user_id = user.get("user_id")
+    if user_id is None:
+        email = user.get("email")
+        role = user.get("role")
+        if email:
+            ensured = ensure_user_for_email(db, email=email, role=role)
+            user_id = ensured.id
+    if data.affectations is not None:
+        return appliquer_affectations(db, data.affectations, user_id=int(user_id))
+    propositions = proposer_affectations(db, intervention_ids=data.intervention_ids, top_k=1)
+    affectations = [
+        AffectationItem(intervention_id=p.intervention_id, technicien_id=p.technicien_id)
+        for p in propositions if p.technicien_id is not None
+    ]
+    return appliquer_affectations(db, affectations, user_id=int(user_id), remarque="Affectation automatique")
 
 @router.get(
     "/{intervention_id}", 
@@ -57,8 +135,8 @@ def list_interventions(db: Session = Depends(get_db), user: dict = Depends(get_c
     summary="Détail d’une intervention",
     description="Récupère les détails d’une intervention par ID (authentification requise)"
 )
-def get_intervention(intervention_id: int, db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
-    return get_intervention_by_id(db, intervention_id)
+async def get_intervention(intervention_id: int, db: AsyncSession = Depends(get_async_db), user: dict = Depends(get_current_user)):
+    return await get_intervention_by_id_async(db, intervention_id)
 
 @router.patch(
     "/{intervention_id}/statut", 
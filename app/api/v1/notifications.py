@@ -1,9 +1,11 @@
 # app/api/v1/notifications.py
 
 from fastapi import APIRouter, Depends, status, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
 from app.schemas.notification import NotificationCreate, NotificationOut
 from app.services.notification_service import create_notification
 from app.models.notification import Notification
@@ -36,19 +38,20 @@ def create_new_notification(data: NotificationCreate, db: Session = Depends(get_
     description="Retourne toutes les notifications envoyées (admin/responsable uniquement).",
     dependencies=[Depends(admin_required)]
 )
-def list_notifications(
-    db: Session = Depends(get_db),
+async def list_notifications(
+    db: AsyncSession = Depends(get_async_db),
     user_id: Optional[int] = None,
     intervention_id: Optional[int] = None,
     limit: int = 50,
     offset: int = 0,
 ):
-    q = db.query(Notification)
+    q = select(Notification)
     if user_id is not None:
-        q = q.filter(Notification.user_id == user_id)
+        q = q.where(Notification.user_id == user_id)
     if intervention_id is not None:
-        q = q.filter(Notification.intervention_id == intervention_id)
-    return q.offset(offset).limit(min(limit, 200)).all()
+        q = q.where(Notification.intervention_id == intervention_id)
+    result = await db.execute(q.offset(offset).limit(min(limit, 200)))
+    return result.scalars().all()
 
 @router.get(
     "/user/{user_id}",
@@ -56,8 +59,9 @@ def list_notifications(
     summary="Lister les notifications d'un utilisateur",
     dependencies=[Depends(admin_required)]
 )
-def list_notifications_by_user(user_id: int, db: Session = Depends(get_db)):
-    return db.query(Notification).filter(Notification.user_id == user_id).all()
+async def list_notifications_by_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(Notification).where(Notification.user_id == user_id))
+    return result.scalars().all()
 
 @router.delete(
     "/{notification_id}",
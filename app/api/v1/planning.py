@@ -2,14 +2,15 @@
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
 from app.schemas.planning import PlanningCreate, PlanningOut
 from app.services.planning_service import (
     create_planning,
     get_planning_by_id,
-    get_all_plannings,
+    get_all_plannings_async,
     update_planning_dates
 )
 from app.core.rbac import responsable_required, get_current_user, require_roles
@@ -42,8 +43,8 @@ def create_new_planning(data: PlanningCreate, db: Session = Depends(get_db)):
     summary="Lister les plannings",
     description="Liste tous les plannings existants (lecture ouverte aux utilisateurs connectés)."
 )
-def list_all_plannings(db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
-    return get_all_plannings(db)
+async def list_all_plannings(db: AsyncSession = Depends(get_async_db), user: dict = Depends(get_current_user)):
+    return await get_all_plannings_async(db)
 
 @router.get(
     "/{planning_id}", 
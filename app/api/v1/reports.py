@@ -0,0 +1,70 @@
+# app/api/v1/reports.py
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.db.database import get_db
+from app.schemas.report import ReportCreate, ReportResponse, ReportStatusOut
+from app.services.report_service import create_report, get_report_or_404, get_report_for_download
+from app.tasks.report_tasks import enqueue_report
+from app.core.rbac import get_current_user, require_roles
+
+router = APIRouter(
+    prefix="/reports",
+    tags=["reports"],
+    responses={404: {"description": "Rapport non trouvé"}}
+)
+
+
+@router.post(
+    "/",
+    response_model=ReportResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Demander un rapport",
+    description="Enregistre la demande et lance la génération en tâche de fond "
+                "(CSV, Excel, PDF ou JSON). Suivre l'avancement avec GET /reports/{id}. "
+                "Une demande identique (mêmes filtres, données inchangées) réutilise le rapport existant.",
+)
+def request_report(
+    data: ReportCreate,
+    user: dict = Depends(require_roles("admin", "responsable")),
+    db: Session = Depends(get_db),
+):
+    try:
+        report, reused = create_report(db, data.request, user["user_id"])
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if reused:
+        return ReportResponse(
+            success=True, message="Rapport identique réutilisé", report_id=report.id, download_url=report.download_url
+        )
+    enqueue_report(report.id)
+    return ReportResponse(success=True, message="Génération du rapport planifiée", report_id=report.id)
+
+
+@router.get(
+    "/{report_id}",
+    response_model=ReportStatusOut,
+    summary="État d'un rapport",
+    description="Statut de génération, taille et durée, lien de téléchargement une fois prêt.",
+)
+def get_report_status(report_id: int, user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    return get_report_or_404(db, report_id, user)
+
+
+@router.get(
+    "/{report_id}/download",
+    summary="Télécharger un rapport",
+    description="Fichier généré (envoi par blocs). 409 tant que la génération n'est pas terminée, "
+                "410 si le rapport a expiré.",
+    responses={409: {"description": "Rapport non prêt"}, 410: {"description": "Rapport expiré"}},
+)
+def download_report(
+    report_id: int,
+    token: Optional[str] = None,
+    user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    report = get_report_for_download(db, report_id, user, token)
+    return FileResponse(report.file_path, media_type=report.mime_type, filename=report.file_name)
@@ -0,0 +1,45 @@
+# app/api/v1/scheduler.py
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import List
+from app.db.database import get_db
+from app.schemas.scheduler import ScheduledJobOut, JobRunOut
+from app.models.scheduler import ScheduledJob, JobRun
+from app.core.rbac import admin_required
+
+router = APIRouter(
+    prefix="/scheduler",
+    tags=["scheduler"],
+    responses={404: {"description": "Tâche planifiée non trouvée"}}
+)
+
+
+@router.get(
+    "/jobs",
+    response_model=List[ScheduledJobOut],
+    summary="Lister les tâches planifiées",
+    description="État partagé des tâches récurrentes et métriques d'exécution (admin uniquement).",
+    dependencies=[Depends(admin_required)]
+)
+def list_jobs(db: Session = Depends(get_db)):
+    return db.execute(select(ScheduledJob).order_by(ScheduledJob.name)).scalars().all()
+
+
+@router.get(
+    "/jobs/{name}/runs",
+    response_model=List[JobRunOut],
+    summary="Historique d'une tâche planifiée",
+    description="Dernières exécutions d'une tâche, les plus récentes d'abord (admin uniquement).",
+    dependencies=[Depends(admin_required)]
+)
+def list_job_runs(name: str, limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)):
+    if db.execute(select(ScheduledJob.id).where(ScheduledJob.name == name)).first() is None:
+        raise HTTPException(status_code=404, detail="Tâche planifiée non trouvée")
+    return db.execute(
+        select(JobRun)
+        .where(JobRun.job_name == name)
+        .order_by(JobRun.started_at.desc())
+        .limit(limit)
+    ).scalars().all()
@@ -0,0 +1,40 @@
+# app/api/v1/search.py
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.rbac import require_roles
+from app.db.database import get_db
+from app.schemas.search import SearchResult, SourceRecherche
+from app.services.search_service import search
+
+router = APIRouter(
+    prefix="/search",
+    tags=["recherche"],
+)
+
+
+@router.get(
+    "/",
+    response_model=List[SearchResult],
+    summary="Recherche plein texte",
+    description=(
+        "Recherche des mots dans les interventions (titre, description, rapport), les équipements "
+        "(nom, localisation) et les noms de documents. Résultats classés par pertinence, paginés par "
+        "curseur (en-tête X-Next-Cursor). (admin, responsable, technicien)"
+    ),
+    dependencies=[Depends(require_roles("admin", "responsable", "technicien"))]
+)
+def search_text(
+    response: Response,
+    q: str = Query(..., min_length=2, max_length=200, description="Mots recherchés, ex: compresseur fuite huile"),
+    type: Optional[List[SourceRecherche]] = Query(None, description="Limiter à certains types d'objets"),
+    limit: Optional[int] = Query(None, ge=1, description="Taille de page (plafonnée par PAGINATION_MAX_LIMIT)"),
+    cursor: Optional[str] = Query(None, description="Curseur renvoyé par la page précédente"),
+    db: Session = Depends(get_db),
+):
+    results, next_cursor = search(db, q, sources=type, limit=limit, cursor=cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return results
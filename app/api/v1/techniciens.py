@@ -1,12 +1,13 @@
 # app/api/v1/techniciens.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from typing import List
 from app.db.database import get_db           # <-- Important : importer get_db (pas redéfinir)
 from app.schemas.technicien import (
     TechnicienCreate, TechnicienOut,
-    CompetenceCreate, CompetenceOut
+    CompetenceCreate, CompetenceOut,
+    TechnicienStats
 )
 from app.services.technicien_service import (
     create_technicien,
@@ -15,6 +16,7 @@ from app.services.technicien_service import (
     create_competence,
     get_all_competences
 )
+from app.services.technicien_stats_service import compute_technicien_stats
 from app.core.rbac import responsable_required, get_current_user
 
 router = APIRouter(
@@ -44,6 +46,17 @@ def list_techniciens(
     """
     return get_all_techniciens(db)
 
+@router.get("/stats", response_model=List[TechnicienStats], summary="KPI des techniciens")
+def list_techniciens_stats(
+    periode_mois: int = Query(6, ge=1, le=36),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(responsable_required)
+):
+    """
+    KPI de tous les techniciens, calculés en lot (réservé aux responsables).
+    """
+    return list(compute_technicien_stats(db, periode_mois=periode_mois).values())
+
 @router.get("/{technicien_id}", response_model=TechnicienOut, summary="Détail d’un technicien")
 def get_technicien(
     technicien_id: int,
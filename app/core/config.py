@@ -12,6 +12,15 @@ class Settings(BaseSettings):
     SECRET_KEY: str = Field(default="insecure-test-secret-key")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60  # durée de validité JWT en minutes
+    AUTH_CACHE_MAXSIZE: int = Field(default=10000)  # entrées max par cache d'authentification
+    AUTH_TOKEN_CACHE_TTL: int = Field(default=300)  # secondes ; borné par l'expiration du JWT
+    AUTH_USER_STATUS_TTL: int = Field(default=30)  # secondes ; délai max de prise en compte d'une désactivation
+
+    # Hachage des mots de passe (bcrypt) hors des threads de requête
+    BCRYPT_ROUNDS: int = Field(default=12)  # coût courant ; les hash moins coûteux sont re-hachés au login
+    PASSWORD_HASH_WORKERS: int = Field(default=4)
+    PASSWORD_HASH_MAX_PENDING: int = Field(default=64)  # au-delà : 503 + Retry-After
+    PASSWORD_HASH_RETRY_AFTER: int = Field(default=2)  # secondes
 
     # Email SMTP
     SMTP_HOST: str = Field(default="localhost")
@@ -19,6 +28,40 @@ class Settings(BaseSettings):
     SMTP_USER: str = Field(default="user")
     SMTP_PASSWORD: str = Field(default="password")
     EMAILS_FROM_EMAIL: str = Field(default="no-reply@example.com")
+    SMTP_STARTTLS: bool = Field(default=True)
+    SMTP_USE_CREDENTIALS: bool = Field(default=True)
+    SMTP_TIMEOUT: int = Field(default=30)  # secondes, connexion et commandes SMTP
+
+    # Envoi des notifications email (outbox drainée par lots en tâche de fond)
+    NOTIFICATION_DISPATCHER_ENABLED: bool = Field(default=True)
+    NOTIFICATION_BATCH_SIZE: int = Field(default=100)  # notifications par lot (une transaction)
+    NOTIFICATION_DISPATCH_INTERVAL: int = Field(default=10)  # secondes entre deux passages à vide
+    NOTIFICATION_MAX_ATTEMPTS: int = Field(default=5)  # au-delà : statut echec
+    NOTIFICATION_RETRY_BASE_SECONDS: int = Field(default=30)  # backoff exponentiel : base x 2^(tentative-1)
+
+    # Templates Jinja (emails) : environnement partagé, précompilé au démarrage
+    TEMPLATES_DIRECTORY: str = Field(default="app/templates")
+    TEMPLATE_BYTECODE_CACHE_DIR: str = Field(default="")  # répertoire privé (0700) ; vide = choisi par Jinja, par utilisateur
+    TEMPLATE_AUTO_RELOAD: bool = Field(default=False)  # True en dev : relit les templates modifiés
+
+    # Compte technique auteur des actions automatiques (historique des interventions générées)
+    SYSTEM_USER_EMAIL: str = Field(default="system@erp.local")
+    SYSTEM_USERNAME: str = Field(default="system")
+
+    # Génération des interventions préventives depuis les plannings
+    PLANNING_BATCH_SIZE: int = Field(default=500)  # plannings traités par transaction
+    PLANNING_GENERATION_INTERVAL_MINUTES: int = Field(default=60)
+
+    # Planificateur distribué (état en base, un leader élu par bail)
+    SCHEDULER_ENABLED: bool = Field(default=True)
+    SCHEDULER_TICK_SECONDS: int = Field(default=5)  # période de renouvellement du bail et de scrutation
+    SCHEDULER_LEASE_SECONDS: int = Field(default=30)  # bail non renouvelé : un autre worker reprend
+    SCHEDULER_MAX_WORKERS: int = Field(default=4)  # tâches exécutées en parallèle par le leader
+    SCHEDULER_JOB_RUN_RETENTION_DAYS: int = Field(default=30)  # historique job_runs conservé
+    SCHEDULER_JOB_RUN_PURGE_CRON: str = Field(default="30 3 * * *")
+    REPORT_SCHEDULE_POLL_SECONDS: int = Field(default=60)
+    DOCUMENT_BLOB_GC_INTERVAL_SECONDS: int = Field(default=3600)
+    DOCUMENT_DERIVATIVE_REQUEUE_INTERVAL_SECONDS: int = Field(default=600)
 
     # Base de données PostgreSQL
     POSTGRES_DB: str = Field(default="app")
@@ -27,8 +70,53 @@ class Settings(BaseSettings):
     POSTGRES_SERVER: str = "db"
     POSTGRES_PORT: str = "5432"
 
+    # Pool de connexions (par processus : total = workers uvicorn x (taille + débordement))
+    DB_POOL_SIZE: int = Field(default=10)
+    DB_MAX_OVERFLOW: int = Field(default=20)
+    DB_POOL_TIMEOUT: int = Field(default=30)  # secondes d'attente max d'une connexion libre
+    DB_POOL_RECYCLE: int = Field(default=1800)  # secondes ; -1 désactive le recyclage
+    DB_POOL_PRE_PING: bool = Field(default=True)
+    DB_STATEMENT_TIMEOUT_MS: int = Field(default=0)  # statement_timeout PostgreSQL ; 0 = aucun
+
     # Répertoire d’upload de fichiers
     UPLOAD_DIRECTORY: str = Field(default="app/static/uploads")
+    UPLOAD_MAX_BYTES: int = Field(default=500 * 1024 * 1024)  # au-delà : 413
+    UPLOAD_CHUNK_SIZE: int = Field(default=1024 * 1024)  # octets lus/écrits par itération
+    DOCUMENT_BLOB_GC_GRACE_SECONDS: int = Field(default=3600)  # délai avant suppression d'un contenu sans référence
+    # Miniatures/aperçus des images (pool de processus, hors workers HTTP)
+    DOCUMENT_DERIVATIVES_ENABLED: bool = Field(default=True)
+    DOCUMENT_DERIVATIVE_WORKERS: int = Field(default=2)  # processus Pillow
+    DOCUMENT_THUMBNAIL_SIZE: int = Field(default=256)  # côté max en pixels
+    DOCUMENT_PREVIEW_SIZE: int = Field(default=1280)
+    DOCUMENT_DERIVATIVE_QUALITY: int = Field(default=80)  # qualité WebP/JPEG
+    DOCUMENT_DERIVATIVE_TIMEOUT_SECONDS: int = Field(default=900)  # en attente au-delà : remis en file
+
+    # Pagination (keyset) et streaming des listes volumineuses
+    PAGINATION_DEFAULT_LIMIT: int = Field(default=50)
+    PAGINATION_MAX_LIMIT: int = Field(default=500)
+    STREAM_YIELD_PER: int = Field(default=500)  # lignes chargées par lot en mode NDJSON
+    SEARCH_COUNT_CAP: int = Field(default=10000)  # comptage borné du total estimé (hors PostgreSQL)
+
+    # Génération des rapports (pool de threads, lecture en flux via curseur serveur)
+    REPORTS_DIRECTORY: str = Field(default="app/static/reports")
+    REPORT_WORKERS: int = Field(default=2)  # générations simultanées par processus
+    REPORT_YIELD_PER: int = Field(default=2000)  # lignes lues par lot
+    REPORT_RETENTION_DAYS: int = Field(default=7)  # date_expiration des fichiers générés
+    REPORT_CSV_DELIMITER: str = Field(default=";")  # séparateur attendu par Excel en français
+    REPORT_PDF_MAX_ROWS: int = Field(default=50000)  # au-delà : export CSV/Excel conseillé
+    REPORT_GENERATION_POLL_SECONDS: int = Field(default=30)  # reprise des rapports en attente
+    REPORT_GENERATION_TIMEOUT_SECONDS: int = Field(default=1800)  # au-delà : demande considérée bloquée, remise en attente
+    REPORT_CACHE_ENABLED: bool = Field(default=True)  # réutilisation d'un rapport identique encore valide
+    REPORT_STORAGE_MAX_MB: int = Field(default=2048)  # au-delà : suppression des moins récemment téléchargés
+    REPORT_MAINTENANCE_INTERVAL_SECONDS: int = Field(default=3600)  # purge des expirés et plafond de stockage
+    TABLE_VERSION_COMPACT_INTERVAL_SECONDS: int = Field(default=300)  # report des incréments de version dans les compteurs
+
+    # Tableau de bord (compteurs maintenus à chaque écriture, réconciliés chaque nuit)
+    DASHBOARD_CAPACITE_TECHNICIEN: int = Field(default=5)  # interventions actives pour une charge de 100 %
+    DASHBOARD_RECONCILE_CRON: str = Field(default="30 3 * * *")  # recalcul complet des compteurs
+
+    # Recherche plein texte (index maintenu à chaque écriture ORM, reconstruit chaque nuit)
+    SEARCH_REINDEX_CRON: str = Field(default="0 4 * * *")  # reconstruction complète de l'index
 
     # Pydantic v2 settings configuration
     model_config = SettingsConfigDict(
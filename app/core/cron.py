@@ -0,0 +1,201 @@
+# app/core/cron.py
+
+"""
+Évaluation des expressions cron (5 champs, sémantique crontab standard).
+
+Une expression est analysée et compilée une seule fois (cache LRU) en
+ensembles triés de valeurs autorisées ; le calcul de la prochaine échéance
+avance ensuite champ par champ (mois, jour, heure, minute) au lieu de
+tester chaque minute.
+
+Sémantique :
+- minute heure jour-du-mois mois jour-de-semaine ; listes, plages, pas (*/15,
+  1-5/2), noms (jan, mon), macros (@daily, @weekly...)
+- jour de semaine : 0 ou 7 = dimanche
+- si jour-du-mois ET jour-de-semaine sont restreints, l'un OU l'autre suffit
+- les échéances sont évaluées en heure locale du fuseau : une heure qui
+  n'existe pas (passage à l'heure d'été) est décalée après le saut, une
+  heure ambiguë (retour à l'heure d'hiver) ne déclenche qu'une fois
+"""
+
+import calendar
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Au-delà, l'expression ne peut jamais se déclencher (ex : 30 février)
+MAX_YEARS_AHEAD = 5
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+MONTH_NAMES = {name: i for i, name in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)}
+DAY_NAMES = {name: i for i, name in enumerate(("sun", "mon", "tue", "wed", "thu", "fri", "sat"))}
+
+
+class CronError(ValueError):
+    """Expression cron ou fuseau horaire invalide."""
+
+
+def _parse_value(token: str, names: dict, field: str) -> int:
+    token = token.lower()
+    if token in names:
+        return names[token]
+    if not token.isdigit():
+        raise CronError(f"Valeur invalide pour {field} : '{token}'")
+    return int(token)
+
+
+def _parse_field(spec: str, low: int, high: int, field: str, names: dict = None) -> Tuple[Tuple[int, ...], bool]:
+    """
+    Returns:
+        (valeurs autorisées triées, champ restreint) ; un champ '*' n'est pas restreint
+    """
+    names = names or {}
+    values = set()
+    restricted = False
+    for part in spec.split(","):
+        if not part:
+            raise CronError(f"Liste vide dans {field}")
+        base, _, step_s = part.partition("/")
+        step = 1
+        if step_s:
+            if not step_s.isdigit() or int(step_s) == 0:
+                raise CronError(f"Pas invalide pour {field} : '{part}'")
+            step = int(step_s)
+        if base in ("*", "?"):
+            # Comme Vixie cron, "*/n" n'est pas une restriction (règle jour OU)
+            start, end = low, high
+        else:
+            restricted = True
+            if "-" in base:
+                start_s, _, end_s = base.partition("-")
+                start, end = _parse_value(start_s, names, field), _parse_value(end_s, names, field)
+            else:
+                start = _parse_value(base, names, field)
+                # "5/15" : de 5 jusqu'à la fin de la plage
+                end = high if step_s else start
+        if not (low <= start <= high and low <= end <= high) or start > end:
+            raise CronError(f"Hors limites pour {field} ({low}-{high}) : '{part}'")
+        values.update(range(start, end + 1, step))
+    return tuple(sorted(values)), restricted
+
+
+class CronExpression:
+    """Expression cron compilée ; immuable, partagée via `compile_cron`."""
+
+    __slots__ = ("expression", "minutes", "hours", "days", "months", "weekdays", "_dom_restricted", "_dow_restricted")
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        spec = MACROS.get(expression.strip().lower(), expression)
+        fields = spec.split()
+        if len(fields) != 5:
+            raise CronError(f"5 champs attendus, {len(fields)} reçus : '{expression}'")
+        self.minutes, _ = _parse_field(fields[0], 0, 59, "minute")
+        self.hours, _ = _parse_field(fields[1], 0, 23, "heure")
+        self.days, self._dom_restricted = _parse_field(fields[2], 1, 31, "jour du mois")
+        self.months, _ = _parse_field(fields[3], 1, 12, "mois", MONTH_NAMES)
+        weekdays, self._dow_restricted = _parse_field(fields[4], 0, 7, "jour de semaine", DAY_NAMES)
+        # 7 = dimanche ; stockage au format datetime.weekday() (lundi = 0)
+        self.weekdays = frozenset((d - 1) % 7 for d in weekdays)
+
+    def __repr__(self) -> str:
+        return f"<CronExpression('{self.expression}')>"
+
+    def _day_matches(self, year: int, month: int, day: int) -> bool:
+        dom = day in self.days
+        dow = calendar.weekday(year, month, day) in self.weekdays
+        if self._dom_restricted and self._dow_restricted:
+            return dom or dow
+        return dom and dow
+
+    def _next_local(self, start: datetime) -> Optional[datetime]:
+        """Premier instant (heure locale naïve) >= start correspondant à l'expression."""
+        year, month, day, hour, minute = start.year, start.month, start.day, start.hour, start.minute
+        limit = start.year + MAX_YEARS_AHEAD
+        while year <= limit:
+            if month not in self.months:
+                i = bisect_left(self.months, month)
+                if i == len(self.months):
+                    year, month = year + 1, self.months[0]
+                else:
+                    month = self.months[i]
+                day, hour, minute = 1, 0, 0
+                continue
+            if day > calendar.monthrange(year, month)[1]:
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+                day, hour, minute = 1, 0, 0
+                continue
+            if not self._day_matches(year, month, day):
+                day, hour, minute = day + 1, 0, 0
+                continue
+            i = bisect_left(self.hours, hour)
+            if i == len(self.hours):
+                day, hour, minute = day + 1, 0, 0
+                continue
+            if self.hours[i] != hour:
+                hour, minute = self.hours[i], 0
+            i = bisect_left(self.minutes, minute)
+            if i == len(self.minutes):
+                hour, minute = hour + 1, 0
+                if hour > 23:
+                    day, hour = day + 1, 0
+                continue
+            return datetime(year, month, day, hour, self.minutes[i])
+        return None
+
+    def next_after(self, after: datetime, tz: str = "UTC") -> Optional[datetime]:
+        """
+        Prochaine échéance strictement après `after` (UTC naïf), évaluée dans
+        le fuseau `tz`. Retourne un UTC naïf, ou None si l'expression ne se
+        déclenche jamais.
+        """
+        zone = get_zone(tz)
+        after_utc = after.replace(tzinfo=dt_timezone.utc)
+        local = after_utc.astimezone(zone).replace(tzinfo=None, second=0, microsecond=0)
+        candidate = local + timedelta(minutes=1)
+        while True:
+            candidate = self._next_local(candidate)
+            if candidate is None:
+                return None
+            # fold=0 : première occurrence d'une heure ambiguë ; une heure
+            # inexistante est convertie avec le décalage d'avant le saut
+            result = candidate.replace(tzinfo=zone).astimezone(dt_timezone.utc)
+            if result > after_utc:
+                return result.replace(tzinfo=None)
+            candidate += timedelta(minutes=1)
+
+
+@lru_cache(maxsize=1024)
+def compile_cron(expression: str) -> CronExpression:
+    """
+    Analyse et compile une expression (mise en cache).
+
+    Raises:
+        CronError: expression invalide
+    """
+    return CronExpression(expression)
+
+
+@lru_cache(maxsize=128)
+def get_zone(name: Optional[str]) -> ZoneInfo:
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise CronError(f"Fuseau horaire inconnu : '{name}'") from exc
+
+
+def next_run(expression: str, tz: Optional[str], after: datetime) -> Optional[datetime]:
+    """Raccourci : prochaine échéance (UTC naïf) d'une expression dans un fuseau."""
+    return compile_cron(expression).next_after(after, tz or "UTC")
@@ -0,0 +1,67 @@
+# app/core/pagination.py
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, status
+from app.core.config import settings
+
+# En-tête HTTP portant le curseur de la page suivante (absent sur la dernière page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# En-tête HTTP portant le nombre total estimé de résultats d'une recherche
+TOTAL_ESTIMATE_HEADER = "X-Total-Estimate"
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """
+    Ramène la taille de page demandée dans [1, PAGINATION_MAX_LIMIT].
+    """
+    if limit is None:
+        limit = settings.PAGINATION_DEFAULT_LIMIT
+    return max(1, min(int(limit), settings.PAGINATION_MAX_LIMIT))
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _deserialize(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encode la clé de tri de la dernière ligne d'une page en jeton opaque.
+
+    Le jeton est du JSON encodé en base64 url-safe : le client ne doit
+    jamais l'interpréter, seulement le renvoyer tel quel.
+    """
+    raw = json.dumps([_serialize(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Décode un jeton produit par `encode_cursor`.
+
+    Raises:
+        HTTPException 400: jeton illisible ou de forme inattendue
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("taille de clé inattendue")
+        return [_deserialize(v) for v in values]
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide"
+        )
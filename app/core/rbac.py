@@ -4,9 +4,14 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from app.core.config import settings
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
 from app.db.database import get_db
 from types import SimpleNamespace
+import hashlib
+import time
+from typing import Optional
 
 # OAuth2 JWT
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
@@ -23,12 +28,31 @@ def decode_token(token: str) -> dict:
             detail="Token invalide ou expiré"
         )
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
+# Caches d'authentification (par processus) :
+# - principal décodé, indexé par empreinte SHA-256 du token (jamais le token en clair)
+# - statut actif par utilisateur, invalidé par deactivate_user/reactivate_user
+_principal_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAXSIZE, ttl=settings.AUTH_TOKEN_CACHE_TTL)
+_user_status_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAXSIZE, ttl=settings.AUTH_USER_STATUS_TTL)
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def invalidate_user_status(user_id: int) -> None:
     """
-    Récupère l'utilisateur courant à partir du JWT.
+    Oublie le statut actif mis en cache pour un utilisateur (processus courant).
+    """
+    _user_status_cache.pop(int(user_id))
+
+def clear_auth_caches() -> None:
+    """
+    Vide les caches d'authentification (tests, rotation de SECRET_KEY).
+    """
+    _principal_cache.clear()
+    _user_status_cache.clear()
+
+def _resolve_principal(token: str, db: Session) -> dict:
+    """
+    Décode le JWT et résout l'utilisateur en base.
 
     Compatibilité tests: accepte les tokens avec 'user_id' OU 'sub' (email ou id),
     et ne dépend pas strictement de la présence d'un utilisateur en base.
@@ -64,15 +88,20 @@ def get_current_user(
                 user_obj = None
 
     if user_obj is not None:
-        if not getattr(user_obj, "is_active", True):
-            raise HTTPException(status_code=403, detail="Utilisateur désactivé")
+        _user_status_cache.set(user_obj.id, bool(getattr(user_obj, "is_active", True)))
         # Normalise en dict pour compatibilité des routeurs existants
-        return {
+        principal = {
             "user_id": getattr(user_obj, "id", None),
             "email": getattr(user_obj, "email", None),
             "role": getattr(user_obj, "role", role),
             "is_active": True,
         }
+        # Seuls les principaux adossés à un utilisateur réel sont mis en cache
+        # (un fallback pourrait être résolu plus tard, cf. ensure_user_for_email)
+        exp = payload.get("exp")
+        ttl = exp - time.time() if exp is not None else None
+        _principal_cache.set(_token_key(token), principal, ttl=ttl)
+        return principal
 
     # Fallback: retourne un objet léger suffisant pour RBAC
     # Fournit .role, .is_active, .id (si déductible), .email (si présent)
@@ -90,8 +119,48 @@ def get_current_user(
         "email": sub if isinstance(sub, str) else None,
         "role": role,
         "is_active": True,
+        "_fallback": True,
     }
 
+def _is_user_active(db: Session, user_id: int) -> Optional[bool]:
+    """
+    Statut actif de l'utilisateur ; None s'il n'existe plus (non mis en
+    cache : une suppression n'est jamais confondue avec un compte actif).
+    """
+    active = _user_status_cache.get(user_id)
+    if active is None:
+        from app.models.user import User  # Import local pour éviter les cycles
+        value = db.execute(select(User.is_active).where(User.id == user_id)).scalar_one_or_none()
+        if value is None:
+            return None
+        active = value is True
+        _user_status_cache.set(user_id, active)
+    return active
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """
+    Récupère l'utilisateur courant à partir du JWT.
+
+    Chemin rapide : principal et statut actif servis par les caches, sans
+    vérification HMAC ni requête SQL. Une désactivation est prise en compte
+    immédiatement dans le processus qui l'exécute, sous AUTH_USER_STATUS_TTL
+    secondes dans les autres.
+    """
+    principal = _principal_cache.get(_token_key(token))
+    if principal is None:
+        principal = _resolve_principal(token, db)
+    if principal.pop("_fallback", False):
+        return principal
+    active = _is_user_active(db, principal["user_id"])
+    if active is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Utilisateur introuvable")
+    if not active:
+        raise HTTPException(status_code=403, detail="Utilisateur désactivé")
+    return dict(principal)
+
 def require_roles(*roles: str):
     """
     Fabrique une dépendance FastAPI pour n'autoriser que certains rôles.
@@ -1,14 +1,34 @@
 # app/core/security.py
 
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from threading import Lock
+from typing import Optional, Tuple
+import asyncio
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import settings
 
 # Configuration du hash de mot de passe
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min_rounds = coût courant : un hash plus faible est signalé "à mettre à jour"
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# Pool dédié au hachage : bcrypt libère le GIL, des threads suffisent et
+# laissent le threadpool AnyIO aux autres routes. La file est bornée pour
+# refuser vite (503) plutôt que d'accumuler la latence lors des pics de login.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_hash_pending = 0
+_hash_lock = Lock()
 
 # Configuration du schéma Bearer pour JWT
 security = HTTPBearer()
@@ -21,6 +41,47 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Vérifie si le mot de passe correspond au hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+async def _run_in_hash_pool(fn, *args):
+    """
+    Exécute `fn` dans le pool de hachage.
+
+    Raises:
+        HTTPException 503: trop de hachages en attente (avec Retry-After)
+    """
+    global _hash_pending
+    with _hash_lock:
+        if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Service d'authentification saturé, réessayez plus tard",
+                headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)},
+            )
+        _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, fn, *args)
+    finally:
+        with _hash_lock:
+            _hash_pending -= 1
+
+async def get_password_hash_async(password: str) -> str:
+    """Version asynchrone de get_password_hash (pool de hachage)."""
+    return await _run_in_hash_pool(pwd_context.hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Version asynchrone de verify_password (pool de hachage)."""
+    return await _run_in_hash_pool(pwd_context.verify, plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Vérifie le mot de passe et, si le hash utilise des paramètres dépréciés
+    (coût < BCRYPT_ROUNDS), retourne aussi le nouveau hash à enregistrer.
+
+    Returns:
+        (valide, nouveau_hash ou None)
+    """
+    return await _run_in_hash_pool(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     """Crée un token JWT d'accès avec expiration"""
     to_encode = data.copy()
@@ -0,0 +1,105 @@
+# app/core/template_registry.py
+
+"""
+Registre unique des templates Jinja (emails de notification).
+
+Un seul Environment pour toute l'application : les templates compilés
+restent en mémoire, le bytecode est persisté sur disque (démarrages
+suivants sans recompilation) et le rendu HTML est auto-échappé.
+
+Le bytecode est du code exécuté tel quel : son répertoire doit être privé
+(créé en 0700, propriétaire vérifié). Sans TEMPLATE_BYTECODE_CACHE_DIR,
+Jinja choisit et contrôle lui-même un répertoire temporaire par utilisateur.
+"""
+
+import os
+import stat
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
+
+from app.core.config import settings
+
+# Templates précompilés au démarrage
+NOTIFICATION_TEMPLATE_PREFIX = "notification_"
+
+_environment: Optional[Environment] = None
+_environment_lock = Lock()
+
+
+def _bytecode_cache() -> FileSystemBytecodeCache:
+    """
+    Raises:
+        RuntimeError: TEMPLATE_BYTECODE_CACHE_DIR appartient à un autre
+            utilisateur ou est accessible au groupe/aux autres
+    """
+    directory = settings.TEMPLATE_BYTECODE_CACHE_DIR
+    if not directory:
+        return FileSystemBytecodeCache()
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or (hasattr(os, "getuid") and info.st_uid != os.getuid()):
+        raise RuntimeError(f"Cache de bytecode Jinja non sûr (propriétaire) : {directory}")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        raise RuntimeError(f"Cache de bytecode Jinja non sûr (droits {oct(stat.S_IMODE(info.st_mode))}) : {directory}")
+    return FileSystemBytecodeCache(directory)
+
+
+def get_environment() -> Environment:
+    """Environment partagé, créé au premier appel."""
+    global _environment
+    if _environment is None:
+        with _environment_lock:
+            if _environment is None:
+                _environment = Environment(
+                    loader=FileSystemLoader(settings.TEMPLATES_DIRECTORY),
+                    autoescape=select_autoescape(["html", "htm", "xml"]),
+                    bytecode_cache=_bytecode_cache(),
+                    # Sans rechargement, un template chargé n'est plus relu (pas de stat par rendu)
+                    auto_reload=settings.TEMPLATE_AUTO_RELOAD,
+                )
+    return _environment
+
+
+def get_template(name: str) -> Template:
+    """
+    Raises:
+        TemplateNotFound: template absent de TEMPLATES_DIRECTORY
+    """
+    return get_environment().get_template(name)
+
+
+def precompile_templates(prefix: str = NOTIFICATION_TEMPLATE_PREFIX) -> List[str]:
+    """
+    Compile et met en cache tous les templates `<prefix>*.html` (appelé au
+    démarrage) : une erreur de syntaxe échoue au lancement, pas au premier envoi.
+
+    Returns:
+        Noms des templates chargés
+    """
+    env = get_environment()
+    names = env.list_templates(filter_func=lambda n: n.startswith(prefix) and n.endswith(".html"))
+    for name in names:
+        env.get_template(name)
+    return names
+
+
+def render(name: str, **context: Any) -> str:
+    return get_template(name).render(**context)
+
+
+def render_many(name: str, contexts: Iterable[Dict[str, Any]]) -> List[str]:
+    """
+    Rend un même template pour plusieurs contextes (envois groupés, digests) :
+    le template n'est résolu qu'une fois.
+    """
+    template = get_template(name)
+    return [template.render(**context) for context in contexts]
+
+
+def reset_environment() -> None:
+    """Oublie l'Environment courant (changement de configuration, tests)."""
+    global _environment
+    with _environment_lock:
+        _environment = None
@@ -0,0 +1,115 @@
+# app/db/change_tracking.py
+
+"""
+Suivi des versions des tables sources des rapports.
+
+Chaque flush ORM et chaque INSERT/UPDATE/DELETE exécuté via une Session sur
+une table suivie note la table dans la session ; au commit, une ligne par
+table notée est insérée dans table_version_increments, dans la transaction
+de la modification (annulée avec elle). Ces insertions ne verrouillent
+aucune ligne partagée : les écrivains d'une même table ne s'attendent pas.
+
+La version d'une table est son compteur de base (table_versions) plus le
+nombre d'incréments visibles, lus dans une seule requête. Chaque commit
+visible l'augmente de un, quel que soit l'ordre d'attribution des
+identifiants : toute écriture change la version, ce qui invalide les
+rapports mis en cache sur ces données. `compact_table_versions` reporte
+périodiquement les incréments dans le compteur de base, sans changer la
+somme.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, Set
+
+from sqlalchemy import delete, event, func, insert, select, union_all
+from sqlalchemy.orm import Session
+
+from app.db.database import insert_or_increment
+from app.models.table_version import TableVersion, TableVersionIncrement
+
+# Tables lues par les rapports (cf. report_service.get_dataset)
+TRACKED_TABLES = frozenset({"interventions", "equipements", "techniciens", "users", "clients", "plannings"})
+
+_PENDING = "_table_versions_pending"
+
+
+def _record(session: Session, tables: Set[str]) -> None:
+    tables = tables & TRACKED_TABLES
+    if tables:
+        session.info.setdefault(_PENDING, set()).update(tables)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    modified = (obj for obj in session.dirty if session.is_modified(obj))
+    tables = {
+        obj.__table__.name
+        for obj in (*session.new, *session.deleted, *modified)
+        if hasattr(obj, "__table__")
+    }
+    _record(session, tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(orm_execute_state) -> None:
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    name = getattr(table, "name", None)
+    if name:
+        _record(orm_execute_state.session, {name})
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session: Session) -> None:
+    # Flush des écritures en attente d'abord : elles notent leurs tables
+    session.flush()
+    tables = session.info.pop(_PENDING, None)
+    if not tables:
+        return
+    session.connection().execute(
+        insert(TableVersionIncrement.__table__), [{"table_name": name} for name in sorted(tables)]
+    )
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _after_transaction_end(session: Session, transaction) -> None:
+    # Transaction racine terminée (annulée) : les tables notées ne seront pas commitées
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+
+def data_versions(db: Session, tables: Iterable[str]) -> Dict[str, int]:
+    """Version courante (0 si jamais modifiée) de chaque table."""
+    tables = sorted(set(tables))
+    # Base et incréments dans la même requête : cohérents face à un compactage concurrent
+    parts = union_all(
+        select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(tables)),
+        select(TableVersionIncrement.table_name, func.count().label("version"))
+        .where(TableVersionIncrement.table_name.in_(tables))
+        .group_by(TableVersionIncrement.table_name),
+    ).subquery()
+    rows = db.execute(select(parts.c.table_name, func.sum(parts.c.version)).group_by(parts.c.table_name)).all()
+    versions = dict.fromkeys(tables, 0)
+    versions.update({name: int(version) for name, version in rows})
+    return versions
+
+
+def compact_table_versions(db: Session) -> int:
+    """
+    Tâche planifiée : reporte les incréments dans table_versions. Les lignes
+    supprimées (RETURNING) sont exactement celles comptées, dans la même
+    transaction : les versions lues ne changent pas.
+
+    Returns:
+        Nombre d'incréments compactés
+    """
+    table = TableVersionIncrement.__table__
+    counts = Counter(db.execute(delete(table).returning(table.c.table_name)).scalars())
+    if counts:
+        db.execute(
+            insert_or_increment(db, TableVersion.__table__, ["table_name"], ["version"]),
+            [{"table_name": name, "version": count} for name, count in sorted(counts.items())],
+        )
+    db.commit()
+    return sum(counts.values())
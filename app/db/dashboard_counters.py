@@ -0,0 +1,196 @@
+# app/db/dashboard_counters.py
+
+"""
+Maintenance incrémentale des compteurs du tableau de bord.
+
+Chaque intervention contribue +1 à un ensemble de clés (portée, métrique,
+période) déduit de son état : statut courant, mois de création, mois de
+clôture, heure d'échéance tant qu'elle est active ; pour la portée globale,
+son technicien et son client. À chaque flush, la différence entre l'ancien
+et le nouvel état de chaque intervention modifiée est appliquée par un
+upsert additif unique, dans la transaction de la modification.
+
+Les écritures hors ORM (insertions en masse, cascades SQL) ne passent pas
+par ces écouteurs : elles appellent `record_interventions`, ou sont
+rattrapées par `rebuild_dashboard_counters` (tâche planifiée de
+réconciliation et endpoint d'administration).
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, inspect, select, text
+from sqlalchemy.orm import Session
+
+from app.db.database import insert_or_increment
+from app.models.dashboard import DashboardCounter
+from app.models.intervention import Intervention, StatutIntervention
+
+SCOPE_GLOBAL = "global"
+SCOPE_TECHNICIEN = "technicien"
+SCOPE_CLIENT = "client"
+
+METRIC_CREEES = "creees"
+METRIC_CLOTUREES = "cloturees"
+METRIC_ECHEANCE = "echeance"
+
+STATUTS_ACTIFS = frozenset({
+    StatutIntervention.ouverte,
+    StatutIntervention.affectee,
+    StatutIntervention.en_cours,
+    StatutIntervention.en_attente,
+})
+STATUTS_TERMINES = frozenset({StatutIntervention.cloturee, StatutIntervention.archivee})
+
+# Colonnes dont dépendent les compteurs
+FIELDS = ("statut", "technicien_id", "client_id", "date_creation", "date_cloture", "date_limite")
+
+Key = Tuple[str, int, str, str]
+
+_OLD_STATES = "_dashboard_old_states"
+
+
+def statut_metric(statut: StatutIntervention) -> str:
+    return f"statut:{statut.value}"
+
+
+def mois(value: datetime) -> str:
+    return value.strftime("%Y-%m")
+
+
+def heure(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H")
+
+
+def contributions(state: Optional[Dict[str, Any]]) -> List[Key]:
+    """Clés de compteur auxquelles une intervention dans cet état contribue (+1)."""
+    if not state or state.get("statut") is None:
+        return []
+    statut = StatutIntervention(state["statut"])
+    scopes = [(SCOPE_GLOBAL, 0)]
+    if state.get("technicien_id"):
+        scopes.append((SCOPE_TECHNICIEN, state["technicien_id"]))
+    if state.get("client_id"):
+        scopes.append((SCOPE_CLIENT, state["client_id"]))
+
+    keys: List[Key] = []
+    for scope, scope_id in scopes:
+        keys.append((scope, scope_id, statut_metric(statut), ""))
+        if state.get("date_creation"):
+            keys.append((scope, scope_id, METRIC_CREEES, mois(state["date_creation"])))
+        if statut in STATUTS_TERMINES and state.get("date_cloture"):
+            keys.append((scope, scope_id, METRIC_CLOTUREES, mois(state["date_cloture"])))
+        if statut in STATUTS_ACTIFS and state.get("date_limite"):
+            keys.append((scope, scope_id, METRIC_ECHEANCE, heure(state["date_limite"])))
+    return keys
+
+
+def apply_deltas(session: Session, deltas: Counter) -> None:
+    """Upsert additif des variations non nulles (ordre stable : pas d'interblocage entre transactions)."""
+    rows = [
+        {"scope": scope, "scope_id": scope_id, "metric": metric, "periode": periode, "valeur": delta}
+        for (scope, scope_id, metric, periode), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+    # Connexion de la session : pas de nouvel événement ORM, même transaction
+    session.connection().execute(
+        insert_or_increment(session, DashboardCounter.__table__, ["scope", "scope_id", "metric", "periode"], ["valeur"]),
+        rows,
+    )
+
+
+def _current_state(obj: Intervention) -> Dict[str, Any]:
+    return {name: getattr(obj, name) for name in FIELDS}
+
+
+def _previous_state(obj: Intervention) -> Dict[str, Any]:
+    state = inspect(obj)
+    values = {}
+    for name in FIELDS:
+        history = state.attrs[name].history
+        if history.has_changes():
+            # Ancienne valeur chargée grâce à active_history (vide si elle valait NULL)
+            values[name] = history.deleted[0] if history.deleted else None
+        else:
+            values[name] = getattr(obj, name)
+    return values
+
+
+def _tracked_change(obj: Intervention) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in FIELDS)
+
+
+def _keep_history(target, value, oldvalue, initiator) -> None:
+    pass
+
+
+# active_history : l'ancienne valeur est chargée avant affectation, même si l'attribut était expiré
+for _name in FIELDS:
+    event.listen(getattr(Intervention, _name), "set", _keep_history, active_history=True)
+
+
+@event.listens_for(Session, "before_flush")
+def _before_flush(session: Session, flush_context, instances) -> None:
+    olds = {}
+    for obj in session.deleted:
+        if isinstance(obj, Intervention):
+            olds[id(obj)] = (obj, _previous_state(obj))
+    for obj in session.dirty:
+        if isinstance(obj, Intervention) and _tracked_change(obj):
+            olds[id(obj)] = (obj, _previous_state(obj))
+    session.info[_OLD_STATES] = olds
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    olds = session.info.pop(_OLD_STATES, {})
+    deltas: Counter = Counter()
+    for obj in session.new:
+        if isinstance(obj, Intervention):
+            deltas.update(contributions(_current_state(obj)))
+    for obj, old in olds.values():
+        deltas.subtract(contributions(old))
+        if obj not in session.deleted:
+            deltas.update(contributions(_current_state(obj)))
+    apply_deltas(session, deltas)
+
+
+def _state_columns():
+    return [getattr(Intervention, name) for name in FIELDS]
+
+
+def record_interventions(db: Session, intervention_ids: Iterable[int]) -> None:
+    """Comptabilise des interventions insérées hors ORM (insertion en masse)."""
+    ids = list(intervention_ids)
+    if not ids:
+        return
+    deltas: Counter = Counter()
+    for row in db.execute(select(*_state_columns()).where(Intervention.id.in_(ids))):
+        deltas.update(contributions(dict(zip(FIELDS, row))))
+    apply_deltas(db, deltas)
+
+
+def rebuild_dashboard_counters(db: Session, yield_per: int = 5000) -> int:
+    """
+    Recalcule tous les compteurs depuis les interventions (réconciliation).
+    Sous PostgreSQL, la table est verrouillée en écriture pendant le
+    recalcul : les transactions modifiant des interventions attendent puis
+    appliquent leur variation sur les compteurs reconstruits.
+
+    Returns:
+        Nombre de compteurs écrits
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE dashboard_counters IN EXCLUSIVE MODE"))
+    db.execute(delete(DashboardCounter))
+    totals: Counter = Counter()
+    rows = db.execute(select(*_state_columns()).execution_options(yield_per=yield_per))
+    for row in rows:
+        totals.update(contributions(dict(zip(FIELDS, row))))
+    apply_deltas(db, totals)
+    db.commit()
+    return len(totals)
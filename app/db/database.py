@@ -1,10 +1,16 @@
 # app/db/database.py
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc as sa_exc
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, StaticPool
 from app.core.config import settings
+from threading import Lock
+from typing import Any, Dict, List
+import logging
 import sys
+import time
+
+logger = logging.getLogger(__name__)
 
 # Initialisation de Base
 Base = declarative_base()
@@ -16,26 +22,85 @@ DATABASE_URL = (
 )
 
 
+class PoolMetrics:
+    """
+    Compteurs de checkout du pool (thread-safe), pour dimensionner
+    DB_POOL_SIZE / DB_MAX_OVERFLOW face au nombre de workers uvicorn.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total_s = 0.0
+        self.wait_max_s = 0.0
+
+    def record(self, wait_s: float, timeout: bool = False) -> None:
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total_s += wait_s
+            self.wait_max_s = max(self.wait_max_s, wait_s)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_total_s / attempts * 1000, 3) if attempts else 0.0,
+                "wait_ms_max": round(self.wait_max_s * 1000, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool mesurant le temps d'attente de chaque checkout (ouverture incluse)."""
+
+    def _do_get(self):
+        debut = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except sa_exc.TimeoutError:
+            pool_metrics.record(time.perf_counter() - debut, timeout=True)
+            raise
+        pool_metrics.record(time.perf_counter() - debut)
+        return conn
+
+
 def _create_default_engine():
     """
     Crée l'engine de base de données.
-    - Tente PostgreSQL (prod/dev).
-    - En cas d'indisponibilité du driver (psycopg2 non installé), bascule sur SQLite en mémoire.
-    Ce fallback évite l'échec d'import lors des tests qui remplacent get_db.
+    - PostgreSQL (prod/dev) avec un pool paramétré par Settings (DB_POOL_*).
+      Aucune connexion n'est ouverte à l'import : pre-ping valide les
+      connexions au checkout.
+    - En mode test ou si le driver (psycopg2) est absent, bascule sur SQLite en mémoire.
     """
     try:
         # En mode test (pytest), on force SQLite en mémoire pour isolation/rapidité
         if "pytest" in sys.modules:
             raise RuntimeError("Test mode detected - using in-memory SQLite")
 
-        eng = create_engine(DATABASE_URL)
-        # Probe la connexion; si indisponible, fallback SQLite
-        try:
-            with eng.connect() as conn:
-                pass
-        except Exception as connect_exc:
-            raise connect_exc
-        return eng
+        connect_args = {}
+        if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        return create_engine(
+            DATABASE_URL,
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            connect_args=connect_args,
+        )
     except Exception as exc:  # ImportError/ModuleNotFoundError psycopg2, etc.
         # Fallback silencieux pour l'environnement de test
         print(
@@ -58,46 +123,230 @@ _SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 from sqlalchemy.orm import Session
 from typing import Generator
 
-# Initialisation paresseuse du schéma en mode SQLite mémoire
-_schema_initialized = False
+# Initialisation paresseuse du schéma en mode SQLite mémoire : nombre de
+# tables couvertes par le dernier create_all (-1 = jamais initialisé)
+_schema_tables_count = -1
+_schema_lock = Lock()
 
-# Assure le schéma si des tests utilisent directement SessionLocal sans passer par get_db
-if engine.url.get_backend_name() == "sqlite":
-    try:
-        # Import des modèles pour enregistrer toutes les tables
-        import app.models  # noqa: F401
-        Base.metadata.create_all(bind=engine)
-        _schema_initialized = True
-    except Exception as exc:
-        print(f"Initialisation immédiate du schéma SQLite échouée: {exc}")
 
-def get_db() -> Generator[Session, None, None]:
-    global _schema_initialized
-    # Crée le schéma si on est en SQLite mémoire et pas encore initialisé
-    if engine.url.get_backend_name() == "sqlite" and not _schema_initialized:
+def _ensure_sqlite_schema() -> None:
+    """
+    Crée le schéma SQLite mémoire au premier besoin, puis seulement si de
+    nouvelles tables ont été enregistrées depuis (import partiel des modèles
+    pendant un import circulaire) : le coût par session est une comparaison.
+    """
+    global _schema_tables_count
+    if engine.url.get_backend_name() != "sqlite":
+        return
+    if _schema_tables_count == len(Base.metadata.tables):
+        return
+    with _schema_lock:
         try:
-            # Import des modèles pour que toutes les tables soient enregistrées
+            # Import des modèles pour enregistrer toutes les tables
             import app.models  # noqa: F401
+            if _schema_tables_count == len(Base.metadata.tables):
+                return
             Base.metadata.create_all(bind=engine)
-            _schema_initialized = True
+            _schema_tables_count = len(Base.metadata.tables)
         except Exception as exc:
             print(f"Initialisation du schéma SQLite échouée: {exc}")
 
+
+# Assure le schéma si des tests utilisent directement SessionLocal sans passer par get_db
+_ensure_sqlite_schema()
+
+
+def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+
 # Fournit une session tout en garantissant le schéma en mode SQLite mémoire
 def SessionLocal() -> Session:
-    global _schema_initialized
-    if engine.url.get_backend_name() == "sqlite":
-        try:
-            import app.models  # noqa: F401
-            # create_all avec checkfirst garantit la présence des tables
-            Base.metadata.create_all(bind=engine)
-            _schema_initialized = True
-        except Exception as exc:
-            print(f"Initialisation à la volée du schéma SQLite échouée: {exc}")
+    _ensure_sqlite_schema()
     return _SessionFactory()
+
+
+def dialect_insert(db: Session, table):
+    """INSERT du dialecte de la session (PostgreSQL ou SQLite), pour ON CONFLICT."""
+    from sqlalchemy.dialects import postgresql, sqlite
+
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(table)
+
+
+def insert_ignoring_conflicts(db: Session, table, index_elements: List[str]):
+    """INSERT ... ON CONFLICT DO NOTHING selon le dialecte (PostgreSQL ou SQLite)."""
+    return dialect_insert(db, table).on_conflict_do_nothing(index_elements=index_elements)
+
+
+def insert_or_increment(db: Session, table, index_elements: List[str], columns: List[str]):
+    """INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col (PostgreSQL ou SQLite)."""
+    stmt = dialect_insert(db, table)
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={name: table.c[name] + stmt.excluded[name] for name in columns},
+    )
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """État courant du pool et métriques cumulées de checkout."""
+    pool = engine.pool
+    data: Dict[str, Any] = {
+        "backend": engine.url.get_backend_name(),
+        "pool": type(pool).__name__,
+    }
+    if isinstance(pool, QueuePool):
+        data.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "timeout_s": pool.timeout(),
+        })
+    data.update(pool_metrics.snapshot())
+    return data
+
+
+# ---------- Pile asynchrone (routes de lecture à fort trafic) ----------
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from typing import AsyncGenerator
+
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def _is_memory_sqlite(url) -> bool:
+    return not url.database or url.database == ":memory:" or url.query.get("mode") == "memory"
+
+
+def _create_async_engine(url=None):
+    """
+    Crée l'AsyncEngine correspondant à l'engine synchrone :
+    - PostgreSQL : asyncpg, avec les mêmes réglages de pool ;
+    - SQLite fichier : aiosqlite.
+    Retourne None en SQLite mémoire (tests) : une autre connexion ne verrait
+    pas la même base, get_async_db retombe alors sur la session synchrone.
+    Un PostgreSQL sans asyncpg est une erreur de déploiement (routes async
+    bloquantes) : journalisée en erreur avant le même repli.
+    """
+    url = url if url is not None else engine.url
+    backend = url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS or (backend == "sqlite" and _is_memory_sqlite(url)):
+        return None
+    async_url = url.set(drivername=_ASYNC_DRIVERS[backend])
+    if backend == "sqlite":
+        return create_async_engine(async_url)
+    try:
+        connect_args = {}
+        if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        return create_async_engine(
+            async_url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            connect_args=connect_args,
+        )
+    except Exception:  # ModuleNotFoundError asyncpg, etc.
+        logger.exception(
+            "Engine asynchrone PostgreSQL indisponible (asyncpg installé ?) : "
+            "les routes async utilisent la session synchrone, bloquante."
+        )
+        return None
+
+
+async_engine = _create_async_engine()
+_AsyncSessionFactory = (
+    async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+    if async_engine is not None else None
+)
+
+
+class _AsyncResultAdapter:
+    """Résultat synchrone itérable avec `async for` (équivalent d'AsyncResult)."""
+
+    def __init__(self, result):
+        self._result = result
+
+    def scalars(self) -> "_AsyncResultAdapter":
+        return _AsyncResultAdapter(self._result.scalars())
+
+    async def __aiter__(self):
+        for row in self._result:
+            yield row
+
+
+class SyncSessionAdapter:
+    """
+    Expose le sous-ensemble d'AsyncSession utilisé par les routes async
+    au-dessus d'une Session synchrone.
+
+    Utilisé quand aucun AsyncEngine n'est disponible (SQLite mémoire partagée
+    avec l'engine synchrone, tests avec session surchargée, asyncpg absent) :
+    les appels restent bloquants, ce mode n'est pas destiné à la production.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def execute(self, statement, params=None, **kwargs):
+        return self.sync_session.execute(statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return self.sync_session.scalar(statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return self.sync_session.scalars(statement, params, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return self.sync_session.get(entity, ident, **kwargs)
+
+    def get_bind(self, *args, **kwargs):
+        return self.sync_session.get_bind(*args, **kwargs)
+
+    async def stream(self, statement, params=None, **kwargs):
+        return _AsyncResultAdapter(self.sync_session.execute(statement, params, **kwargs))
+
+    def add(self, instance) -> None:
+        self.sync_session.add(instance)
+
+    async def delete(self, instance) -> None:
+        self.sync_session.delete(instance)
+
+    async def flush(self, objects=None) -> None:
+        self.sync_session.flush(objects)
+
+    async def commit(self) -> None:
+        self.sync_session.commit()
+
+    async def rollback(self) -> None:
+        self.sync_session.rollback()
+
+    async def refresh(self, instance, attribute_names=None) -> None:
+        self.sync_session.refresh(instance, attribute_names)
+
+    async def close(self) -> None:
+        self.sync_session.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dépendance FastAPI asynchrone (surchargée dans les tests).
+    Sans AsyncEngine, fournit un SyncSessionAdapter sur SessionLocal.
+    """
+    if _AsyncSessionFactory is None:
+        db = SessionLocal()
+        try:
+            yield SyncSessionAdapter(db)
+        finally:
+            db.close()
+        return
+    async with _AsyncSessionFactory() as session:
+        yield session
@@ -0,0 +1,182 @@
+# app/db/search_index.py
+
+"""
+Maintenance de l'index plein texte search_entries.
+
+Après chaque flush ORM, les interventions, équipements et documents créés
+ou dont un champ indexé a changé sont réindexés, et ceux supprimés retirés
+de l'index, dans la transaction de la modification. La réindexation est un
+INSERT ... SELECT par type d'objet : les textes sont relus en SQL, jamais
+chargés dans la session (colonnes différées des interventions comprises).
+Sous PostgreSQL, le tsvector est calculé dans le même INSERT.
+
+Les objets supprimés par cascade SQL (ON DELETE CASCADE) sont retirés avec
+leur parent : leurs identifiants sont lus par clé étrangère avant le flush,
+puis leurs entrées supprimées par clé. Les insertions en masse hors ORM appellent `index_objects` ; les autres
+écritures hors ORM sont rattrapées par `rebuild_search_index` (tâche
+planifiée "search_reindex").
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import delete, event, func, inspect, literal, literal_column, select, text
+from sqlalchemy.orm import Session
+
+from app.models.client import Client
+from app.models.document import Document
+from app.models.equipement import Equipement
+from app.models.intervention import Intervention
+from app.models.search_entry import SearchEntry
+from app.models.user import User
+
+SOURCE_INTERVENTION = "intervention"
+SOURCE_EQUIPEMENT = "equipement"
+SOURCE_DOCUMENT = "document"
+
+# Configuration plein texte PostgreSQL (racinisation française)
+CONFIG_TEXTE = literal_column("'french'::regconfig")
+
+# Source -> (modèle, attributs indexés : le premier est le titre, les suivants le contenu)
+SOURCES: Dict[str, Tuple[type, Tuple[str, ...]]] = {
+    SOURCE_INTERVENTION: (Intervention, ("titre", "description", "rapport_intervention")),
+    SOURCE_EQUIPEMENT: (Equipement, ("nom", "localisation")),
+    SOURCE_DOCUMENT: (Document, ("nom_fichier",)),
+}
+_SOURCE_PAR_MODELE = {model: source for source, (model, _) in SOURCES.items()}
+
+# Suppressions en cascade par la base (ON DELETE CASCADE) menant à une source :
+# modèle parent -> clés étrangères des enfants supprimés avec lui
+CASCADES: Dict[type, Tuple[Any, ...]] = {
+    User: (Client.user_id,),
+    Client: (Intervention.client_id,),
+    Equipement: (Intervention.equipement_id,),
+    Intervention: (Document.intervention_id,),
+}
+
+_CASCADE_PENDING = "_search_index_cascade"
+
+
+def vecteur(titre, contenu):
+    """Expression tsvector PostgreSQL : titre pondéré A, contenu B."""
+    return func.setweight(func.to_tsvector(CONFIG_TEXTE, titre), "A").op("||")(
+        func.setweight(func.to_tsvector(CONFIG_TEXTE, contenu), "B")
+    )
+
+
+def _select_source(source: str, postgresql: bool, ids: Optional[Iterable[int]] = None):
+    """SELECT des colonnes de search_entries pour une source (toutes les lignes, ou `ids`)."""
+    model, attributs = SOURCES[source]
+    titre = func.coalesce(getattr(model, attributs[0]), "")
+    contenu = literal("")
+    for attribut in attributs[1:]:
+        contenu = contenu + " " + func.coalesce(getattr(model, attribut), "")
+    colonnes = [literal(source), model.id, func.substr(titre, 1, 255), func.trim(contenu)]
+    if postgresql:
+        colonnes.append(vecteur(titre, contenu))
+    stmt = select(*colonnes)
+    if ids is not None:
+        stmt = stmt.where(model.id.in_(sorted(ids)))
+    return stmt
+
+
+def _indexer(connection, source: str, ids: Optional[Set[int]] = None) -> None:
+    postgresql = connection.dialect.name == "postgresql"
+    colonnes = ["source", "source_id", "titre", "contenu"] + (["vecteur"] if postgresql else [])
+    connection.execute(
+        SearchEntry.__table__.insert().from_select(colonnes, _select_source(source, postgresql, ids))
+    )
+
+
+def _retirer(connection, source: str, ids: Set[int]) -> None:
+    connection.execute(
+        delete(SearchEntry).where(SearchEntry.source == source, SearchEntry.source_id.in_(sorted(ids)))
+    )
+
+
+def _enfants_en_cascade(connection, model: type, ids: Set[int], resultat: Dict[str, Set[int]]) -> None:
+    """Ajoute à `resultat` les objets indexés que la base supprimera avec `ids` (par clé étrangère)."""
+    for cle in CASCADES.get(model, ()):
+        enfant = cle.class_
+        enfant_ids = set(connection.execute(select(enfant.id).where(cle.in_(sorted(ids)))).scalars())
+        if not enfant_ids:
+            continue
+        source = _SOURCE_PAR_MODELE.get(enfant)
+        if source:
+            resultat[source] |= enfant_ids
+        _enfants_en_cascade(connection, enfant, enfant_ids, resultat)
+
+
+def _modifie(obj, attributs: Tuple[str, ...]) -> bool:
+    # Historique passif : un attribut différé non chargé n'est pas lu
+    state = inspect(obj)
+    return any(state.attrs[attribut].history.has_changes() for attribut in attributs)
+
+
+@event.listens_for(Session, "before_flush")
+def _before_flush(session: Session, flush_context, instances) -> None:
+    # Après le flush, les enfants supprimés par la base ne sont plus lisibles
+    parents: Dict[type, Set[int]] = defaultdict(set)
+    for obj in session.deleted:
+        if type(obj) in CASCADES:
+            parents[type(obj)].add(obj.id)
+    cascade: Dict[str, Set[int]] = defaultdict(set)
+    if parents:
+        connection = session.connection()
+        for model, ids in parents.items():
+            _enfants_en_cascade(connection, model, ids, cascade)
+    session.info[_CASCADE_PENDING] = cascade
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    a_indexer: Dict[str, Set[int]] = defaultdict(set)
+    a_retirer: Dict[str, Set[int]] = session.info.pop(_CASCADE_PENDING, None) or defaultdict(set)
+    for obj in session.new:
+        source = _SOURCE_PAR_MODELE.get(type(obj))
+        if source:
+            a_indexer[source].add(obj.id)
+    for obj in session.dirty:
+        source = _SOURCE_PAR_MODELE.get(type(obj))
+        if source and _modifie(obj, SOURCES[source][1]):
+            a_indexer[source].add(obj.id)
+    for obj in session.deleted:
+        source = _SOURCE_PAR_MODELE.get(type(obj))
+        if source:
+            a_retirer[source].add(obj.id)
+    if not a_indexer and not a_retirer:
+        return
+    # Connexion de la session : pas de nouvel événement ORM, même transaction
+    connection = session.connection()
+    for source, ids in a_retirer.items():
+        _retirer(connection, source, ids)
+    for source, ids in a_indexer.items():
+        _retirer(connection, source, ids)
+        _indexer(connection, source, ids)
+
+
+def index_objects(db: Session, source: str, ids: Iterable[int]) -> None:
+    """Indexe des objets insérés hors ORM (insertion en masse)."""
+    ids = set(ids)
+    if ids:
+        _indexer(db.connection(), source, ids)
+
+
+def rebuild_search_index(db: Session) -> int:
+    """
+    Reconstruit tout l'index depuis les tables sources. Sous PostgreSQL, la
+    table est verrouillée en écriture pendant la reconstruction (les
+    réindexations concurrentes attendent).
+
+    Returns:
+        Nombre d'entrées indexées
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE search_entries IN EXCLUSIVE MODE"))
+    connection = db.connection()
+    connection.execute(delete(SearchEntry))
+    for source in SOURCES:
+        _indexer(connection, source)
+    total = db.execute(select(func.count(SearchEntry.id))).scalar_one()
+    db.commit()
+    return total
@@ -0,0 +1,77 @@
+# app/db/sql_functions.py
+
+"""
+Expressions SQL partagées par les propriétés hybrides des modèles.
+
+`heures_entre` calcule une durée en heures (flottant) entre deux colonnes
+DateTime selon le dialecte (PostgreSQL ou SQLite, aucun autre) ; `valeur_hybride` évalue
+l'expression SQL d'une propriété hybride pour une instance, en une requête ;
+`explain` renvoie le plan PostgreSQL d'une requête sans l'exécuter.
+"""
+
+from typing import Any
+
+from sqlalchemy import Float, select
+from sqlalchemy.exc import CompileError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+from sqlalchemy.orm import object_session
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class heures_entre(FunctionElement):
+    """heures_entre(debut, fin) : (fin - debut) en heures décimales."""
+    type = Float()
+    name = "heures_entre"
+    inherit_cache = True
+
+
+@compiles(heures_entre)
+def _heures_entre_defaut(element, compiler, **kw):
+    raise CompileError(f"heures_entre non disponible pour le dialecte {compiler.dialect.name}")
+
+
+@compiles(heures_entre, "postgresql")
+def _heures_entre_postgresql(element, compiler, **kw):
+    debut, fin = list(element.clauses)
+    # EXTRACT renvoie un numeric (PostgreSQL 14+) : converti en double comme le type déclaré
+    duree = f"EXTRACT(EPOCH FROM ({compiler.process(fin, **kw)} - {compiler.process(debut, **kw)}))"
+    return f"CAST({duree} AS DOUBLE PRECISION) / 3600.0"
+
+
+@compiles(heures_entre, "sqlite")
+def _heures_entre_sqlite(element, compiler, **kw):
+    debut, fin = list(element.clauses)
+    return f"(julianday({compiler.process(fin, **kw)}) - julianday({compiler.process(debut, **kw)})) * 24.0"
+
+
+class explain(Executable, ClauseElement):
+    """
+    explain(requete) : EXPLAIN (FORMAT JSON) de la requête, sans l'exécuter
+    (PostgreSQL uniquement). Une ligne, une colonne : le plan JSON, dont
+    "Plan Rows" est l'estimation de lignes de l'optimiseur.
+    """
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(explain, "postgresql")
+def _explain_postgresql(element, compiler, **kw):
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+def valeur_hybride(instance, expression, defaut: Any = None) -> Any:
+    """
+    Valeur de l'expression SQL (sous-requête corrélée) d'une propriété
+    hybride pour une instance persistante ; `defaut` si l'instance n'est
+    pas en base ou si l'agrégat est NULL.
+    """
+    session = object_session(instance)
+    if session is None or instance.id is None:
+        return defaut
+    model = type(instance)
+    value = session.scalar(select(expression).where(model.id == instance.id))
+    return defaut if value is None else value
@@ -4,16 +4,38 @@ from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+import sys
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print(f"🚀 {settings.PROJECT_NAME} démarré!")
     print(f"📚 Documentation disponible sur: http://localhost:8000/docs")
+    # Templates d'emails compilés une fois pour toutes (erreurs visibles au démarrage)
+    from app.core.template_registry import precompile_templates
+    print(f"✉️  {len(precompile_templates())} templates de notification précompilés")
+    # Envoi des notifications email en tâche de fond (désactivé sous pytest)
+    from app.tasks.notification_dispatcher import dispatcher
+    run_dispatcher = settings.NOTIFICATION_DISPATCHER_ENABLED and "pytest" not in sys.modules
+    if run_dispatcher:
+        dispatcher.start()
+    # Planificateur distribué : démarré dans chaque worker, un seul leader déclenche
+    from app.tasks.scheduler import scheduler
+    run_scheduler = settings.SCHEDULER_ENABLED and "pytest" not in sys.modules
+    if run_scheduler:
+        scheduler.start()
     try:
         yield
     finally:
         # Shutdown
+        if run_scheduler:
+            scheduler.stop()
+        if run_dispatcher:
+            dispatcher.stop()
+        from app.tasks.derivative_tasks import shutdown_derivative_pools
+        shutdown_derivative_pools()
+        from app.tasks.report_tasks import shutdown_report_pool
+        shutdown_report_pool()
         print("👋 Arrêt de l'application...")
 
 
@@ -39,7 +61,8 @@ try:
     from app.api.v1 import (
         auth, users, techniciens, equipements,
         interventions, planning, notifications,
-        documents, filters,
+        documents, filters, scheduler, reports,
+        dashboard, search,
     )
     
     # Inclusions des routeurs avec préfixe API v1
@@ -59,6 +82,10 @@ try:
     app.include_router(notifications.router, prefix=api_prefix)
     app.include_router(documents.router, prefix=api_prefix)
     app.include_router(filters.router, prefix=api_prefix)
+    app.include_router(scheduler.router, prefix=api_prefix)
+    app.include_router(reports.router, prefix=api_prefix)
+    app.include_router(dashboard.router, prefix=api_prefix)
+    app.include_router(search.router, prefix=api_prefix)
     
 except ImportError as e:
     print(f"Erreur lors de l'import des routes: {e}")
@@ -82,4 +109,18 @@ def health_check():
         "service": "ERP Backend API"
     }
 
+# Santé de la base : connectivité et métriques du pool de connexions
+@app.get("/health/db")
+def health_check_db():
+    from sqlalchemy import text
+    from app.db.database import engine, get_pool_status
+
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        status = "healthy"
+    except Exception as exc:
+        status = f"unhealthy: {exc.__class__.__name__}"
+    return {"status": status, "pool": get_pool_status()}
+
  # Les événements startup/shutdown sont maintenant gérés par lifespan ci-dessus
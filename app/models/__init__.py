@@ -60,7 +60,7 @@ from .intervention import (
 from .planning import Planning
 
 # Modèles documentation et fichiers
-from .document import Document
+from .document import Document, DocumentBlob
 
 # Modèles notification et communication
 from .notification import Notification
@@ -88,6 +88,24 @@ from .report import (
     ReportFormat
 )
 
+# Planificateur de tâches distribué
+from .scheduler import (
+    ScheduledJob,
+    JobRun,
+    SchedulerLease,
+    TypePlanification,
+    StatutExecution
+)
+
+# Versions des données des rapports (compteur par table et incréments à compacter)
+from .table_version import TableVersion, TableVersionIncrement
+
+# Agrégats du tableau de bord
+from .dashboard import DashboardCounter
+
+# Index plein texte (recherche globale)
+from .search_entry import SearchEntry
+
 # Export des classes principales pour utilisation externe
 __all__ = [
     # Authentification et utilisateurs
@@ -110,7 +128,7 @@ __all__ = [
     "Planning",
     
     # Documentation
-    "Document",
+    "Document", "DocumentBlob",
     
     # Communication
     "Notification", 
@@ -125,5 +143,12 @@ __all__ = [
     "PieceDetachee", "MouvementStock", "InterventionPiece", "TypeMouvement",
     
     # Business Intelligence
-    "Report", "ReportSchedule", "ReportStatus", "ReportType", "ReportFormat"
+    "Report", "ReportSchedule", "ReportStatus", "ReportType", "ReportFormat",
+
+    # Planification des tâches
+    "ScheduledJob", "JobRun", "SchedulerLease", "TypePlanification", "StatutExecution",
+    "TableVersion", "TableVersionIncrement", "DashboardCounter", "SearchEntry",
 ]
+
+# Écouteurs de session alimentant table_versions, dashboard_counters et search_entries (après import des modèles)
+from app.db import change_tracking, dashboard_counters, search_index  # noqa: E402,F401
@@ -18,10 +18,12 @@ Architecture:
 - Interface to_dict() standardisée pour API
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Boolean, Numeric, Index, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Boolean, Numeric, Float, Index, Enum, select, func, cast
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
 from app.db.database import Base
+from app.db.sql_functions import heures_entre, valeur_hybride
 from typing import TYPE_CHECKING, Optional, Dict, Any, List
 import enum
 
@@ -33,7 +35,7 @@ if TYPE_CHECKING:
     from .equipement import Equipement
 
 # Import direct nécessaire pour les filtres
-from .intervention import Intervention
+from .intervention import Intervention, profil_chargement
 
 
 class TypeClient(str, enum.Enum):
@@ -303,57 +305,70 @@ class Client(Base):
         from app.models.contrat import StatutContrat
         return self.contrats.filter_by(statut=StatutContrat.actif).first()
 
-    @property
+    # Agrégats calculés en SQL (SUM/AVG) : une requête par instance, ou
+    # sous-requête corrélée utilisable dans select/order_by/where
+    @hybrid_property
     def taux_satisfaction_moyen(self) -> Optional[float]:
         """Taux de satisfaction moyen basé sur les interventions."""
-        interventions_avec_note = self.interventions.filter(
-            Intervention.satisfaction_client.isnot(None)
-        ).all()
-        
-        if not interventions_avec_note:
-            return None
-            
-        total = sum(i.satisfaction_client for i in interventions_avec_note)
-        return round(total / len(interventions_avec_note), 2)
+        valeur = valeur_hybride(self, Client.taux_satisfaction_moyen)
+        return round(valeur, 2) if valeur is not None else None
 
-    @property
+    @taux_satisfaction_moyen.expression
+    def taux_satisfaction_moyen(cls):
+        return (
+            select(cast(func.avg(Intervention.satisfaction_client), Float))
+            .where(Intervention.client_id == cls.id)
+            .correlate_except(Intervention)
+            .scalar_subquery()
+            .label("taux_satisfaction_moyen")
+        )
+
+    @hybrid_property
     def cout_maintenance_total(self) -> float:
         """Coût total de maintenance facturé (basé sur interventions)."""
-        total_centimes = 0
-        for intervention in self.interventions:
-            if intervention.cout_reel:
-                total_centimes += intervention.cout_reel
-        return round(total_centimes / 100, 2)
+        return round(valeur_hybride(self, Client.cout_maintenance_total, 0.0), 2)
 
-    @property
+    @cout_maintenance_total.expression
+    def cout_maintenance_total(cls):
+        return (
+            select(cast(func.coalesce(func.sum(Intervention.cout_reel), 0) / 100.0, Float))
+            .where(Intervention.client_id == cls.id)
+            .correlate_except(Intervention)
+            .scalar_subquery()
+            .label("cout_maintenance_total")
+        )
+
+    @hybrid_property
     def cout_maintenance_annuel(self) -> float:
         """Coût de maintenance des 12 derniers mois."""
+        return round(valeur_hybride(self, Client.cout_maintenance_annuel, 0.0), 2)
+
+    @cout_maintenance_annuel.expression
+    def cout_maintenance_annuel(cls):
         un_an_ago = datetime.utcnow() - timedelta(days=365)
-        interventions_recentes = self.interventions.filter(
-            Intervention.date_creation >= un_an_ago
-        ).all()
-        
-        total_centimes = sum(
-            i.cout_reel for i in interventions_recentes 
-            if i.cout_reel
+        return (
+            select(cast(func.coalesce(func.sum(Intervention.cout_reel), 0) / 100.0, Float))
+            .where(Intervention.client_id == cls.id, Intervention.date_creation >= un_an_ago)
+            .correlate_except(Intervention)
+            .scalar_subquery()
+            .label("cout_maintenance_annuel")
         )
-        return round(total_centimes / 100, 2)
 
-    @property
+    @hybrid_property
     def delai_moyen_intervention(self) -> Optional[float]:
         """Délai moyen de traitement des interventions (en heures)."""
-        interventions_terminees = self.interventions.filter(
-            Intervention.date_cloture.isnot(None)
-        ).all()
-        
-        if not interventions_terminees:
-            return None
-            
-        delais = [
-            (i.date_cloture - i.date_creation).total_seconds() / 3600
-            for i in interventions_terminees
-        ]
-        return round(sum(delais) / len(delais), 1)
+        valeur = valeur_hybride(self, Client.delai_moyen_intervention)
+        return round(valeur, 1) if valeur is not None else None
+
+    @delai_moyen_intervention.expression
+    def delai_moyen_intervention(cls):
+        return (
+            select(cast(func.avg(heures_entre(Intervention.date_creation, Intervention.date_cloture)), Float))
+            .where(Intervention.client_id == cls.id, Intervention.date_cloture.isnot(None))
+            .correlate_except(Intervention)
+            .scalar_subquery()
+            .label("delai_moyen_intervention")
+        )
 
     @property
     def niveau_priorite_commerciale(self) -> int:
@@ -455,7 +470,7 @@ class Client(Base):
     def calculer_sla_global(self) -> Optional[float]:
         """Calcule le respect global des SLA sur les 6 derniers mois."""
         six_mois_ago = datetime.utcnow() - timedelta(days=180)
-        interventions_recentes = self.interventions.filter(
+        interventions_recentes = self.interventions.options(*profil_chargement("stats")).filter(
             Intervention.date_creation >= six_mois_ago,
             Intervention.date_cloture.isnot(None)
         ).all()
@@ -482,7 +497,7 @@ class Client(Base):
         """
         date_debut = datetime.utcnow() - timedelta(days=nb_mois * 30)
         
-        interventions_periode = self.interventions.filter(
+        interventions_periode = self.interventions.options(*profil_chargement("stats")).filter(
             Intervention.date_creation >= date_debut
         ).all()
         
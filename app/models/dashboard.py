@@ -0,0 +1,30 @@
+
+"""
+Modèle DashboardCounter - Agrégats du tableau de bord maintenus en continu.
+Une ligne par (portée, métrique, période) : compteurs d'interventions par
+statut, créations et clôtures par mois, échéances actives par heure, pour
+l'ensemble (scope global) et par technicien ou client.
+Exemple : ("technicien", 12, "statut:en_cours", "") = 3.
+"""
+
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+from app.db.database import Base
+
+
+class DashboardCounter(Base):
+    __tablename__ = "dashboard_counters"
+    __allow_unmapped__ = True
+    __table_args__ = (
+        # Cible des upserts incrémentaux et des lectures par portée
+        UniqueConstraint('scope', 'scope_id', 'metric', 'periode', name='uq_dashboard_counter'),
+    )
+
+    id: int = Column(Integer, primary_key=True)
+    scope: str = Column(String(20), nullable=False, doc="global, technicien ou client")
+    scope_id: int = Column(Integer, default=0, nullable=False, doc="0 pour la portée globale")
+    metric: str = Column(String(40), nullable=False)
+    periode: str = Column(String(13), default="", nullable=False, doc="YYYY-MM, YYYY-MM-DDTHH ou vide")
+    valeur: int = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<DashboardCounter({self.scope}:{self.scope_id} {self.metric}[{self.periode}]={self.valeur})>"
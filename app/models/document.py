@@ -1,19 +1,62 @@
 
 """
 Modèle Document : gestion des fichiers liés aux interventions (photos, rapports, etc.).
-Relations : N:1 avec Intervention.
+Modèle DocumentBlob : contenu stocké une seule fois par empreinte SHA-256.
+Relations : N:1 avec Intervention, N:1 avec DocumentBlob.
 Exemple : utilisé pour stocker et référencer les documents opérationnels dans le SI.
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, DateTime, Index, Enum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
-from typing import TYPE_CHECKING, Optional, Dict, Any
+import enum
+from typing import TYPE_CHECKING, Optional, Dict, Any, List
 
 if TYPE_CHECKING:
     from .intervention import Intervention
 
+# Dérivés d'images (miniature, aperçu) générés en tâche de fond, par contenu
+DERIVE_TAILLES = ("thumbnail", "preview")
+DERIVE_FORMATS = ("webp", "jpeg")
+
+
+class StatutDerives(str, enum.Enum):
+    en_attente = "en_attente"
+    pret = "pret"
+    echec = "echec"
+
+
+class DocumentBlob(Base):
+    """
+    Contenu d'un fichier, stocké une seule fois (adressage par contenu).
+    - Fichier sous uploads/blobs/<2 car.>/<2 car.>/<sha256>
+    - ref_count : nombre de documents qui le référencent
+    - date_orphelin : passage à 0 référence ; le GC supprime le blob
+      après un délai de grâce (une ré-association reste possible d'ici là)
+    """
+    __tablename__ = "document_blobs"
+    __allow_unmapped__ = True
+    __table_args__ = (
+        Index('idx_document_blob_orphelin', 'ref_count', 'date_orphelin'),
+    )
+
+    id: int = Column(Integer, primary_key=True, index=True)
+    hash_sha256: str = Column(String(64), nullable=False, unique=True, doc="Empreinte SHA-256 du contenu (hex)")
+    taille_octets: int = Column(BigInteger, nullable=False, doc="Taille du contenu en octets")
+    chemin: str = Column(String(255), nullable=False, doc="Chemin relatif du contenu (ex: uploads/blobs/ab/cd/abcd...)")
+    ref_count: int = Column(Integer, default=0, nullable=False, doc="Nombre de documents référençant ce contenu")
+    date_creation: datetime = Column(DateTime, default=datetime.utcnow, nullable=False)
+    date_orphelin: Optional[datetime] = Column(DateTime, nullable=True, doc="Date de passage à 0 référence")
+    derives_statut: Optional[StatutDerives] = Column(Enum(StatutDerives), nullable=True, doc="Miniatures/aperçus (NULL : non applicable)")
+    date_derives: Optional[datetime] = Column(DateTime, nullable=True, doc="Dernière mise en file des dérivés")
+
+    documents: List["Document"] = relationship("Document", back_populates="blob", lazy="select")
+
+    def __repr__(self) -> str:
+        return f"<DocumentBlob(id={self.id}, hash_sha256='{self.hash_sha256[:12]}', ref_count={self.ref_count})>"
+
+
 class Document(Base):
     """
     Modèle Document - Gestion des fichiers liés à une intervention.
@@ -33,11 +76,30 @@ class Document(Base):
     nom_fichier: str = Column(String(255), nullable=False, index=True, doc="Nom du fichier (ex: rapport.pdf)")
     chemin: str = Column(String(255), nullable=False, doc="Chemin complet vers le fichier sur le serveur")
     date_upload: datetime = Column(DateTime, default=datetime.utcnow, nullable=False, index=True, doc="Date d'upload")
+    hash_sha256: Optional[str] = Column(String(64), nullable=True, index=True, doc="Empreinte SHA-256 du contenu (hex)")
+    taille_octets: Optional[int] = Column(BigInteger, nullable=True, doc="Taille du fichier en octets")
 
     # Clé étrangère vers une intervention
     intervention_id: int = Column(Integer, ForeignKey("interventions.id", ondelete="CASCADE"), nullable=False, index=True)
     intervention: "Intervention" = relationship("Intervention", back_populates="documents", lazy="select")
 
+    # Contenu dédupliqué (NULL pour les documents antérieurs au stockage par contenu)
+    blob_id: Optional[int] = Column(Integer, ForeignKey("document_blobs.id", ondelete="RESTRICT"), nullable=True, index=True)
+    blob: Optional[DocumentBlob] = relationship(DocumentBlob, back_populates="documents", lazy="select")
+
+    @property
+    def derives(self) -> Optional[Dict[str, Dict[str, str]]]:
+        """
+        URLs des dérivés prêts, par taille puis format :
+        {"thumbnail": {"webp": ..., "jpeg": ...}, "preview": {...}} ; None sinon.
+        """
+        if self.blob is None or self.blob.derives_statut != StatutDerives.pret:
+            return None
+        return {
+            taille: {fmt: f"/api/v1/documents/{self.id}/derives/{taille}.{fmt}" for fmt in DERIVE_FORMATS}
+            for taille in DERIVE_TAILLES
+        }
+
     def __repr__(self) -> str:
         return f"<Document(id={self.id}, nom_fichier='{self.nom_fichier}', intervention_id={self.intervention_id})>"
 
@@ -53,7 +115,10 @@ class Document(Base):
             "nom_fichier": self.nom_fichier,
             "chemin": self.chemin if include_sensitive else None,
             "date_upload": self.date_upload.isoformat() if self.date_upload else None,
+            "hash_sha256": self.hash_sha256,
+            "taille_octets": self.taille_octets,
             "url": self.url,
+            "derives": self.derives,
             "intervention_id": self.intervention_id,
         }
         if include_relations:
@@ -18,10 +18,12 @@ Architecture:
 - Interface to_dict() standardisée pour API
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Numeric, Index, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Numeric, Float, Index, ForeignKey, Enum, select, func, cast
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
 from app.db.database import Base
+from app.db.sql_functions import valeur_hybride
 from typing import TYPE_CHECKING, Optional, Dict, Any, List
 import enum
 
@@ -288,8 +290,10 @@ class Equipement(Base):
         if not self.frequence_entretien_jours:
             return None
             
+        from .intervention import profil_chargement
+
         # Récupère la dernière intervention préventive
-        derniere_preventive = self.interventions.filter_by(
+        derniere_preventive = self.interventions.options(*profil_chargement("stats")).filter_by(
             type_intervention="preventive"
         ).first()
         
@@ -332,14 +336,22 @@ class Equipement(Base):
             return None
         return round(self.nb_interventions_correctives / self.age_en_annees, 2)
 
-    @property
+    @hybrid_property
     def cout_maintenance_total(self) -> float:
-        """Calcule le coût total des maintenances réalisées."""
-        total = 0.0
-        for intervention in self.interventions:
-            if intervention.cout_reel:
-                total += float(intervention.cout_reel) / 100  # Conversion centimes -> euros
-        return round(total, 2)
+        """Calcule le coût total des maintenances réalisées (SUM SQL, en euros)."""
+        return round(valeur_hybride(self, Equipement.cout_maintenance_total, 0.0), 2)
+
+    @cout_maintenance_total.expression
+    def cout_maintenance_total(cls):
+        from .intervention import Intervention
+
+        return (
+            select(cast(func.coalesce(func.sum(Intervention.cout_reel), 0) / 100.0, Float))  # centimes -> euros
+            .where(Intervention.equipement_id == cls.id)
+            .correlate_except(Intervention)
+            .scalar_subquery()
+            .label("cout_maintenance_total")
+        )
 
     @property
     def derniere_intervention(self) -> Optional["Intervention"]:
@@ -20,7 +20,7 @@ Architecture:
 """
 
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Enum, Text, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred, defer, load_only, undefer_group
 from datetime import datetime, timedelta
 from app.db.database import Base
 import enum
@@ -95,6 +95,11 @@ class PrioriteIntervention(str, enum.Enum):
     programmee = "programmee"
 
 
+# Groupe de colonnes différées : textes libres de taille non bornée
+TEXT_GROUP = "texte"
+TEXT_COLUMNS = ("description", "rapport_intervention", "travaux_realises", "recommandations")
+
+
 class Intervention(Base):
     """
     Modèle Intervention - Gestion complète des interventions de maintenance.
@@ -134,6 +139,12 @@ class Intervention(Base):
     Index('idx_intervention_equipement_type', 'equipement_id', 'type'),
         Index('idx_intervention_client_statut', 'client_id', 'statut'),
         Index('idx_intervention_dates', 'date_creation', 'date_limite'),
+        # Pagination keyset de la liste (ORDER BY date_creation DESC, id DESC)
+        Index('idx_intervention_creation_id', 'date_creation', 'id'),
+        # Recherche triée par échéance (ORDER BY date_limite, id)
+        Index('idx_intervention_limite_id', 'date_limite', 'id'),
+        # Une seule intervention générée par échéance de planning (génération rejouable)
+        Index('uq_intervention_planning_echeance', 'planning_id', 'date_planifiee', unique=True),
     Index('idx_intervention_type_urgence', 'type', 'urgence'),
     )
 
@@ -142,7 +153,8 @@ class Intervention(Base):
     
     # Informations de base
     titre = Column(String(255), nullable=False, index=True)
-    description = Column(Text, nullable=True)
+    # Textes longs (groupe différé "texte") : non chargés par défaut, cf. profil_chargement
+    description = deferred(Column(Text, nullable=True), group=TEXT_GROUP)
     type_intervention = Column("type", Enum(InterventionType), nullable=False, index=True)
     
     # Cycle de vie et priorités
@@ -171,9 +183,9 @@ class Intervention(Base):
     cout_main_oeuvre = Column(Integer, nullable=True)  # en centimes d'euro
     
     # Résultats et validation
-    rapport_intervention = Column(Text, nullable=True)
-    travaux_realises = Column(Text, nullable=True)
-    recommandations = Column(Text, nullable=True)
+    rapport_intervention = deferred(Column(Text, nullable=True), group=TEXT_GROUP)
+    travaux_realises = deferred(Column(Text, nullable=True), group=TEXT_GROUP)
+    recommandations = deferred(Column(Text, nullable=True), group=TEXT_GROUP)
     validation_client = Column(Boolean, default=False, nullable=False)
     satisfaction_client = Column(Integer, nullable=True)  # Note 1-5
     
@@ -190,6 +202,10 @@ class Intervention(Base):
     client_id = Column(Integer, ForeignKey("clients.id", ondelete="CASCADE"), nullable=True, index=True)
     contrat_id = Column(Integer, ForeignKey("contrats.id", ondelete="SET NULL"), nullable=True, index=True)
 
+    # Origine planning (interventions préventives générées automatiquement)
+    planning_id = Column(Integer, ForeignKey("plannings.id", ondelete="SET NULL"), nullable=True)
+    date_planifiee = Column(DateTime, nullable=True)  # échéance du planning ayant produit l'intervention
+
     # 🔗 Relations ORM optimisées pour performance
     
     # Relations principales (N:1) - chargement immédiat pour données critiques
@@ -913,4 +929,33 @@ class Intervention(Base):
                 "peut_etre_archivee": self.peut_etre_archivee(),
             })
             
-        return data
\ No newline at end of file
+        return data
+
+# Colonnes utiles aux calculs statistiques (ni titre ni textes)
+STATS_COLUMNS = (
+    "id", "statut", "type_intervention", "priorite", "urgence",
+    "technicien_id", "equipement_id", "client_id",
+    "date_creation", "date_limite", "date_cloture", "duree_reelle",
+    "cout_reel", "cout_pieces", "cout_main_oeuvre", "satisfaction_client",
+)
+
+
+def profil_chargement(profil: str = "liste") -> tuple:
+    """
+    Options de chargement ORM des interventions selon l'usage.
+
+    - "liste" : colonnes scalaires ; accéder à un texte lève une erreur au
+      lieu d'émettre une requête par ligne
+    - "detail" : groupe "texte" chargé dans la même requête
+    - "stats" : uniquement STATS_COLUMNS, tout autre accès lève une erreur
+
+    Sans option, les textes restent différés et sont chargés (ensemble) au
+    premier accès.
+    """
+    if profil == "liste":
+        return tuple(defer(getattr(Intervention, name), raiseload=True) for name in TEXT_COLUMNS)
+    if profil == "detail":
+        return (undefer_group(TEXT_GROUP),)
+    if profil == "stats":
+        return (load_only(*(getattr(Intervention, name) for name in STATS_COLUMNS), raiseload=True),)
+    raise ValueError(f"Profil de chargement inconnu : {profil}")
@@ -29,6 +29,17 @@ class CanalNotification(str, enum.Enum):
     sms = "sms"
     push = "push"
 
+class StatutEnvoiNotification(str, enum.Enum):
+    """
+    Cycle de vie dans l'outbox d'envoi :
+    - en_attente : à envoyer par le dispatcher (éventuellement après backoff)
+    - envoyee : remise au serveur SMTP (ou canal sans envoi, ex. log)
+    - echec : abandonnée (erreur définitive ou tentatives épuisées)
+    """
+    en_attente = "en_attente"
+    envoyee = "envoyee"
+    echec = "echec"
+
 class Notification(Base):
     """
     Modèle Notification - Gestion des alertes/messages liés à une intervention.
@@ -43,6 +54,8 @@ class Notification(Base):
     __table_args__ = (
         Index('idx_notification_user_intervention', 'user_id', 'intervention_id'),
         Index('idx_notification_date', 'date_envoi'),
+        # Sélection des lots à envoyer par le dispatcher
+        Index('idx_notification_outbox', 'statut_envoi', 'prochaine_tentative'),
     )
 
     id: int = Column(Integer, primary_key=True, index=True)
@@ -51,6 +64,12 @@ class Notification(Base):
     contenu: Optional[str] = Column(String(1000), nullable=True, doc="Sujet/message")
     date_envoi: datetime = Column(DateTime, default=datetime.utcnow, nullable=False, index=True, doc="Date d'envoi")
 
+    # Outbox : état d'envoi et reprise sur erreur
+    statut_envoi: StatutEnvoiNotification = Column(Enum(StatutEnvoiNotification), default=StatutEnvoiNotification.envoyee, nullable=False, doc="État d'envoi")
+    tentatives: int = Column(Integer, default=0, nullable=False, doc="Nombre de tentatives d'envoi")
+    prochaine_tentative: Optional[datetime] = Column(DateTime, nullable=True, doc="Pas d'envoi avant cette date (backoff)")
+    derniere_erreur: Optional[str] = Column(String(500), nullable=True, doc="Dernière erreur d'envoi")
+
     # Foreign Keys
     intervention_id: int = Column(Integer, ForeignKey("interventions.id", ondelete="CASCADE"), nullable=False, index=True)
     user_id: int = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -74,6 +93,8 @@ class Notification(Base):
             "canal": self.canal.value,
             "contenu": self.contenu,
             "date_envoi": self.date_envoi.isoformat() if self.date_envoi else None,
+            "statut_envoi": self.statut_envoi.value if self.statut_envoi else None,
+            "tentatives": self.tentatives,
             "user_id": self.user_id,
             "intervention_id": self.intervention_id,
             "resume": self.resume,
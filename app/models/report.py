@@ -1,7 +1,7 @@
 """
 Modèles SQLAlchemy pour la génération et gestion de rapports
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, JSON, BigInteger, Numeric, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, JSON, BigInteger, Numeric, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
 from app.db.database import Base
@@ -49,6 +49,8 @@ class Report(Base):
     __table_args__ = (
         # Index combinés pour recherche rapide
         # Index('idx_report_type_status', 'report_type', 'status'),
+        # Réutilisation d'un rapport identique (cache)
+        Index('idx_report_cache_key_status', 'cache_key', 'status'),
     )
 
     id: int = Column(Integer, primary_key=True, index=True)
@@ -68,6 +70,8 @@ class Report(Base):
     mime_type: str = Column(String(100), nullable=True)
     filters_json: dict = Column(JSON, nullable=True)
     parameters: dict = Column(JSON, nullable=True)
+    # Empreinte (type, format, filtres, paramètres, versions des données)
+    cache_key: str = Column(String(64), nullable=True)
     is_public: bool = Column(Boolean, default=False, nullable=False)
     is_downloadable: bool = Column(Boolean, default=True, nullable=False)
     access_token: str = Column(String(255), nullable=True, unique=True, index=True)
@@ -332,6 +336,10 @@ class ReportSchedule(Base):
     - Garder un historique des exécutions
     """
     __tablename__ = "report_schedules"
+    __table_args__ = (
+        # Recherche des planifications dues : is_active AND next_run_at <= now
+        Index('idx_report_schedule_due', 'is_active', 'next_run_at'),
+    )
 
     # Clé primaire
     id = Column(Integer, primary_key=True, index=True)
@@ -346,8 +354,8 @@ class ReportSchedule(Base):
     report_title_template = Column(String(255), nullable=True)  # Template avec variables
     
     # Planification (expression cron)
-    cron_expression = Column(String(100), nullable=False)  # Ex: "0 9 * * 1" pour tous les lundis à 9h
-    timezone = Column(String(50), default="UTC", nullable=False)
+    cron_expression = Column(String(100), nullable=False)  # Ex: "0 9 * * 1" pour tous les lundis à 9h (app.core.cron)
+    timezone = Column(String(50), default="UTC", nullable=False)  # Fuseau IANA d'évaluation du cron
     
     # Configuration des filtres et paramètres
     filters_json = Column(JSON, nullable=True)
@@ -0,0 +1,119 @@
+
+"""
+Modèles du planificateur de tâches distribué : tâches planifiées, bail de
+leader et historique d'exécution.
+Relations : 1:N entre ScheduledJob et JobRun (par nom de tâche).
+Exemple : génération des interventions préventives, purge des contenus
+orphelins, déclenchement des rapports planifiés, sur N workers sans doublon.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index, Enum
+from datetime import datetime
+from app.db.database import Base
+from typing import Optional, Dict, Any
+import enum
+
+
+class TypePlanification(str, enum.Enum):
+    interval = "interval"
+    cron = "cron"
+
+
+class StatutExecution(str, enum.Enum):
+    en_cours = "en_cours"
+    succes = "succes"
+    echec = "echec"
+
+
+class ScheduledJob(Base):
+    """
+    Modèle ScheduledJob - État partagé d'une tâche récurrente.
+    - Déclarée dans le code (registre) : créée en base au premier démarrage,
+      sa planification y est réalignée à chaque démarrage (is_active et les
+      métriques restent gérés en base)
+    - next_run_at est avancé avant l'exécution par une mise à jour
+      conditionnelle : une échéance n'est exécutée qu'une fois, quel que
+      soit le nombre de workers
+    """
+    __tablename__ = "scheduled_jobs"
+    __allow_unmapped__ = True
+    __table_args__ = (
+        Index('idx_scheduled_job_due', 'is_active', 'next_run_at'),
+    )
+
+    id: int = Column(Integer, primary_key=True, index=True)
+    name: str = Column(String(100), nullable=False, unique=True, doc="Identifiant de la tâche dans le registre")
+    type_planification: TypePlanification = Column(Enum(TypePlanification), nullable=False)
+    interval_seconds: Optional[int] = Column(Integer, nullable=True)
+    cron_expression: Optional[str] = Column(String(100), nullable=True)
+    timezone: str = Column(String(50), default="UTC", nullable=False)
+    is_active: bool = Column(Boolean, default=True, nullable=False)
+    next_run_at: Optional[datetime] = Column(DateTime, nullable=True, doc="Prochaine échéance (UTC)")
+
+    # Métriques cumulées
+    last_run_at: Optional[datetime] = Column(DateTime, nullable=True)
+    last_status: Optional[StatutExecution] = Column(Enum(StatutExecution), nullable=True)
+    last_duration_ms: Optional[int] = Column(Integer, nullable=True)
+    last_error: Optional[str] = Column(Text, nullable=True)
+    run_count: int = Column(Integer, default=0, nullable=False)
+    error_count: int = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ScheduledJob(name='{self.name}', next_run_at={self.next_run_at})>"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "type_planification": self.type_planification.value,
+            "interval_seconds": self.interval_seconds,
+            "cron_expression": self.cron_expression,
+            "timezone": self.timezone,
+            "is_active": self.is_active,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_status": self.last_status.value if self.last_status else None,
+            "last_duration_ms": self.last_duration_ms,
+            "last_error": self.last_error,
+            "run_count": self.run_count,
+            "error_count": self.error_count,
+        }
+
+
+class JobRun(Base):
+    """
+    Modèle JobRun - Une exécution d'une tâche planifiée (durée, statut, worker).
+    """
+    __tablename__ = "job_runs"
+    __allow_unmapped__ = True
+    __table_args__ = (
+        Index('idx_job_run_name_start', 'job_name', 'started_at'),
+    )
+
+    id: int = Column(Integer, primary_key=True, index=True)
+    job_name: str = Column(String(100), nullable=False)
+    worker_id: str = Column(String(100), nullable=False, doc="Processus ayant exécuté la tâche")
+    scheduled_for: Optional[datetime] = Column(DateTime, nullable=True, doc="Échéance traitée")
+    started_at: datetime = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at: Optional[datetime] = Column(DateTime, nullable=True)
+    duration_ms: Optional[int] = Column(Integer, nullable=True)
+    status: StatutExecution = Column(Enum(StatutExecution), default=StatutExecution.en_cours, nullable=False)
+    error: Optional[str] = Column(Text, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<JobRun(job_name='{self.job_name}', status='{self.status.value}')>"
+
+
+class SchedulerLease(Base):
+    """
+    Modèle SchedulerLease - Bail de leader du planificateur.
+    Un seul worker le détient tant qu'il le renouvelle avant `expires_at`.
+    """
+    __tablename__ = "scheduler_leases"
+    __allow_unmapped__ = True
+
+    name: str = Column(String(100), primary_key=True)
+    holder: Optional[str] = Column(String(100), nullable=True)
+    expires_at: datetime = Column(DateTime, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<SchedulerLease(name='{self.name}', holder='{self.holder}')>"
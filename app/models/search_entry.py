@@ -0,0 +1,55 @@
+
+"""
+Modèle SearchEntry - Index plein texte des interventions, équipements et documents.
+Une ligne par objet indexé (source, source_id) : titre et contenu
+dénormalisés, tenus à jour par app.db.search_index.
+PostgreSQL : colonne tsvector `vecteur` (français, titre pondéré A, contenu B)
+et index GIN. SQLite (tests, développement local) : table FTS5
+search_entries_fts synchronisée par triggers.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, Index, UniqueConstraint, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from app.db.database import Base
+
+
+class SearchEntry(Base):
+    __tablename__ = "search_entries"
+    __allow_unmapped__ = True
+    __table_args__ = (
+        # Mise à jour et suppression des entrées d'un objet
+        UniqueConstraint('source', 'source_id', name='uq_search_entry_source'),
+        Index('idx_search_entry_vecteur', 'vecteur', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+
+    id: int = Column(Integer, primary_key=True)
+    source: str = Column(String(20), nullable=False, doc="intervention, equipement ou document")
+    source_id: int = Column(Integer, nullable=False)
+    titre: str = Column(String(255), nullable=False)
+    contenu: str = Column(Text, default="", nullable=False)
+    vecteur = Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True, doc="PostgreSQL uniquement")
+
+    def __repr__(self) -> str:
+        return f"<SearchEntry({self.source}:{self.source_id} '{self.titre}')>"
+
+
+# Repli SQLite : table FTS5 à contenu externe, alimentée par triggers
+_FTS5_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_entries_fts USING fts5("
+    "titre, contenu, content='search_entries', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS search_entries_ai AFTER INSERT ON search_entries BEGIN "
+    "INSERT INTO search_entries_fts(rowid, titre, contenu) VALUES (new.id, new.titre, new.contenu); END",
+    "CREATE TRIGGER IF NOT EXISTS search_entries_ad AFTER DELETE ON search_entries BEGIN "
+    "INSERT INTO search_entries_fts(search_entries_fts, rowid, titre, contenu) "
+    "VALUES ('delete', old.id, old.titre, old.contenu); END",
+    "CREATE TRIGGER IF NOT EXISTS search_entries_au AFTER UPDATE ON search_entries BEGIN "
+    "INSERT INTO search_entries_fts(search_entries_fts, rowid, titre, contenu) "
+    "VALUES ('delete', old.id, old.titre, old.contenu); "
+    "INSERT INTO search_entries_fts(rowid, titre, contenu) VALUES (new.id, new.titre, new.contenu); END",
+)
+for _statement in _FTS5_DDL:
+    event.listen(SearchEntry.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    SearchEntry.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS search_entries_fts").execute_if(dialect="sqlite"),
+)
@@ -0,0 +1,36 @@
+"""
+Modèles TableVersion / TableVersionIncrement - Version des données des
+tables sources de rapports (cache des rapports).
+Chaque transaction ayant modifié une table insère une ligne d'incrément
+(identifiant issu d'une séquence : aucun verrou partagé entre écrivains) ;
+le compactage périodique reporte les incréments dans le compteur de base.
+Version d'une table = compteur de base + nombre d'incréments visibles.
+"""
+
+from sqlalchemy import Column, Integer, BigInteger, String, Index
+from app.db.database import Base
+
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+    __allow_unmapped__ = True
+
+    table_name: str = Column(String(64), primary_key=True)
+    version: int = Column(BigInteger().with_variant(Integer, "sqlite"), nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<TableVersion(table_name='{self.table_name}', version={self.version})>"
+
+
+class TableVersionIncrement(Base):
+    __tablename__ = "table_version_increments"
+    __allow_unmapped__ = True
+    __table_args__ = (
+        Index('idx_table_version_increment_table', 'table_name'),
+    )
+
+    id: int = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    table_name: str = Column(String(64), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<TableVersionIncrement(table_name='{self.table_name}', id={self.id})>"
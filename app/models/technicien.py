@@ -19,10 +19,12 @@ Architecture:
 - Interface to_dict() standardisée pour API
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Table, DateTime, Boolean, Text, Enum, Index
+from sqlalchemy import Column, Integer, String, ForeignKey, Table, DateTime, Boolean, Text, Enum, Index, Float, select, func, cast
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
 from app.db.database import Base
+from app.db.sql_functions import valeur_hybride
 from typing import TYPE_CHECKING, Optional, Dict, Any, List
 import enum
 
@@ -241,6 +243,10 @@ class Technicien(Base):
         order_by="desc(Intervention.date_creation)"
     )
 
+    # KPI pré-calculés en lot (TechnicienStats), attachés par
+    # technicien_stats_service.attach_technicien_stats ; None = calcul à la demande
+    _stats = None
+
     def __repr__(self) -> str:
         """Représentation concise pour debugging."""
         return f"<Technicien(id={self.id}, user='{self.user.username if self.user else 'N/A'}', équipe='{self.equipe}', dispo='{self.disponibilite.value}')>"
@@ -297,11 +303,15 @@ class Technicien(Base):
     @property
     def nb_interventions_total(self) -> int:
         """Nombre total d'interventions assignées."""
+        if self._stats is not None:
+            return self._stats.nb_interventions_total
         return self.interventions.count()
 
     @property
     def nb_interventions_actives(self) -> int:
         """Nombre d'interventions actuellement actives."""
+        if self._stats is not None:
+            return self._stats.nb_interventions_actives
         return self.interventions.filter(
             Intervention.statut.in_([
                 StatutIntervention.affectee,
@@ -313,11 +323,15 @@ class Technicien(Base):
     @property
     def nb_interventions_en_cours(self) -> int:
         """Nombre d'interventions en cours d'exécution."""
+        if self._stats is not None:
+            return self._stats.nb_interventions_en_cours
         return self.interventions.filter_by(statut=StatutIntervention.en_cours).count()
 
     @property
     def nb_interventions_mois_courant(self) -> int:
         """Nombre d'interventions du mois en cours."""
+        if self._stats is not None:
+            return self._stats.nb_interventions_mois_courant
         debut_mois = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         return self.interventions.filter(
             Intervention.date_creation >= debut_mois
@@ -326,6 +340,8 @@ class Technicien(Base):
     @property
     def nb_interventions_terminees(self) -> int:
         """Nombre d'interventions terminées."""
+        if self._stats is not None:
+            return self._stats.nb_interventions_terminees
         return self.interventions.filter_by(statut=StatutIntervention.cloturee).count()
 
     @property
@@ -359,6 +375,8 @@ class Technicien(Base):
     @property
     def derniere_intervention_date(self) -> Optional[datetime]:
         """Date de la dernière intervention."""
+        if self._stats is not None:
+            return self._stats.derniere_intervention_date
         derniere = self.derniere_intervention
         return derniere.date_creation if derniere else None
 
@@ -370,6 +388,8 @@ class Technicien(Base):
     @property
     def taux_reussite(self) -> Optional[float]:
         """Taux de réussite basé sur les interventions clôturées."""
+        if self._stats is not None:
+            return self._stats.taux_reussite
         terminees = self.nb_interventions_terminees
         if terminees == 0:
             return None
@@ -389,22 +409,29 @@ class Technicien(Base):
                     
         return round(reussites / terminees * 100, 1)
 
-    @property
+    @hybrid_property
     def temps_moyen_intervention(self) -> Optional[float]:
-        """Temps moyen d'intervention en heures."""
-        interventions_avec_duree = self.interventions.filter(
-            Intervention.duree_reelle.isnot(None)
-        ).all()
-        
-        if not interventions_avec_duree:
-            return None
-            
-        total_minutes = sum(i.duree_reelle for i in interventions_avec_duree)
-        return round(total_minutes / len(interventions_avec_duree) / 60, 1)
+        """Temps moyen d'intervention en heures (AVG SQL de duree_reelle)."""
+        if self._stats is not None:
+            return self._stats.temps_moyen_intervention
+        valeur = valeur_hybride(self, Technicien.temps_moyen_intervention)
+        return round(valeur, 1) if valeur is not None else None
+
+    @temps_moyen_intervention.expression
+    def temps_moyen_intervention(cls):
+        return (
+            select(cast(func.avg(Intervention.duree_reelle) / 60.0, Float))
+            .where(Intervention.technicien_id == cls.id)
+            .correlate_except(Intervention)
+            .scalar_subquery()
+            .label("temps_moyen_intervention")
+        )
 
     @property
     def satisfaction_moyenne(self) -> Optional[float]:
         """Note de satisfaction moyenne des clients."""
+        if self._stats is not None:
+            return self._stats.satisfaction_moyenne
         interventions_notees = self.interventions.filter(
             Intervention.satisfaction_client.isnot(None)
         ).all()
@@ -461,11 +488,14 @@ class Technicien(Base):
     def score_affectation(self) -> int:
         """Score d'affectation pour algorithme automatique (0-100)."""
         score = 50  # Base
+        # Lus une seule fois : chaque accès peut coûter une requête
+        nb_actives = self.nb_interventions_actives
+        satisfaction = self.satisfaction_moyenne
         
         # Bonus disponibilité
         if self.est_disponible:
             score += 30
-        elif self.nb_interventions_actives <= 1:
+        elif nb_actives <= 1:
             score += 15
         else:
             score -= 20
@@ -483,9 +513,9 @@ class Technicien(Base):
         score += niveau_bonus.get(self.niveau_technicien, 0)
         
         # Bonus satisfaction
-        if self.satisfaction_moyenne and self.satisfaction_moyenne >= 4.5:
+        if satisfaction and satisfaction >= 4.5:
             score += 10
-        elif self.satisfaction_moyenne and self.satisfaction_moyenne <= 3.0:
+        elif satisfaction and satisfaction <= 3.0:
             score -= 10
             
         return max(0, min(100, score))
@@ -631,6 +661,20 @@ class Technicien(Base):
         Returns:
             Dict avec les KPI de performance
         """
+        stats = self._stats
+        if stats is not None and stats.periode_mois == nb_mois:
+            return {
+                "periode_mois": nb_mois,
+                "nb_interventions": stats.nb_interventions_periode,
+                "nb_terminees": stats.nb_terminees_periode,
+                "taux_completion": round(stats.nb_terminees_periode / stats.nb_interventions_periode * 100, 1) if stats.nb_interventions_periode else 0,
+                "taux_reussite": stats.taux_reussite,
+                "satisfaction_moyenne": stats.satisfaction_moyenne,
+                "temps_moyen_intervention": stats.temps_moyen_intervention,
+                "nb_urgentes_traitees": stats.nb_urgentes_periode,
+                "charge_moyenne": round(stats.nb_interventions_periode / nb_mois, 1),
+            }
+
         date_debut = datetime.utcnow() - timedelta(days=nb_mois * 30)
         
         interventions_periode = self.interventions.filter(
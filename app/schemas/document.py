@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime
 from app.db.database import Base
 
@@ -36,9 +36,42 @@ class DocumentOut(DocumentBase):
     id: int
     date_upload: datetime
     intervention_id: int
+    hash_sha256: Optional[str] = None  # SHA-256 hex du contenu
+    taille_octets: Optional[int] = None
+    # Images : URLs des miniatures/aperçus une fois générés, ex.
+    # {"thumbnail": {"webp": "...", "jpeg": "..."}, "preview": {...}}
+    derives: Optional[Dict[str, Dict[str, str]]] = None
 
     model_config = ConfigDict(
         from_attributes=True,
         validate_by_name=True,
         populate_by_name=True,
     )
+
+
+# ---------- CONTENU DÉDUPLIQUÉ ----------
+
+class DocumentBlobOut(BaseModel):
+    """
+    Pré-contrôle d'upload : contenu déjà stocké sous cette empreinte.
+    """
+    hash_sha256: str
+    taille_octets: int
+    ref_count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DocumentFromHash(BaseModel):
+    """
+    Association d'un contenu déjà stocké à une intervention (sans upload).
+    """
+    intervention_id: int
+    hash_sha256: str = Field(pattern=r"^[0-9a-f]{64}$")
+    nom_fichier: str = Field(alias="filename", min_length=1, max_length=255)
+
+    model_config = ConfigDict(validate_by_name=True, populate_by_name=True)
+
+
+class BlobGCResult(BaseModel):
+    supprimes: int
@@ -1,7 +1,7 @@
 # app/schemas/intervention.py
 
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -24,6 +24,13 @@ class PrioriteIntervention(str, Enum):
     basse = "basse"
     programmee = "programmee"
 
+class TriIntervention(str, Enum):
+    """Ordre de la recherche multicritère (préfixe "-" : décroissant)."""
+    date_creation_desc = "-date_creation"
+    date_creation = "date_creation"
+    date_limite = "date_limite"
+    date_limite_desc = "-date_limite"
+
 class InterventionBase(BaseModel):
     titre: str
     description: Optional[str] = None
@@ -51,3 +58,53 @@ class InterventionOut(InterventionBase):
     date_cloture: Optional[datetime] = None
     technicien_id: Optional[int]
     equipement_id: Optional[int] = None
+
+class InterventionListOut(BaseModel):
+    """Intervention dans une liste : colonnes scalaires, sans les textes longs (voir le détail)."""
+    id: int
+    titre: str
+    type_intervention: InterventionType = Field(..., alias="type")
+    statut: Optional[StatutIntervention] = None
+    priorite: Optional[PrioriteIntervention] = None
+    urgence: Optional[bool] = False
+    date_limite: Optional[datetime] = None
+    date_creation: datetime
+    date_cloture: Optional[datetime] = None
+    technicien_id: Optional[int] = None
+    equipement_id: Optional[int] = None
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        validate_by_name=True,
+        populate_by_name=True,
+    )
+
+# ---------- Affectation automatique des techniciens ----------
+
+class AffectationCandidat(BaseModel):
+    technicien_id: int
+    score: float
+
+class AffectationProposee(BaseModel):
+    """Technicien retenu pour une intervention (None si aucun candidat) et classement des candidats."""
+    intervention_id: int
+    technicien_id: Optional[int] = None
+    score: Optional[float] = None
+    candidats: List[AffectationCandidat] = []
+
+class AffectationPropositionRequest(BaseModel):
+    # None : toutes les interventions ouvertes
+    intervention_ids: Optional[List[int]] = None
+    top_k: int = Field(default=3, ge=1, le=20)
+
+class AffectationItem(BaseModel):
+    intervention_id: int
+    technicien_id: int
+
+class AffectationBulkRequest(BaseModel):
+    """
+    Affectations explicites, ou à défaut calcul automatique sur
+    `intervention_ids` (toutes les interventions ouvertes si absent).
+    """
+    affectations: Optional[List[AffectationItem]] = None
+    intervention_ids: Optional[List[int]] = None
@@ -34,11 +34,14 @@ class NotificationOut(NotificationBase):
     """
     Schéma renvoyé par l’API avec métadonnées :
     - date d’envoi, ids liés
+    - état d'envoi (en_attente, envoyee, echec) et nombre de tentatives
     """
     id: int
     date_envoi: datetime
     intervention_id: int
     user_id: int
+    statut_envoi: Optional[str] = None
+    tentatives: int = 0
 
     # Pydantic v2 config for from_attributes + validate by field name
     model_config = {
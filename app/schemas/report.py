@@ -32,6 +32,15 @@ class ReportType(str, Enum):
     FINANCIAL = "financial"
 
 
+class ReportStatus(str, Enum):
+    """Statut de génération d'un rapport"""
+    PENDING = "pending"
+    GENERATING = "generating"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    EXPIRED = "expired"
+
+
 class ReportPeriod(str, Enum):
     """Périodes prédéfinies pour les rapports"""
     TODAY = "today"
@@ -256,4 +265,24 @@ class ReportError(BaseModel):
     error_code: str
     error_message: str
     details: Optional[Dict[str, Any]] = None
-    timestamp: datetime
\ No newline at end of file
+    timestamp: datetime
+
+class ReportStatusOut(BaseModel):
+    """État d'un rapport demandé : génération, fichier produit, téléchargement"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    report_type: ReportType
+    report_format: ReportFormat
+    status: ReportStatus
+    date_creation: datetime
+    date_generation_start: Optional[datetime] = None
+    date_generation_end: Optional[datetime] = None
+    date_expiration: Optional[datetime] = None
+    generation_duration: Optional[int] = Field(None, description="Durée de génération (secondes)")
+    file_name: Optional[str] = None
+    file_size: Optional[int] = None
+    error_message: Optional[str] = None
+    download_count: int = 0
+    download_url: Optional[str] = None
@@ -0,0 +1,46 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from app.models.scheduler import TypePlanification, StatutExecution
+
+
+# ---------- RÉPONSE API ----------
+
+class ScheduledJobOut(BaseModel):
+    """
+    État partagé d'une tâche planifiée :
+    - planification (intervalle ou cron) et prochaine échéance
+    - métriques cumulées : dernière exécution, durée, nombre d'exécutions/échecs
+    """
+    name: str
+    type_planification: TypePlanification
+    interval_seconds: Optional[int] = None
+    cron_expression: Optional[str] = None
+    timezone: str
+    is_active: bool
+    next_run_at: Optional[datetime] = None
+    last_run_at: Optional[datetime] = None
+    last_status: Optional[StatutExecution] = None
+    last_duration_ms: Optional[int] = None
+    last_error: Optional[str] = None
+    run_count: int
+    error_count: int
+
+    model_config = {"from_attributes": True}
+
+
+class JobRunOut(BaseModel):
+    """
+    Une exécution d'une tâche planifiée (worker, échéance, durée, statut)
+    """
+    id: int
+    job_name: str
+    worker_id: str
+    scheduled_for: Optional[datetime] = None
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    duration_ms: Optional[int] = None
+    status: StatutExecution
+    error: Optional[str] = None
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,18 @@
+# app/schemas/search.py
+
+from pydantic import BaseModel, Field
+from enum import Enum
+
+
+class SourceRecherche(str, Enum):
+    intervention = "intervention"
+    equipement = "equipement"
+    document = "document"
+
+
+class SearchResult(BaseModel):
+    """Résultat de la recherche plein texte, du plus pertinent au moins pertinent."""
+    type: SourceRecherche = Field(..., description="Nature de l'objet trouvé")
+    id: int = Field(..., description="Identifiant de l'objet (intervention, équipement ou document)")
+    titre: str
+    score: float = Field(..., description="Pertinence (comparable au sein d'une même recherche)")
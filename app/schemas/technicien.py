@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from datetime import datetime
 from typing import List, Optional
 from app.schemas.user import UserOut
 
@@ -49,3 +50,32 @@ class TechnicienOut(TechnicienBase):
     model_config = {
         "from_attributes": True
     }
+
+# ---------- Statistiques (KPI) des techniciens ----------
+
+class TechnicienStats(BaseModel):
+    """
+    KPI agrégés d'un technicien, calculés en lot par technicien_stats_service.
+
+    Les champs `*_periode` portent sur les `periode_mois` derniers mois
+    (rapport de performance).
+    """
+    technicien_id: int
+    nb_interventions_total: int = 0
+    nb_interventions_actives: int = 0
+    nb_interventions_en_cours: int = 0
+    nb_interventions_mois_courant: int = 0
+    nb_interventions_terminees: int = 0
+    taux_reussite: Optional[float] = None
+    temps_moyen_intervention: Optional[float] = None  # en heures
+    satisfaction_moyenne: Optional[float] = None
+    derniere_intervention_date: Optional[datetime] = None
+
+    periode_mois: int = 6
+    nb_interventions_periode: int = 0
+    nb_terminees_periode: int = 0
+    nb_urgentes_periode: int = 0
+
+    model_config = {
+        "from_attributes": True
+    }
@@ -0,0 +1,310 @@
+# app/services/affectation_service.py
+
+"""
+Affectation automatique des techniciens aux interventions.
+
+Les données des techniciens (disponibilité, charge active, compétences et
+niveaux, zone, satisfaction) sont chargées une seule fois en tableaux
+colonnes ; la matrice des scores interventions x techniciens est calculée
+en une passe numpy. L'attribution est ensuite gloutonne, intervention par
+intervention (urgences d'abord), en tenant compte de la charge ajoutée.
+
+Le score de base reprend les règles de Technicien.score_affectation ; la
+compétence requise est déduite du type d'équipement de l'intervention
+(comparé au domaine ou au nom des compétences du technicien).
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import Session
+
+from app.models.equipement import Equipement
+from app.models.historique import HistoriqueIntervention
+from app.models.intervention import Intervention, StatutIntervention, PrioriteIntervention
+from app.models.technicien import (
+    Technicien, Competence, DisponibiliteTechnicien, NiveauCompetence, technicien_competence
+)
+from app.schemas.intervention import AffectationCandidat, AffectationItem, AffectationProposee
+
+STATUTS_ACTIFS = (
+    StatutIntervention.affectee,
+    StatutIntervention.en_cours,
+    StatutIntervention.en_attente,
+)
+STATUTS_AFFECTABLES = (StatutIntervention.ouverte, StatutIntervention.affectee)
+
+# Au-delà, le technicien est "Surchargé" (cf. Technicien.charge_travail_actuelle)
+CHARGE_MAX = 5
+# Pénalité par intervention déjà attribuée au technicien dans le même lot
+PENALITE_CHARGE_LOT = 10.0
+
+RANG_NIVEAU = {
+    NiveauCompetence.debutant: 1,
+    NiveauCompetence.intermediaire: 2,
+    NiveauCompetence.avance: 3,
+    NiveauCompetence.expert: 4,
+}
+BONUS_NIVEAU = {
+    NiveauCompetence.expert: 15,
+    NiveauCompetence.avance: 10,
+    NiveauCompetence.intermediaire: 5,
+    NiveauCompetence.debutant: 0,
+}
+RANG_PRIORITE = {
+    PrioriteIntervention.urgente: 0,
+    PrioriteIntervention.haute: 1,
+    PrioriteIntervention.normale: 2,
+    PrioriteIntervention.basse: 3,
+    PrioriteIntervention.programmee: 4,
+}
+
+
+class _Techniciens:
+    """Techniciens actifs en tableaux colonnes (index = position dans `ids`)."""
+
+    def __init__(self, db: Session):
+        rows = db.execute(
+            select(
+                Technicien.id, Technicien.disponibilite, Technicien.niveau_technicien,
+                Technicien.astreinte, Technicien.zone_intervention,
+            ).where(Technicien.is_active.is_(True)).order_by(Technicien.id)
+        ).all()
+        self.ids = np.array([r.id for r in rows], dtype=np.int64)
+        self.position = {int(tid): i for i, tid in enumerate(self.ids)}
+        n = len(rows)
+
+        dispo = [r.disponibilite for r in rows]
+        self.disponible = np.array([d == DisponibiliteTechnicien.disponible for d in dispo], dtype=bool)
+        # Un technicien occupé reste affectable (file d'attente), pas en congé/formation
+        self.affectable = np.array(
+            [d in (DisponibiliteTechnicien.disponible, DisponibiliteTechnicien.occupe) for d in dispo],
+            dtype=bool
+        )
+        self.astreinte = np.array([bool(r.astreinte) for r in rows], dtype=bool)
+        self.bonus_niveau = np.array([BONUS_NIVEAU.get(r.niveau_technicien, 0) for r in rows], dtype=np.float64)
+        self.zones = [(r.zone_intervention or "").lower() for r in rows]
+
+        self.charge = np.zeros(n, dtype=np.int64)
+        self.satisfaction = np.full(n, np.nan)
+        self.nb_competences = np.zeros(n, dtype=np.int64)
+        # Compétences : clé (domaine ou nom en minuscules) -> rang de niveau par technicien
+        self.competences: Dict[str, np.ndarray] = {}
+        if not n:
+            return
+
+        ids = self.ids.tolist()
+        for r in db.execute(
+            select(
+                Intervention.technicien_id,
+                func.count(case((Intervention.statut.in_(STATUTS_ACTIFS), 1))).label("actives"),
+                func.avg(Intervention.satisfaction_client).label("satisfaction"),
+            )
+            .where(Intervention.technicien_id.in_(ids))
+            .group_by(Intervention.technicien_id)
+        ):
+            i = self.position[r.technicien_id]
+            self.charge[i] = r.actives
+            if r.satisfaction is not None:
+                self.satisfaction[i] = float(r.satisfaction)
+
+        for r in db.execute(
+            select(
+                technicien_competence.c.technicien_id,
+                technicien_competence.c.niveau,
+                Competence.nom,
+                Competence.domaine,
+            )
+            .join(Competence, Competence.id == technicien_competence.c.competence_id)
+            .where(technicien_competence.c.technicien_id.in_(ids))
+        ):
+            i = self.position[r.technicien_id]
+            self.nb_competences[i] += 1
+            rang = RANG_NIVEAU.get(r.niveau, 2)
+            for cle in {(r.nom or "").lower(), (r.domaine or "").lower()} - {""}:
+                niveaux = self.competences.setdefault(cle, np.zeros(n, dtype=np.int64))
+                niveaux[i] = max(niveaux[i], rang)
+
+    def score_base(self) -> np.ndarray:
+        """Version vectorisée de Technicien.score_affectation."""
+        score = np.full(len(self.ids), 50.0)
+        score += np.where(self.disponible, 30, np.where(self.charge <= 1, 15, -20))
+        score += np.minimum(self.nb_competences * 5, 20)
+        score += self.bonus_niveau
+        with np.errstate(invalid="ignore"):
+            score += np.where(self.satisfaction >= 4.5, 10, np.where(self.satisfaction <= 3.0, -10, 0))
+        return np.clip(score, 0, 100)
+
+
+def _charger_interventions(db: Session, intervention_ids: Optional[Sequence[int]]) -> list:
+    stmt = (
+        select(
+            Intervention.id, Intervention.priorite, Intervention.urgence,
+            Intervention.date_limite, Intervention.date_creation,
+            Equipement.type_equipement, Equipement.localisation,
+        )
+        .outerjoin(Equipement, Equipement.id == Intervention.equipement_id)
+    )
+    if intervention_ids is None:
+        stmt = stmt.where(Intervention.statut == StatutIntervention.ouverte)
+    else:
+        stmt = stmt.where(
+            Intervention.id.in_(list(intervention_ids)),
+            Intervention.statut.in_(STATUTS_AFFECTABLES),
+        )
+    rows = db.execute(stmt).all()
+    # Ordre de traitement : urgences, priorité, échéance, ancienneté
+    rows.sort(key=lambda r: (
+        not (r.urgence or r.priorite == PrioriteIntervention.urgente),
+        RANG_PRIORITE.get(r.priorite, 2),
+        r.date_limite or datetime.max,
+        r.date_creation or datetime.max,
+    ))
+    return rows
+
+
+def _matrice_scores(techs: _Techniciens, interventions: list) -> np.ndarray:
+    """
+    Scores (interventions x techniciens) ; -inf pour un couple infaisable
+    (technicien non affectable, hors zone, ou urgence non prenable).
+    """
+    n_i, n_t = len(interventions), len(techs.ids)
+
+    # Compétences : bonus selon le niveau, pénalité si la compétence manque
+    domaines = [(r.type_equipement or "").lower() for r in interventions]
+    competence = np.zeros((n_i, n_t))
+    for cle in set(domaines) - {""}:
+        lignes = np.array([d == cle for d in domaines], dtype=bool)
+        niveaux = techs.competences.get(cle, np.zeros(n_t, dtype=np.int64))
+        competence[lignes] = np.where(niveaux > 0, 5.0 * niveaux, -30.0)
+
+    # Zones : sous-chaîne comme Technicien.est_dans_zone, évaluée une fois
+    # par couple (localisation, zone) distinct puis indexée
+    localisations = sorted({(r.localisation or "").lower() for r in interventions})
+    zones = sorted(set(techs.zones))
+    dans_zone = np.array(
+        [[(not z) or (not loc) or (loc in z) for z in zones] for loc in localisations],
+        dtype=bool
+    ).reshape(len(localisations), len(zones))
+    idx_loc = np.array([localisations.index((r.localisation or "").lower()) for r in interventions], dtype=np.int64)
+    idx_zone = np.array([zones.index(z) for z in techs.zones], dtype=np.int64)
+    zone_ok = dans_zone[idx_loc[:, None], idx_zone[None, :]]
+
+    urgente = np.array(
+        [bool(r.urgence) or r.priorite == PrioriteIntervention.urgente for r in interventions],
+        dtype=bool
+    )
+    peut_urgence = techs.disponible | ((techs.charge <= 1) & techs.astreinte)
+
+    faisable = techs.affectable[None, :] & zone_ok & (~urgente[:, None] | peut_urgence[None, :])
+    scores = techs.score_base()[None, :] + competence
+    return np.where(faisable, scores, -np.inf)
+
+
+def proposer_affectations(
+    db: Session,
+    intervention_ids: Optional[Sequence[int]] = None,
+    top_k: int = 3,
+) -> List[AffectationProposee]:
+    """
+    Calcule les affectations proposées pour un lot d'interventions affectables
+    (toutes les interventions ouvertes si `intervention_ids` est None).
+
+    Returns:
+        Une proposition par intervention, dans l'ordre de traitement, avec
+        les `top_k` meilleurs candidats au moment de son attribution.
+    """
+    interventions = _charger_interventions(db, intervention_ids)
+    if not interventions:
+        return []
+    techs = _Techniciens(db)
+    if not len(techs.ids):
+        return [AffectationProposee(intervention_id=r.id) for r in interventions]
+
+    scores = _matrice_scores(techs, interventions)
+    ajoutees = np.zeros(len(techs.ids), dtype=np.int64)
+    propositions = []
+    for ligne, r in zip(scores, interventions):
+        courant = ligne - PENALITE_CHARGE_LOT * ajoutees
+        courant[techs.charge + ajoutees >= CHARGE_MAX] = -np.inf
+        ordre = np.argsort(-courant, kind="stable")[:top_k]
+        candidats = [
+            AffectationCandidat(technicien_id=int(techs.ids[j]), score=round(float(courant[j]), 1))
+            for j in ordre if np.isfinite(courant[j])
+        ]
+        if candidats:
+            ajoutees[ordre[0]] += 1
+            propositions.append(AffectationProposee(
+                intervention_id=r.id,
+                technicien_id=candidats[0].technicien_id,
+                score=candidats[0].score,
+                candidats=candidats,
+            ))
+        else:
+            propositions.append(AffectationProposee(intervention_id=r.id))
+    return propositions
+
+
+def appliquer_affectations(
+    db: Session,
+    affectations: Sequence[AffectationItem],
+    user_id: int,
+    remarque: str = "Affectation en lot",
+) -> List[Intervention]:
+    """
+    Applique les affectations via Intervention.affecter_technicien et les
+    historise, en une seule transaction (tout ou rien).
+
+    Raises:
+        HTTPException 404: intervention ou technicien introuvable
+        HTTPException 400: intervention non affectable
+    """
+    if not affectations:
+        return []
+    intervention_ids = {a.intervention_id for a in affectations}
+    technicien_ids = {a.technicien_id for a in affectations}
+    interventions = {
+        i.id: i for i in db.execute(
+            select(Intervention).where(Intervention.id.in_(intervention_ids))
+        ).scalars()
+    }
+    techniciens_connus = set(db.execute(
+        select(Technicien.id).where(Technicien.id.in_(technicien_ids))
+    ).scalars())
+
+    try:
+        resultat = []
+        for a in affectations:
+            intervention = interventions.get(a.intervention_id)
+            if intervention is None:
+                raise HTTPException(status_code=404, detail=f"Intervention {a.intervention_id} introuvable")
+            if a.technicien_id not in techniciens_connus:
+                raise HTTPException(status_code=404, detail=f"Technicien {a.technicien_id} introuvable")
+            if not intervention.peut_etre_affectee():
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"L'intervention {a.intervention_id} ne peut pas être affectée (statut {intervention.statut.value})"
+                )
+            intervention.affecter_technicien(a.technicien_id, user_id=user_id)
+            db.add(HistoriqueIntervention(
+                statut=intervention.statut,
+                remarque=f"{remarque} : technicien #{a.technicien_id}",
+                horodatage=datetime.utcnow(),
+                user_id=user_id,
+                intervention_id=intervention.id,
+            ))
+            resultat.append(intervention)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    # Rechargement des interventions expirées par le commit : une requête pour le lot
+    db.execute(
+        select(Intervention)
+        .where(Intervention.id.in_(intervention_ids))
+        .execution_options(populate_existing=True)
+    ).scalars().all()
+    return resultat
@@ -2,33 +2,37 @@
 
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
 from app.models.user import User
 from app.schemas.user import TokenResponse
-from app.core.security import verify_password, create_access_token
+from app.core.security import verify_and_update_password_async, create_access_token
 
-def authenticate_user(db: Session, email: str, password: str) -> TokenResponse:
-    """
-    Authentifie un utilisateur avec email et mot de passe.
-    Retourne un JWT Token si succès.
+def _find_user(db: Session, column, value) -> Optional[User]:
+    return db.query(User).filter(column == value).first()
 
-    Args:
-        db (Session): Session SQLAlchemy.
-        email (str): Email de l'utilisateur.
-        password (str): Mot de passe brut.
+def _save_rehash(db: Session, user: User, new_hash: str) -> None:
+    user.hashed_password = new_hash
+    db.commit()
 
-    Returns:
-        TokenResponse: Token JWT pour accès API.
+async def _authenticate(db: Session, column, value: str, password: str, error_detail: str) -> TokenResponse:
+    """
+    Vérifie les identifiants et émet le JWT.
 
-    Raises:
-        HTTPException: 401 si credentials invalides.
-        HTTPException: 403 si compte désactivé.
+    Les accès DB (Session synchrone) passent par le threadpool, la
+    vérification bcrypt par le pool de hachage dédié : la boucle
+    d'événements n'est jamais bloquée. Un hash aux paramètres dépréciés
+    est remplacé de manière transparente après un login réussi.
     """
-    user = db.query(User).filter(User.email == email).first()
+    user = await run_in_threadpool(_find_user, db, column, value)
 
-    if not user or not verify_password(password, user.hashed_password):
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Email ou mot de passe incorrect"
+            detail=error_detail
         )
 
     if not user.is_active:
@@ -37,39 +41,46 @@ def authenticate_user(db: Session, email: str, password: str) -> TokenResponse:
             detail="Compte désactivé"
         )
 
-    access_token = create_access_token(
-        data={
-            "sub": user.email,    # Identifiant principal (RFC JWT)
-            "role": user.role,    # Rôle RBAC
-            "user_id": user.id    # Id utilisateur unique (utile pour tracking)
-        }
-    )
+    # Claims lus avant le rehash : le commit expire l'instance, une relecture
+    # ferait un chargement paresseux (I/O bloquante) sur la boucle d'événements
+    claims = {
+        "sub": user.email,    # Identifiant principal (RFC JWT)
+        "role": user.role,    # Rôle RBAC
+        "user_id": user.id    # Id utilisateur unique (utile pour tracking)
+    }
+
+    if new_hash:
+        await run_in_threadpool(_save_rehash, db, user, new_hash)
+
+    access_token = create_access_token(data=claims)
 
     # ✅ Correction : retourner aussi token_type="bearer" pour compatibilité Pydantic/Swagger
     return TokenResponse(access_token=access_token, token_type="bearer")
 
-def authenticate_user_by_username(db: Session, username: str, password: str) -> TokenResponse:
+async def authenticate_user(db: Session, email: str, password: str) -> TokenResponse:
+    """
+    Authentifie un utilisateur avec email et mot de passe.
+    Retourne un JWT Token si succès.
+
+    Args:
+        db (Session): Session SQLAlchemy.
+        email (str): Email de l'utilisateur.
+        password (str): Mot de passe brut.
+
+    Returns:
+        TokenResponse: Token JWT pour accès API.
+
+    Raises:
+        HTTPException: 401 si credentials invalides.
+        HTTPException: 403 si compte désactivé.
+        HTTPException: 503 si le pool de hachage est saturé.
+    """
+    return await _authenticate(db, User.email, email, password, "Email ou mot de passe incorrect")
+
+async def authenticate_user_by_username(db: Session, username: str, password: str) -> TokenResponse:
     """
     Authentifie via username + password (compatibilité tests legacy).
 
     Retourne un JWT identique à authenticate_user.
     """
-    user = db.query(User).filter(User.username == username).first()
-    if not user or not verify_password(password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Identifiants invalides"
-        )
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Compte désactivé"
-        )
-    access_token = create_access_token(
-        data={
-            "sub": user.email,
-            "role": user.role,
-            "user_id": user.id,
-        }
-    )
-    return TokenResponse(access_token=access_token, token_type="bearer")
+    return await _authenticate(db, User.username, username, password, "Identifiants invalides")
@@ -0,0 +1,186 @@
+# app/services/dashboard_service.py
+
+"""
+KPI du tableau de bord par rôle, lus dans les compteurs maintenus par
+app.db.dashboard_counters : une requête de compteurs par portée (plus
+quelques comptages sur des tables de référentiel pour l'administrateur),
+quel que soit le volume d'interventions.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple, Union
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.dashboard_counters import (
+    METRIC_CLOTUREES,
+    METRIC_CREEES,
+    METRIC_ECHEANCE,
+    SCOPE_CLIENT,
+    SCOPE_GLOBAL,
+    SCOPE_TECHNICIEN,
+    STATUTS_ACTIFS,
+    heure,
+    mois,
+    statut_metric,
+)
+from app.models.client import Client
+from app.models.contrat import Contrat, StatutContrat
+from app.models.dashboard import DashboardCounter
+from app.models.equipement import CriticiteEquipement, Equipement
+from app.models.intervention import StatutIntervention
+from app.models.technicien import DisponibiliteTechnicien, Technicien
+from app.models.user import User
+from app.schemas.dashboard import KPIAdmin, KPIClient, KPIResponsable, KPITechnicien
+
+STATUTS_ASSIGNES = (StatutIntervention.affectee, StatutIntervention.en_cours, StatutIntervention.en_attente)
+
+
+class _Compteurs:
+    """Compteurs d'une portée : statuts, mois courant et précédent, échéances jusqu'à J+7."""
+
+    def __init__(self, db: Session, scope: str, scope_id: int, now: datetime):
+        self.now = now
+        self.mois_courant = mois(now)
+        self.mois_precedent = mois(now.replace(day=1) - timedelta(days=1))
+        self.heure_courante = heure(now)
+        self.horizon = heure(now + timedelta(days=7))
+        rows = db.execute(
+            select(DashboardCounter.metric, DashboardCounter.periode, DashboardCounter.valeur).where(
+                DashboardCounter.scope == scope,
+                DashboardCounter.scope_id == scope_id,
+                or_(
+                    DashboardCounter.periode == "",
+                    and_(
+                        DashboardCounter.metric.in_([METRIC_CREEES, METRIC_CLOTUREES]),
+                        DashboardCounter.periode.in_([self.mois_courant, self.mois_precedent]),
+                    ),
+                    and_(DashboardCounter.metric == METRIC_ECHEANCE, DashboardCounter.periode < self.horizon),
+                ),
+            )
+        ).all()
+        self.valeurs: Dict[Tuple[str, str], int] = {}
+        self.echeances: Dict[str, int] = {}
+        for metric, periode, valeur in rows:
+            if metric == METRIC_ECHEANCE:
+                self.echeances[periode] = valeur
+            else:
+                self.valeurs[(metric, periode)] = valeur
+
+    def statut(self, *statuts: StatutIntervention) -> int:
+        return sum(self.valeurs.get((statut_metric(statut), ""), 0) for statut in statuts)
+
+    def mensuel(self, metric: str, precedent: bool = False) -> int:
+        return self.valeurs.get((metric, self.mois_precedent if precedent else self.mois_courant), 0)
+
+    @property
+    def en_retard(self) -> int:
+        """Interventions actives dont l'échéance est passée (à l'heure près)."""
+        return sum(v for periode, v in self.echeances.items() if periode < self.heure_courante)
+
+    @property
+    def echeances_semaine(self) -> int:
+        return sum(v for periode, v in self.echeances.items() if periode >= self.heure_courante)
+
+    @property
+    def evolution(self) -> float:
+        precedent = self.mensuel(METRIC_CREEES, precedent=True)
+        if not precedent:
+            return 0.0
+        return round((self.mensuel(METRIC_CREEES) - precedent) * 100 / precedent, 1)
+
+    def kpi_base(self) -> Dict[str, object]:
+        return {
+            "interventions_ouvertes": self.statut(StatutIntervention.ouverte),
+            "interventions_en_cours": self.statut(StatutIntervention.en_cours),
+            "interventions_en_retard": self.en_retard,
+            "interventions_cloturees_mois": self.mensuel(METRIC_CLOTUREES),
+            "evolution_interventions": self.evolution,
+        }
+
+
+def _charge(nb_actives: int, nb_techniciens: int = 1) -> float:
+    capacite = settings.DASHBOARD_CAPACITE_TECHNICIEN * max(nb_techniciens, 1)
+    return round(min(nb_actives * 100 / capacite, 100.0), 1)
+
+
+def _count(db: Session, *conditions) -> int:
+    return db.execute(select(func.count()).where(*conditions)).scalar_one()
+
+
+def kpi_admin(db: Session, now: Optional[datetime] = None) -> KPIAdmin:
+    compteurs = _Compteurs(db, SCOPE_GLOBAL, 0, now or datetime.utcnow())
+    return KPIAdmin(
+        **compteurs.kpi_base(),
+        nb_utilisateurs_actifs=_count(db, User.is_active.is_(True)),
+        nb_techniciens_disponibles=_count(
+            db, Technicien.is_active.is_(True), Technicien.disponibilite == DisponibiliteTechnicien.disponible
+        ),
+        nb_clients_actifs=_count(db, Client.is_active.is_(True)),
+        nb_equipements_total=_count(db, Equipement.id.isnot(None)),
+        nb_equipements_critique=_count(db, Equipement.criticite == CriticiteEquipement.critique),
+    )
+
+
+def kpi_responsable(db: Session, now: Optional[datetime] = None) -> KPIResponsable:
+    compteurs = _Compteurs(db, SCOPE_GLOBAL, 0, now or datetime.utcnow())
+    nb_techniciens = _count(db, Technicien.is_active.is_(True))
+    # Interventions actives assignées, toutes portées technicien confondues
+    assignees = db.execute(
+        select(func.coalesce(func.sum(DashboardCounter.valeur), 0)).where(
+            DashboardCounter.scope == SCOPE_TECHNICIEN,
+            DashboardCounter.metric.in_([statut_metric(statut) for statut in STATUTS_ACTIFS]),
+        )
+    ).scalar_one()
+    return KPIResponsable(
+        **compteurs.kpi_base(),
+        nb_techniciens_equipe=nb_techniciens,
+        charge_moyenne_techniciens=_charge(assignees, nb_techniciens),
+        interventions_planifiees_semaine=compteurs.echeances_semaine,
+    )
+
+
+def kpi_technicien(db: Session, technicien_id: int, now: Optional[datetime] = None) -> KPITechnicien:
+    compteurs = _Compteurs(db, SCOPE_TECHNICIEN, technicien_id, now or datetime.utcnow())
+    return KPITechnicien(
+        technicien_id=technicien_id,
+        mes_interventions_ouvertes=compteurs.statut(StatutIntervention.ouverte, StatutIntervention.affectee),
+        mes_interventions_en_cours=compteurs.statut(StatutIntervention.en_cours),
+        mes_interventions_cloturees_mois=compteurs.mensuel(METRIC_CLOTUREES),
+        ma_charge_travail=_charge(compteurs.statut(*STATUTS_ACTIFS)),
+        prochaines_interventions=compteurs.echeances_semaine,
+    )
+
+
+def kpi_client(db: Session, client_id: int, now: Optional[datetime] = None) -> KPIClient:
+    compteurs = _Compteurs(db, SCOPE_CLIENT, client_id, now or datetime.utcnow())
+    return KPIClient(
+        client_id=client_id,
+        mes_interventions_ouvertes=compteurs.statut(StatutIntervention.ouverte, StatutIntervention.affectee),
+        mes_interventions_en_cours=compteurs.statut(StatutIntervention.en_cours, StatutIntervention.en_attente),
+        mes_interventions_terminees_mois=compteurs.mensuel(METRIC_CLOTUREES),
+        contrats_actifs=_count(db, Contrat.client_id == client_id, Contrat.statut == StatutContrat.en_cours),
+    )
+
+
+def get_kpi_for_user(db: Session, user: dict) -> Union[KPIAdmin, KPIResponsable, KPITechnicien, KPIClient]:
+    """KPI correspondant au rôle de l'utilisateur courant."""
+    role = user.get("role")
+    if role == "admin":
+        return kpi_admin(db)
+    if role == "responsable":
+        return kpi_responsable(db)
+    if role == "technicien":
+        technicien_id = db.execute(select(Technicien.id).where(Technicien.user_id == user.get("user_id"))).scalar()
+        if technicien_id is None:
+            raise HTTPException(status_code=404, detail="Profil technicien introuvable")
+        return kpi_technicien(db, technicien_id)
+    if role == "client":
+        client_id = db.execute(select(Client.id).where(Client.user_id == user.get("user_id"))).scalar()
+        if client_id is None:
+            raise HTTPException(status_code=404, detail="Profil client introuvable")
+        return kpi_client(db, client_id)
+    raise HTTPException(status_code=403, detail="Rôle non pris en charge")
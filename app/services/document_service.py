@@ -1,60 +1,469 @@
 # app/services/document_service.py
 
+import hashlib
 import os
+import shutil
+from dataclasses import dataclass
+from typing import Optional
 from uuid import uuid4
 from fastapi import UploadFile, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update, delete, case, func, exists, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from datetime import datetime
-from app.models.document import Document
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.models.document import Document, DocumentBlob, StatutDerives, DERIVE_TAILLES, DERIVE_FORMATS
 from app.models.intervention import Intervention
+from app.models.technicien import Technicien
+from app.models.client import Client
+from app.schemas.document import DocumentFromHash
+from app.tasks.derivative_tasks import is_image, derive_dir, derive_path, enqueue_derivatives
 
-UPLOAD_DIR = "app/static/uploads"
+UPLOAD_DIR = settings.UPLOAD_DIRECTORY
 
+# Contenus dédupliqués : uploads/blobs/<2 car.>/<2 car.>/<sha256>
+BLOB_DIRNAME = "blobs"
 
-def save_uploaded_file(file: UploadFile) -> str:
-    """
-    Sauvegarde physique d’un fichier uploadé dans le dossier `uploads/`.
 
-    Returns:
-        str: chemin relatif à stocker en base (ex: uploads/abcd1234.png)
+@dataclass
+class StoredFile:
+    chemin: str  # relatif à stocker en base (ex: uploads/blobs/ab/cd/abcd...)
+    hash_sha256: str
+    taille_octets: int
+    tmp_path: str  # fichier reçu, renommé sous son empreinte par _attach_document
+
+
+def blob_relative_path(hash_sha256: str) -> str:
+    """Chemin d'un contenu relatif à UPLOAD_DIR (deux niveaux de répertoires)."""
+    return f"{BLOB_DIRNAME}/{hash_sha256[:2]}/{hash_sha256[2:4]}/{hash_sha256}"
+
+
+def _blob_file_path(hash_sha256: str) -> str:
+    return os.path.join(UPLOAD_DIR, *blob_relative_path(hash_sha256).split("/"))
+
+
+def _write_chunk(out, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    out.write(chunk)
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Fichier trop volumineux (maximum {settings.UPLOAD_MAX_BYTES} octets)"
+    )
+
+
+async def save_uploaded_file(file: UploadFile) -> StoredFile:
     """
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    Sauvegarde physique d’un fichier uploadé dans le stockage par contenu.
 
-    extension = os.path.splitext(file.filename)[1]
+    Le contenu est copié par blocs (UPLOAD_CHUNK_SIZE) dans un fichier
+    temporaire en calculant le SHA-256 au fil de l'eau. Le renommage
+    sous l'empreinte est fait par _attach_document, ligne du contenu
+    verrouillée : le GC ne peut pas supprimer le fichier entre-temps.
+    L'appelant supprime le fichier temporaire s'il n'a pas été renommé.
+
+    Raises:
+        HTTPException 400: fichier sans extension
+        HTTPException 413: taille supérieure à UPLOAD_MAX_BYTES
+    """
+    extension = os.path.splitext(file.filename or "")[1]
     if not extension:
         raise HTTPException(status_code=400, detail="Le fichier doit avoir une extension valide")
+    # Taille connue d'avance (multipart déjà reçu) : refus sans copie
+    if file.size is not None and file.size > settings.UPLOAD_MAX_BYTES:
+        raise _too_large()
+
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    tmp_path = os.path.join(UPLOAD_DIR, f".{uuid4().hex}.part")
+
+    hasher = hashlib.sha256()
+    taille = 0
+    try:
+        with open(tmp_path, "wb") as out:
+            while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                taille += len(chunk)
+                if taille > settings.UPLOAD_MAX_BYTES:
+                    raise _too_large()
+                # Hachage et écriture hors de la boucle d'événements
+                await run_in_threadpool(_write_chunk, out, hasher, chunk)
+    except BaseException:
+        _remove_file(tmp_path)
+        raise
+
+    hash_sha256 = hasher.hexdigest()
+    return StoredFile(
+        chemin=f"uploads/{blob_relative_path(hash_sha256)}",
+        hash_sha256=hash_sha256,
+        taille_octets=taille,
+        tmp_path=tmp_path,
+    )
+
 
-    unique_name = f"{uuid4().hex}{extension}"
-    file_path = os.path.join(UPLOAD_DIR, unique_name)
+def _remove_file(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
 
-    with open(file_path, "wb") as f:
-        content = file.file.read()
-        f.write(content)
 
-    return f"uploads/{unique_name}"
+def _place_stored_file(stored: StoredFile) -> None:
+    """Renomme le fichier reçu sous son empreinte (contenu déjà présent : simple remplacement)."""
+    file_path = _blob_file_path(stored.hash_sha256)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    os.replace(stored.tmp_path, file_path)
 
 
-def create_document(db: Session, file: UploadFile, intervention_id: int) -> Document:
+async def _get_blob_for_update(db: AsyncSession, hash_sha256: str) -> Optional[DocumentBlob]:
+    result = await db.execute(
+        select(DocumentBlob).where(DocumentBlob.hash_sha256 == hash_sha256).with_for_update()
+    )
+    return result.scalar_one_or_none()
+
+
+async def _attach_document(
+    db: AsyncSession,
+    intervention_id: int,
+    nom_fichier: str,
+    hash_sha256: str,
+    stored: Optional[StoredFile] = None,
+) -> Document:
     """
-    Associe un fichier uploadé à une intervention existante.
+    Crée le document et prend une référence sur son contenu (créé à partir
+    de `stored` s'il est inconnu). Une insertion concurrente du même contenu
+    (violation d'unicité) est rejouée une fois en référence simple.
+
+    Le fichier reçu (`stored`) n'est renommé sous son empreinte qu'une fois
+    la ligne du contenu verrouillée ou insérée, et le GC supprime les
+    fichiers sous ce même verrou : un upload et une purge du même contenu
+    sont sérialisés. Si le commit échoue, le fichier d'un contenu créé par
+    cet appel est retiré.
 
     Raises:
-        HTTPException 404: si l'intervention est introuvable
+        HTTPException 404: contenu inconnu et `stored` absent
     """
-    intervention = db.query(Intervention).filter(Intervention.id == intervention_id).first()
-    if not intervention:
-        raise HTTPException(status_code=404, detail="Intervention cible introuvable")
+    for tentative in range(2):
+        blob = await _get_blob_for_update(db, hash_sha256)
+        if blob is not None:
+            cree = False
+            break
+        if stored is None:
+            raise HTTPException(status_code=404, detail="Contenu inconnu : uploader le fichier")
+        blob = DocumentBlob(
+            hash_sha256=stored.hash_sha256,
+            taille_octets=stored.taille_octets,
+            chemin=stored.chemin,
+            ref_count=0,
+        )
+        db.add(blob)
+        try:
+            # Insertion immédiate : la ligne (ou l'index unique) verrouille le contenu
+            await db.flush()
+            cree = True
+            break
+        except IntegrityError:
+            await db.rollback()
+            if tentative:
+                raise
 
-    chemin = save_uploaded_file(file)
+    if stored is not None:
+        await run_in_threadpool(_place_stored_file, stored)
+    blob.ref_count += 1
+    blob.date_orphelin = None
 
     document = Document(
-        nom_fichier=file.filename,
-        chemin=chemin,
+        nom_fichier=nom_fichier,
+        chemin=blob.chemin,
+        hash_sha256=blob.hash_sha256,
+        taille_octets=blob.taille_octets,
         intervention_id=intervention_id,
+        blob=blob,
         date_upload=datetime.utcnow()
     )
-
     db.add(document)
+    try:
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        if cree:
+            _remove_file(_blob_file_path(hash_sha256))
+        raise
+    await db.refresh(document)
+    return document
+
+
+async def _schedule_derivatives(db: AsyncSession, document: Document) -> None:
+    """
+    Planifie miniatures et aperçus d'une image. La bascule NULL -> en_attente
+    est conditionnelle : un contenu n'est dérivé qu'une fois, même uploadé
+    en parallèle sous plusieurs documents.
+    """
+    if not settings.DOCUMENT_DERIVATIVES_ENABLED or document.blob_id is None or not is_image(document.nom_fichier):
+        return
+    result = await db.execute(
+        update(DocumentBlob)
+        .where(DocumentBlob.id == document.blob_id, DocumentBlob.derives_statut.is_(None))
+        .values(derives_statut=StatutDerives.en_attente, date_derives=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if result.rowcount:
+        enqueue_derivatives(
+            document.blob_id, document_file_path(document), derive_dir(UPLOAD_DIR, document.hash_sha256)
+        )
+
+
+async def _load_blob(db: AsyncSession, document: Document) -> None:
+    """
+    Charge le contenu (statut des dérivés à jour) avant la sérialisation :
+    Document.derives le lit, et un chargement paresseux est impossible
+    hors de la session async.
+    """
+    await db.refresh(document, ["blob"])
+
+
+def requeue_stale_derivatives(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Remet en file les contenus en attente de dérivés depuis plus de
+    DOCUMENT_DERIVATIVE_TIMEOUT_SECONDS : tâche perdue avec le processus
+    qui l'avait reçue (redémarrage, arrêt brutal).
+
+    Returns:
+        Nombre de contenus remis en file
+    """
+    if not settings.DOCUMENT_DERIVATIVES_ENABLED:
+        return 0
+    maintenant = now or datetime.utcnow()
+    limite = maintenant - timedelta(seconds=settings.DOCUMENT_DERIVATIVE_TIMEOUT_SECONDS)
+    blobs = db.execute(
+        select(DocumentBlob.id, DocumentBlob.hash_sha256)
+        .where(
+            DocumentBlob.derives_statut == StatutDerives.en_attente,
+            or_(DocumentBlob.date_derives.is_(None), DocumentBlob.date_derives < limite),
+        )
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not blobs:
+        db.commit()
+        return 0
+    db.execute(
+        update(DocumentBlob)
+        .where(DocumentBlob.id.in_([row.id for row in blobs]))
+        .values(date_derives=maintenant)
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
-    db.refresh(document)
+    for row in blobs:
+        enqueue_derivatives(row.id, _blob_file_path(row.hash_sha256), derive_dir(UPLOAD_DIR, row.hash_sha256))
+    return len(blobs)
+
+
+async def _check_intervention(db: AsyncSession, intervention_id: int) -> None:
+    if not await db.get(Intervention, intervention_id):
+        raise HTTPException(status_code=404, detail="Intervention cible introuvable")
+
+
+async def create_document(db: AsyncSession, file: UploadFile, intervention_id: int) -> Document:
+    """
+    Associe un fichier uploadé à une intervention existante.
+
+    Raises:
+        HTTPException 404: si l'intervention est introuvable
+        HTTPException 413: fichier trop volumineux
+    """
+    await _check_intervention(db, intervention_id)
+    stored = await save_uploaded_file(file)
+    try:
+        document = await _attach_document(db, intervention_id, file.filename, stored.hash_sha256, stored)
+    finally:
+        _remove_file(stored.tmp_path)
+    await _schedule_derivatives(db, document)
+    await _load_blob(db, document)
+    return document
+
+
+async def create_document_from_hash(db: AsyncSession, data: DocumentFromHash) -> Document:
+    """
+    Associe un contenu déjà stocké à une intervention, sans upload
+    (après un pré-contrôle positif sur l'empreinte).
+
+    Raises:
+        HTTPException 404: intervention ou contenu introuvable
+    """
+    await _check_intervention(db, data.intervention_id)
+    document = await _attach_document(db, data.intervention_id, data.nom_fichier, data.hash_sha256)
+    await _schedule_derivatives(db, document)
+    await _load_blob(db, document)
     return document
+
+
+async def get_blob_by_hash(db: AsyncSession, hash_sha256: str) -> DocumentBlob:
+    """
+    Raises:
+        HTTPException 404: contenu inconnu
+    """
+    result = await db.execute(select(DocumentBlob).where(DocumentBlob.hash_sha256 == hash_sha256.lower()))
+    blob = result.scalar_one_or_none()
+    if blob is None:
+        raise HTTPException(status_code=404, detail="Contenu inconnu")
+    return blob
+
+
+def document_file_path(document: Document) -> str:
+    """Chemin disque d'un document (`chemin` est relatif à app/static : uploads/...)."""
+    relatif = document.chemin.split("/", 1)[1] if document.chemin.startswith("uploads/") else document.chemin
+    return os.path.join(UPLOAD_DIR, *relatif.split("/"))
+
+
+async def _can_access_intervention(db: AsyncSession, intervention_id: int, user: dict) -> bool:
+    """
+    Admin et responsable : toutes les interventions. Technicien : celles qui
+    lui sont affectées. Client : les siennes.
+    """
+    role = user.get("role")
+    if role in ("admin", "responsable"):
+        return True
+    user_id = user.get("user_id")
+    if user_id is None:
+        return False
+    if role == "technicien":
+        owner = select(Technicien.id).where(Technicien.user_id == user_id, Technicien.id == Intervention.technicien_id)
+    elif role == "client":
+        owner = select(Client.id).where(Client.user_id == user_id, Client.id == Intervention.client_id)
+    else:
+        return False
+    found = await db.scalar(
+        select(Intervention.id).where(Intervention.id == intervention_id, owner.exists())
+    )
+    return found is not None
+
+
+async def get_document_for_download(db: AsyncSession, document_id: int, user: dict) -> tuple[Document, str]:
+    """
+    Vérifie l'accès au document via son intervention et localise le fichier.
+
+    Raises:
+        HTTPException 404: document ou fichier introuvable
+        HTTPException 403: intervention hors du périmètre de l'utilisateur
+    """
+    document = await db.get(Document, document_id)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document introuvable")
+    if not await _can_access_intervention(db, document.intervention_id, user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Accès refusé à ce document")
+    path = document_file_path(document)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Fichier introuvable sur le serveur")
+    return document, path
+
+
+async def get_derivative_for_download(
+    db: AsyncSession, document_id: int, taille: str, fmt: str, user: dict
+) -> tuple[Document, str]:
+    """
+    Raises:
+        HTTPException 404: taille/format inconnu ou dérivé pas (encore) disponible
+        HTTPException 403: intervention hors du périmètre de l'utilisateur
+    """
+    if taille not in DERIVE_TAILLES or fmt not in DERIVE_FORMATS:
+        raise HTTPException(status_code=404, detail="Dérivé inconnu")
+    document, _ = await get_document_for_download(db, document_id, user)
+    blob = await db.get(DocumentBlob, document.blob_id) if document.blob_id is not None else None
+    if blob is None or blob.derives_statut != StatutDerives.pret:
+        raise HTTPException(status_code=404, detail="Dérivé non disponible")
+    path = derive_path(UPLOAD_DIR, blob.hash_sha256, taille, fmt)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Dérivé non disponible")
+    return document, path
+
+
+def delete_document(db: Session, document_id: int) -> None:
+    """
+    Supprime un document et libère sa référence sur le contenu. Le fichier
+    n'est supprimé que par le GC, une fois le contenu orphelin depuis
+    DOCUMENT_BLOB_GC_GRACE_SECONDS.
+
+    Raises:
+        HTTPException 404: document introuvable
+    """
+    document = db.get(Document, document_id)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document introuvable")
+
+    legacy_path = None
+    if document.blob_id is not None:
+        # Décrément atomique : pas de lecture-modification-écriture concurrente
+        db.execute(
+            update(DocumentBlob)
+            .where(DocumentBlob.id == document.blob_id)
+            .values(
+                ref_count=DocumentBlob.ref_count - 1,
+                date_orphelin=case((DocumentBlob.ref_count <= 1, datetime.utcnow()), else_=DocumentBlob.date_orphelin),
+            )
+            .execution_options(synchronize_session=False)
+        )
+    elif document.chemin:
+        # Document antérieur au stockage par contenu : fichier propre
+        legacy_path = document_file_path(document)
+
+    db.delete(document)
+    db.commit()
+    if legacy_path and os.path.exists(legacy_path):
+        os.remove(legacy_path)
+
+
+def collect_orphan_blobs(db: Session, grace_seconds: Optional[int] = None) -> int:
+    """
+    Garbage collector des contenus :
+    1. recale ref_count sur le nombre réel de documents (suppressions en
+       cascade depuis les interventions, qui ne passent pas par delete_document) ;
+    2. supprime les lignes orphelines depuis plus de `grace_seconds` et
+       leurs fichiers, avant le commit : les lignes restent verrouillées
+       pendant la suppression des fichiers, et un upload concurrent du même
+       contenu attend le commit pour recréer la ligne puis le fichier.
+
+    Returns:
+        Nombre de contenus supprimés
+    """
+    grace = settings.DOCUMENT_BLOB_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+    maintenant = datetime.utcnow()
+
+    references = (
+        select(func.count(Document.id))
+        .where(Document.blob_id == DocumentBlob.id)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(DocumentBlob)
+        .where(DocumentBlob.ref_count != references)
+        .values(
+            ref_count=references,
+            date_orphelin=case((references == 0, func.coalesce(DocumentBlob.date_orphelin, maintenant)), else_=None),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    orphelins = db.execute(
+        select(DocumentBlob.id, DocumentBlob.hash_sha256)
+        .where(
+            DocumentBlob.ref_count == 0,
+            DocumentBlob.date_orphelin <= maintenant - timedelta(seconds=grace),
+            ~exists().where(Document.blob_id == DocumentBlob.id),
+        )
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not orphelins:
+        db.commit()
+        return 0
+
+    db.execute(
+        delete(DocumentBlob)
+        .where(DocumentBlob.id.in_([row.id for row in orphelins]))
+        .execution_options(synchronize_session=False)
+    )
+    for row in orphelins:
+        _remove_file(_blob_file_path(row.hash_sha256))
+        shutil.rmtree(derive_dir(UPLOAD_DIR, row.hash_sha256), ignore_errors=True)
+    db.commit()
+    return len(orphelins)
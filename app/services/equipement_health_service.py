@@ -0,0 +1,233 @@
+# app/services/equipement_health_service.py
+
+"""
+Santé du parc d'équipements, calculée en lot.
+
+Les propriétés de `Equipement` (nb_interventions_correctives,
+cout_maintenance_total, prochaine_maintenance_calculee...) exécutent une ou
+plusieurs requêtes chacune, ou parcourent toutes les interventions : pour un
+parc de N équipements, plusieurs milliers d'allers-retours SQL. Ici, trois
+requêtes quel que soit N (équipements, agrégats groupés par équipement,
+périodes d'arrêt du mois), puis les indicateurs sont calculés sur des
+tableaux numpy pour tout le parc.
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, func, case, and_, or_
+from sqlalchemy.orm import Session
+
+from app.core.pagination import clamp_limit, decode_cursor, encode_cursor
+from app.models.equipement import Equipement, StatutEquipement
+from app.models.intervention import Intervention, InterventionType, StatutIntervention
+from app.schemas.dashboard import EquipementHealth, StatutSante
+
+STATUTS_TERMINES = (StatutIntervention.cloturee, StatutIntervention.archivee)
+STATUTS_HORS_SERVICE = (StatutEquipement.panne, StatutEquipement.retire)
+
+# Score de fiabilité : 100 moins les pénalités ci-dessous
+PENALITE_PANNE = 8.0  # par intervention corrective sur 12 mois glissants
+PENALITE_PANNES_MAX = 40.0
+PENALITE_INDISPONIBILITE = 0.5  # par point de disponibilité perdu dans le mois
+PENALITE_INDISPONIBILITE_MAX = 30.0
+PENALITE_MAINTENANCE_RETARD = 15.0
+
+# Seuils de statut_sante (score minimal)
+SEUILS_SANTE = ((85.0, StatutSante.excellent), (70.0, StatutSante.bon), (50.0, StatutSante.attention))
+
+_SECONDES_HEURE = 3600.0
+
+
+def _debut_mois(now: datetime) -> datetime:
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _secondes(values, origine: datetime, defaut: float = np.nan) -> np.ndarray:
+    """Dates -> secondes depuis `origine` (NaN pour les dates absentes)."""
+    return np.array(
+        [(v - origine).total_seconds() if v is not None else defaut for v in values],
+        dtype=np.float64,
+    )
+
+
+def _arret_par_equipement(n: int, index: np.ndarray, debut: np.ndarray, fin: np.ndarray) -> np.ndarray:
+    """
+    Somme par équipement de la réunion des intervalles [debut, fin] (triés
+    par équipement puis début) : les arrêts qui se chevauchent ne sont
+    comptés qu'une fois.
+    """
+    if not len(index):
+        return np.zeros(n)
+    # Décalage par équipement : un cumul maximal global ne déborde pas d'un groupe sur l'autre
+    decalage = index * (fin.max() - debut.min() + 1.0)
+    debut, fin = debut + decalage, fin + decalage
+    fin_precedente = np.concatenate(([-np.inf], np.maximum.accumulate(fin)[:-1]))
+    duree = np.clip(fin - np.maximum(debut, fin_precedente), 0, None)
+    return np.bincount(index, weights=duree, minlength=n)
+
+
+def compute_fleet_health(
+    db: Session, client_id: Optional[int] = None, now: Optional[datetime] = None
+) -> List[EquipementHealth]:
+    """
+    Calcule les indicateurs de santé de tout le parc, ou du parc d'un client.
+
+    - nb_pannes_mois : interventions correctives créées ce mois
+    - temps_arret_mois / disponibilite : durée des correctives ouvertes
+      depuis le début du mois (jusqu'à clôture ou maintenant, chevauchements
+      fusionnés), rapportée au temps écoulé du mois
+    - prochaine_maintenance : dernière préventive clôturée (à défaut mise en
+      service ou création) + frequence_entretien_jours
+    - score_fiabilite : 100 moins les pénalités pannes sur 12 mois,
+      indisponibilité du mois et maintenance en retard
+    """
+    now = now or datetime.utcnow()
+    debut_mois = _debut_mois(now)
+    il_y_a_un_an = now - timedelta(days=365)
+
+    equipements = select(
+        Equipement.id, Equipement.nom, Equipement.type_equipement, Equipement.localisation,
+        Equipement.statut, Equipement.frequence_entretien_jours,
+        Equipement.date_mise_en_service, Equipement.created_at,
+    ).order_by(Equipement.id)
+    if client_id is not None:
+        equipements = equipements.where(Equipement.client_id == client_id)
+    rows = db.execute(equipements).all()
+    n = len(rows)
+    ids = np.array([r.id for r in rows], dtype=np.int64)
+    if not n:
+        return []
+
+    # Passe 1 : agrégats par équipement
+    corrective = Intervention.type_intervention == InterventionType.corrective
+    terminee = Intervention.statut.in_(STATUTS_TERMINES)
+    if client_id is not None:
+        perimetre = Intervention.equipement_id.in_(select(Equipement.id).where(Equipement.client_id == client_id))
+    else:
+        perimetre = Intervention.equipement_id.isnot(None)
+    agregats = db.execute(
+        select(
+            Intervention.equipement_id,
+            func.count(Intervention.id).label("total"),
+            func.count(case((and_(corrective, Intervention.date_creation >= debut_mois), 1))).label("pannes_mois"),
+            func.count(case((and_(corrective, Intervention.date_creation >= il_y_a_un_an), 1))).label("pannes_an"),
+            func.coalesce(func.sum(Intervention.cout_reel), 0).label("cout_total"),
+            func.coalesce(func.sum(case((Intervention.date_cloture >= debut_mois, Intervention.cout_reel))), 0).label("cout_mois"),
+            func.max(case((terminee, Intervention.date_cloture))).label("derniere"),
+            func.max(case((and_(terminee, Intervention.type_intervention == InterventionType.preventive),
+                           Intervention.date_cloture))).label("derniere_preventive"),
+        )
+        .where(perimetre)
+        .group_by(Intervention.equipement_id)
+    ).all()
+
+    # Passe 2 : périodes d'arrêt (correctives) recouvrant le mois courant
+    arrets = db.execute(
+        select(Intervention.equipement_id, Intervention.date_creation, Intervention.date_cloture)
+        .where(
+            perimetre,
+            corrective,
+            Intervention.statut != StatutIntervention.annulee,
+            Intervention.date_creation <= now,
+            or_(Intervention.date_cloture.is_(None), Intervention.date_cloture > debut_mois),
+        )
+        .order_by(Intervention.equipement_id, Intervention.date_creation)
+    ).all()
+
+    # Post-traitement vectorisé
+    pos = np.searchsorted(ids, np.array([a.equipement_id for a in agregats], dtype=np.int64))
+    total = np.zeros(n, dtype=np.int64)
+    pannes_mois = np.zeros(n, dtype=np.int64)
+    pannes_an = np.zeros(n, dtype=np.int64)
+    cout_total = np.zeros(n)
+    cout_mois = np.zeros(n)
+    derniere = np.full(n, np.nan)
+    derniere_preventive = np.full(n, np.nan)
+    if len(agregats):
+        total[pos] = [a.total for a in agregats]
+        pannes_mois[pos] = [a.pannes_mois for a in agregats]
+        pannes_an[pos] = [a.pannes_an for a in agregats]
+        cout_total[pos] = [float(a.cout_total) / 100 for a in agregats]  # centimes -> euros
+        cout_mois[pos] = [float(a.cout_mois) / 100 for a in agregats]
+        derniere[pos] = _secondes([a.derniere for a in agregats], now)
+        derniere_preventive[pos] = _secondes([a.derniere_preventive for a in agregats], now)
+
+    duree_mois = max((now - debut_mois).total_seconds(), 1.0)
+    index_arrets = np.searchsorted(ids, np.array([a.equipement_id for a in arrets], dtype=np.int64))
+    debut_arrets = np.maximum(_secondes([a.date_creation for a in arrets], now), -duree_mois)
+    fin_arrets = np.minimum(_secondes([a.date_cloture for a in arrets], now, defaut=0.0), 0.0)
+    arret = np.minimum(_arret_par_equipement(n, index_arrets, debut_arrets, fin_arrets), duree_mois)
+    disponibilite = 100.0 * (1.0 - arret / duree_mois)
+
+    frequence = np.array([r.frequence_entretien_jours or np.nan for r in rows], dtype=np.float64)
+    base = np.where(
+        np.isnan(derniere_preventive),
+        _secondes([r.date_mise_en_service or r.created_at for r in rows], now),
+        derniere_preventive,
+    )
+    prochaine = base + frequence * 86400.0
+    en_retard = ~np.isnan(prochaine) & (prochaine < 0)
+
+    score = (
+        100.0
+        - np.minimum(pannes_an * PENALITE_PANNE, PENALITE_PANNES_MAX)
+        - np.minimum((100.0 - disponibilite) * PENALITE_INDISPONIBILITE, PENALITE_INDISPONIBILITE_MAX)
+        - np.where(en_retard, PENALITE_MAINTENANCE_RETARD, 0.0)
+    )
+    score = np.round(np.clip(score, 0.0, 100.0), 1)
+
+    items = []
+    for i, r in enumerate(rows):
+        if r.statut in STATUTS_HORS_SERVICE:
+            statut_sante = StatutSante.hors_service
+        else:
+            statut_sante = next((s for seuil, s in SEUILS_SANTE if score[i] >= seuil), StatutSante.critique)
+        items.append(EquipementHealth(
+            equipement_id=r.id,
+            equipement_nom=r.nom,
+            equipement_type=r.type_equipement,
+            localisation=r.localisation,
+            nb_pannes_mois=int(pannes_mois[i]),
+            nb_interventions_total=int(total[i]),
+            derniere_maintenance=None if np.isnan(derniere[i]) else now + timedelta(seconds=float(derniere[i])),
+            prochaine_maintenance=None if np.isnan(prochaine[i]) else now + timedelta(seconds=float(prochaine[i])),
+            jours_depuis_derniere_maintenance=None if np.isnan(derniere[i]) else int(-derniere[i] // 86400),
+            statut_sante=statut_sante,
+            score_fiabilite=float(score[i]),
+            cout_maintenance_mois=round(float(cout_mois[i]), 2),
+            cout_total_maintenance=round(float(cout_total[i]), 2),
+            temps_arret_mois=round(float(arret[i]) / _SECONDES_HEURE, 2),
+            disponibilite=round(float(disponibilite[i]), 2),
+        ))
+    return items
+
+
+def get_fleet_health_page(
+    db: Session,
+    client_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    now: Optional[datetime] = None,
+) -> Tuple[List[EquipementHealth], Optional[str]]:
+    """
+    Page du parc triée par score de fiabilité (les plus fragiles d'abord,
+    ou les plus fiables avec descending), puis par id ; pagination par
+    curseur sur (score, id).
+    """
+    limit = clamp_limit(limit)
+    items = compute_fleet_health(db, client_id, now)
+    items.sort(key=lambda h: (h.score_fiabilite, h.equipement_id), reverse=descending)
+    if cursor:
+        after = tuple(decode_cursor(cursor, 2))
+        if descending:
+            items = [h for h in items if (h.score_fiabilite, h.equipement_id) < after]
+        else:
+            items = [h for h in items if (h.score_fiabilite, h.equipement_id) > after]
+    page = items[:limit]
+    next_cursor = None
+    if len(items) > limit:
+        next_cursor = encode_cursor(page[-1].score_fiabilite, page[-1].equipement_id)
+    return page, next_cursor
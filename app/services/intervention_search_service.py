@@ -0,0 +1,284 @@
+# app/services/intervention_search_service.py
+
+"""
+Recherche multicritère d'interventions (/filters/interventions).
+
+Les critères sont déclarés dans CRITERES (paramètre -> colonne, opérateur).
+Chaque colonne doit ouvrir un index de la table, ce qui est vérifié au
+chargement du module, et n'est comparée que nue (égalité, IN, bornes) :
+toutes les conditions émises sont indexables.
+
+`planifier` fusionne les conditions portant sur la même colonne (bornes
+de dates, statuts d'en_retard), reconnaît une recherche vide sans
+interroger la base et retient l'index couvrant le plus long préfixe de
+conditions. La pagination se fait par curseur sur (clé de tri, id).
+Le total est estimé sans COUNT(*) complet : plan de l'optimiseur sur
+PostgreSQL, comptage borné à SEARCH_COUNT_CAP ailleurs.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pagination import clamp_limit, decode_cursor, encode_cursor
+from app.db.dashboard_counters import STATUTS_ACTIFS
+from app.db.sql_functions import explain
+from app.models.intervention import Intervention, profil_chargement
+from app.schemas.intervention import TriIntervention
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Critere:
+    """Paramètre de recherche : attribut de Intervention et opérateur (eq, in, ge, le)."""
+    colonne: str
+    operateur: str
+
+
+CRITERES: Dict[str, Critere] = {
+    "statut": Critere("statut", "in"),
+    "priorite": Critere("priorite", "in"),
+    "type": Critere("type_intervention", "eq"),
+    "urgence": Critere("urgence", "eq"),
+    "technicien_id": Critere("technicien_id", "eq"),
+    "client_id": Critere("client_id", "eq"),
+    "equipement_id": Critere("equipement_id", "eq"),
+    "date_creation_min": Critere("date_creation", "ge"),
+    "date_creation_max": Critere("date_creation", "le"),
+    "date_limite_min": Critere("date_limite", "ge"),
+    "date_limite_max": Critere("date_limite", "le"),
+}
+
+# Clé de tri (attribut, décroissant) ; chacune est couverte par un index (colonne, id)
+TRIS: Dict[TriIntervention, Tuple[str, bool]] = {
+    TriIntervention.date_creation_desc: ("date_creation", True),
+    TriIntervention.date_creation: ("date_creation", False),
+    TriIntervention.date_limite: ("date_limite", False),
+    TriIntervention.date_limite_desc: ("date_limite", True),
+}
+
+
+def _nom_colonne(attribut: str) -> str:
+    """Nom SQL de la colonne d'un attribut (type_intervention -> type)."""
+    return Intervention.__mapper__.columns[attribut].name
+
+
+def _verifier_criteres() -> None:
+    premieres = {next(iter(index.columns)).name for index in Intervention.__table__.indexes}
+    attributs = [c.colonne for c in CRITERES.values()] + [colonne for colonne, _ in TRIS.values()]
+    for attribut in attributs:
+        if _nom_colonne(attribut) not in premieres:
+            raise RuntimeError(f"Critère de recherche sans index : interventions.{attribut}")
+
+
+_verifier_criteres()
+
+
+@dataclass
+class PlanRecherche:
+    """
+    Conditions normalisées d'une recherche.
+
+    egalites : attribut -> valeurs admises (une seule : égalité, sinon IN)
+    plages : attribut -> (minimum inclus, (maximum, inclus)) ; (None, None)
+    signifie seulement IS NOT NULL
+    """
+    tri: TriIntervention
+    egalites: Dict[str, frozenset] = field(default_factory=dict)
+    plages: Dict[str, Tuple[Any, Optional[Tuple[Any, bool]]]] = field(default_factory=dict)
+    index: Optional[str] = None
+
+    def restreindre(self, attribut: str, valeurs) -> None:
+        valeurs = frozenset(valeurs)
+        self.egalites[attribut] = self.egalites[attribut] & valeurs if attribut in self.egalites else valeurs
+
+    def borner(self, attribut: str, minimum=None, maximum=None, inclus: bool = True) -> None:
+        bas, haut = self.plages.get(attribut, (None, None))
+        if minimum is not None and (bas is None or minimum > bas):
+            bas = minimum
+        if maximum is not None and (haut is None or maximum < haut[0] or (maximum == haut[0] and not inclus)):
+            haut = (maximum, inclus)
+        self.plages[attribut] = (bas, haut)
+
+    @property
+    def vide(self) -> bool:
+        """Vrai si les conditions sont contradictoires (aucune ligne possible)."""
+        if any(not valeurs for valeurs in self.egalites.values()):
+            return True
+        return any(
+            bas is not None and haut is not None and (bas > haut[0] or (bas == haut[0] and not haut[1]))
+            for bas, haut in self.plages.values()
+        )
+
+    def conditions(self) -> list:
+        conditions = []
+        for attribut, valeurs in self.egalites.items():
+            colonne = getattr(Intervention, attribut)
+            if len(valeurs) == 1:
+                conditions.append(colonne == next(iter(valeurs)))
+            else:
+                conditions.append(colonne.in_(sorted(valeurs)))
+        for attribut, (bas, haut) in self.plages.items():
+            colonne = getattr(Intervention, attribut)
+            if bas is None and haut is None:
+                conditions.append(colonne.isnot(None))
+            if bas is not None:
+                conditions.append(colonne >= bas)
+            if haut is not None:
+                conditions.append(colonne <= haut[0] if haut[1] else colonne < haut[0])
+        return conditions
+
+
+def _choisir_index(plan: PlanRecherche) -> Optional[str]:
+    """
+    Index dont le préfixe couvre le plus de conditions : colonnes en
+    égalité, puis au plus une colonne bornée. À préfixe égal, préférer
+    l'index qui fournit aussi l'ordre de tri (colonne puis id), puis le
+    plus étroit.
+    """
+    egalites = {_nom_colonne(a) for a in plan.egalites}
+    plages = {_nom_colonne(a) for a in plan.plages}
+    colonne_tri = _nom_colonne(TRIS[plan.tri][0])
+    meilleur, meilleur_score = None, None
+    for index in Intervention.__table__.indexes:
+        colonnes = [c.name for c in index.columns]
+        nb_egalites = 0
+        while nb_egalites < len(colonnes) and colonnes[nb_egalites] in egalites:
+            nb_egalites += 1
+        couvertes = nb_egalites + (nb_egalites < len(colonnes) and colonnes[nb_egalites] in plages)
+        # Clé de tri fournie par l'index : aucune, la colonne seule, ou (colonne, id)
+        fournit_tri = 0
+        for attendue in (colonne_tri, "id"):
+            if nb_egalites + fournit_tri >= len(colonnes) or colonnes[nb_egalites + fournit_tri] != attendue:
+                break
+            fournit_tri += 1
+        if not couvertes and not fournit_tri:
+            continue
+        score = (couvertes, fournit_tri, -len(colonnes), index.name)
+        if meilleur_score is None or score > meilleur_score:
+            meilleur, meilleur_score = index.name, score
+    return meilleur
+
+
+def planifier(
+    filtres: Dict[str, Any],
+    tri: TriIntervention = TriIntervention.date_creation_desc,
+    en_retard: bool = False,
+    now: Optional[datetime] = None,
+) -> PlanRecherche:
+    """
+    Construit le plan d'une recherche ; les filtres None (ou listes vides)
+    sont ignorés. en_retard : statut actif et date_limite dépassée.
+    """
+    plan = PlanRecherche(tri=tri)
+    for parametre, valeur in filtres.items():
+        if valeur is None or valeur == []:
+            continue
+        critere = CRITERES[parametre]
+        if critere.operateur == "in":
+            plan.restreindre(critere.colonne, valeur)
+        elif critere.operateur == "eq":
+            plan.restreindre(critere.colonne, [valeur])
+        elif critere.operateur == "ge":
+            plan.borner(critere.colonne, minimum=valeur)
+        else:
+            plan.borner(critere.colonne, maximum=valeur)
+    if en_retard:
+        plan.restreindre("statut", STATUTS_ACTIFS)
+        plan.borner("date_limite", maximum=now or datetime.utcnow(), inclus=False)
+    attribut_tri = TRIS[tri][0]
+    if Intervention.__mapper__.columns[attribut_tri].nullable:
+        # Tri par échéance : seules les interventions datées sont paginables
+        plan.borner(attribut_tri)
+    plan.index = _choisir_index(plan)
+    return plan
+
+
+def build_search_query(plan: PlanRecherche, after: Optional[Tuple[Any, int]] = None):
+    """Requête (profil "liste") triée selon plan.tri puis id, démarrant après la clé `after`."""
+    attribut, descendant = TRIS[plan.tri]
+    colonne = getattr(Intervention, attribut)
+    stmt = select(Intervention).options(*profil_chargement("liste")).where(*plan.conditions())
+    if descendant:
+        stmt = stmt.order_by(colonne.desc(), Intervention.id.desc())
+    else:
+        stmt = stmt.order_by(colonne.asc(), Intervention.id.asc())
+    if after is not None:
+        valeur, last_id = after
+        if descendant:
+            stmt = stmt.where(or_(colonne < valeur, and_(colonne == valeur, Intervention.id < last_id)))
+        else:
+            stmt = stmt.where(or_(colonne > valeur, and_(colonne == valeur, Intervention.id > last_id)))
+    return stmt
+
+
+def _decoder_curseur(cursor: str, tri: TriIntervention) -> Tuple[Any, int]:
+    tri_curseur, valeur, last_id = decode_cursor(cursor, 3)
+    if tri_curseur != tri.value:
+        # Curseur émis pour un autre ordre : la clé n'a pas de sens ici
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Curseur de pagination invalide")
+    return valeur, last_id
+
+
+async def estimer_total_async(db: AsyncSession, plan: PlanRecherche) -> int:
+    """
+    Nombre estimé de résultats : estimation de l'optimiseur (EXPLAIN) sur
+    PostgreSQL, sinon comptage arrêté à SEARCH_COUNT_CAP lignes.
+    """
+    stmt = select(Intervention.id).where(*plan.conditions())
+    if db.get_bind().dialect.name == "postgresql":
+        plan_json = (await db.execute(explain(stmt))).scalar_one()
+        if isinstance(plan_json, str):  # asyncpg ne décode pas le JSON
+            plan_json = json.loads(plan_json)
+        return int(plan_json[0]["Plan"]["Plan Rows"])
+    borne = stmt.limit(settings.SEARCH_COUNT_CAP).subquery()
+    return (await db.execute(select(func.count()).select_from(borne))).scalar_one()
+
+
+async def search_interventions_async(
+    db: AsyncSession,
+    filtres: Dict[str, Any],
+    tri: TriIntervention = TriIntervention.date_creation_desc,
+    en_retard: bool = False,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Tuple[List[Intervention], Optional[str], int]:
+    """
+    Page de résultats, curseur de la page suivante (None sur la dernière)
+    et total estimé (exact quand tous les résultats tiennent sur la
+    première page).
+
+    Raises:
+        HTTPException 400: curseur invalide ou émis pour un autre tri
+    """
+    limit = clamp_limit(limit)
+    after = _decoder_curseur(cursor, tri) if cursor else None
+    plan = planifier(filtres, tri, en_retard, now)
+    if plan.vide:
+        return [], None, 0
+    logger.debug("Recherche d'interventions via %s : %s", plan.index, plan.conditions())
+
+    result = await db.execute(build_search_query(plan, after).limit(limit + 1))
+    rows = list(result.scalars())
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(tri.value, getattr(last, TRIS[tri][0]), last.id)
+
+    if cursor is None and next_cursor is None:
+        total = len(rows)
+    else:
+        total = await estimer_total_async(db, plan)
+        if cursor is None:
+            total = max(total, len(rows) + 1)
+    return rows, next_cursor, total
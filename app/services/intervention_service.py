@@ -1,11 +1,21 @@
+from sqlalchemy import select, insert, or_, and_
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from datetime import datetime
-from app.models.intervention import Intervention, StatutIntervention
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from app.core.config import settings
+from app.core.pagination import clamp_limit, decode_cursor, encode_cursor
+from app.db.dashboard_counters import record_interventions
+from app.db.database import insert_ignoring_conflicts
+from app.db.search_index import SOURCE_INTERVENTION, index_objects
+from app.models.intervention import Intervention, StatutIntervention, profil_chargement
 from app.models.historique import HistoriqueIntervention
 from app.models.technicien import Technicien
 from app.models.equipement import Equipement
 from app.models.user import User
+from app.models.planning import Planning, StatutPlanning
+from app.models.intervention import InterventionType, PrioriteIntervention
 from app.schemas.intervention import InterventionCreate
 
 def create_intervention(db: Session, data: InterventionCreate, user_id: int) -> Intervention:
@@ -42,13 +52,115 @@ def create_intervention(db: Session, data: InterventionCreate, user_id: int) ->
     return intervention
 
 def get_intervention_by_id(db: Session, intervention_id: int) -> Intervention:
-    intervention = db.query(Intervention).filter(Intervention.id == intervention_id).first()
+    intervention = (
+        db.query(Intervention)
+        .options(*profil_chargement("detail"))
+        .filter(Intervention.id == intervention_id)
+        .first()
+    )
     if not intervention:
         raise HTTPException(status_code=404, detail="Intervention introuvable")
     return intervention
 
 def get_all_interventions(db: Session) -> list[Intervention]:
-    return db.query(Intervention).all()
+    return db.query(Intervention).options(*profil_chargement("liste")).all()
+
+def build_interventions_keyset_query(after: Optional[Tuple[datetime, int]] = None):
+    """
+    Requête triée (date_creation DESC, id DESC) démarrant après la clé `after`.
+
+    Le couple (date_creation, id) est unique et couvert par
+    idx_intervention_creation_id : chaque page est un simple parcours d'index,
+    quel que soit son rang (pas d'OFFSET). Profil "liste" : textes longs
+    non chargés.
+    """
+    stmt = select(Intervention).options(*profil_chargement("liste")).order_by(
+        Intervention.date_creation.desc(), Intervention.id.desc()
+    )
+    if after is not None:
+        date_creation, last_id = after
+        stmt = stmt.where(
+            or_(
+                Intervention.date_creation < date_creation,
+                and_(Intervention.date_creation == date_creation, Intervention.id < last_id),
+            )
+        )
+    return stmt
+
+def get_interventions_page(
+    db: Session,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Tuple[List[Intervention], Optional[str]]:
+    """
+    Retourne une page d'interventions et le curseur de la page suivante
+    (None sur la dernière page).
+
+    Raises:
+        HTTPException 400: curseur invalide
+    """
+    limit = clamp_limit(limit)
+    stmt = _page_query(cursor, limit)
+    return _split_page(list(db.execute(stmt).scalars()), limit)
+
+def _page_query(cursor: Optional[str], limit: int):
+    after = tuple(decode_cursor(cursor, 2)) if cursor else None
+    # Une ligne de plus que demandé indique s'il reste une page
+    return build_interventions_keyset_query(after).limit(limit + 1)
+
+def _split_page(rows: List[Intervention], limit: int) -> Tuple[List[Intervention], Optional[str]]:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.date_creation, last.id)
+    return rows, next_cursor
+
+def iter_interventions(db: Session, cursor: Optional[str] = None) -> Iterator[Intervention]:
+    """
+    Parcourt toutes les interventions (même ordre que la pagination) par lots
+    de STREAM_YIELD_PER lignes via un curseur côté serveur, sans matérialiser
+    la liste complète.
+
+    Le curseur est décodé immédiatement (et non au premier `next`) afin
+    qu'un jeton invalide produise une 400 avant l'envoi des en-têtes.
+    """
+    after = tuple(decode_cursor(cursor, 2)) if cursor else None
+    stmt = build_interventions_keyset_query(after).execution_options(
+        yield_per=settings.STREAM_YIELD_PER
+    )
+    return iter(db.execute(stmt).scalars())
+
+# ---------- Variantes asynchrones (routes de lecture, get_async_db) ----------
+
+async def get_intervention_by_id_async(db: AsyncSession, intervention_id: int) -> Intervention:
+    intervention = await db.get(Intervention, intervention_id, options=profil_chargement("detail"))
+    if not intervention:
+        raise HTTPException(status_code=404, detail="Intervention introuvable")
+    return intervention
+
+async def get_interventions_page_async(
+    db: AsyncSession,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Tuple[List[Intervention], Optional[str]]:
+    """Équivalent asynchrone de get_interventions_page."""
+    limit = clamp_limit(limit)
+    stmt = _page_query(cursor, limit)
+    result = await db.execute(stmt)
+    return _split_page(list(result.scalars()), limit)
+
+async def stream_interventions_async(db: AsyncSession, cursor: Optional[str] = None) -> AsyncIterator[Intervention]:
+    """
+    Équivalent asynchrone de iter_interventions (curseur serveur, lots de
+    STREAM_YIELD_PER lignes) ; à itérer avec `async for`.
+    """
+    after = tuple(decode_cursor(cursor, 2)) if cursor else None
+    stmt = build_interventions_keyset_query(after).execution_options(
+        yield_per=settings.STREAM_YIELD_PER
+    )
+    result = await db.stream(stmt)
+    return result.scalars()
 
 def update_statut_intervention(
     db: Session,
@@ -86,3 +198,114 @@ def add_historique(
     )
     db.add(historique)
     db.commit()
+
+
+# ---------- GÉNÉRATION DEPUIS LES PLANNINGS ----------
+
+def _generate_planning_batch(db: Session, now: datetime, batch_size: int, system_user_id: int) -> int:
+    """
+    Un lot, une transaction : plannings dus verrouillés (SKIP LOCKED),
+    interventions et historiques insérés en masse, échéances avancées.
+
+    Returns:
+        Nombre de plannings traités (pas d'interventions créées)
+    """
+    rows = db.execute(
+        select(Planning, Equipement.nom)
+        .join(Equipement, Equipement.id == Planning.equipement_id)
+        .where(
+            Planning.is_active.is_(True),
+            Planning.statut == StatutPlanning.actif,
+            Planning.prochaine_date <= now,
+        )
+        .order_by(Planning.prochaine_date, Planning.id)
+        .limit(batch_size)
+        .with_for_update(of=Planning, skip_locked=True)
+    ).all()
+    if not rows:
+        db.commit()
+        return 0
+
+    # L'index unique (planning_id, date_planifiee) rend l'insertion rejouable
+    created = db.execute(
+        insert_ignoring_conflicts(db, Intervention.__table__, ["planning_id", "date_planifiee"])
+        .returning(Intervention.__table__.c.id),
+        [
+            {
+                "titre": f"Maintenance préventive - {nom_equipement}",
+                "description": planning.commentaire,
+                "type": InterventionType.preventive,
+                "statut": StatutIntervention.ouverte,
+                "priorite": PrioriteIntervention.programmee,
+                "urgence": False,
+                "date_creation": now,
+                "date_limite": planning.prochaine_date,
+                "created_at": now,
+                "updated_at": now,
+                "created_by_id": system_user_id,
+                "equipement_id": planning.equipement_id,
+                "planning_id": planning.id,
+                "date_planifiee": planning.prochaine_date,
+                "validation_client": False,
+            }
+            for planning, nom_equipement in rows
+        ],
+    ).scalars().all()
+
+    if created:
+        record_interventions(db, created)
+        index_objects(db, SOURCE_INTERVENTION, created)
+        db.execute(
+            insert(HistoriqueIntervention),
+            [
+                {
+                    "statut": StatutIntervention.ouverte,
+                    "remarque": "Intervention préventive générée depuis le planning",
+                    "horodatage": now,
+                    "user_id": system_user_id,
+                    "intervention_id": intervention_id,
+                }
+                for intervention_id in created
+            ],
+        )
+
+    for planning, _ in rows:
+        # Échéances manquées (génération arrêtée plusieurs jours) : une seule
+        # intervention de rattrapage, prochaine échéance dans le futur
+        while planning.prochaine_date is not None and planning.prochaine_date <= now:
+            planning.derniere_date = planning.prochaine_date
+            planning.mettre_a_jour_prochaine_date()
+
+    # Les UPDATE des plannings sont regroupés par le flush (executemany)
+    db.commit()
+    return len(rows)
+
+
+def generate_interventions_from_plannings(
+    db: Session,
+    now: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+) -> int:
+    """
+    Génère les interventions préventives des plannings actifs arrivés à
+    échéance, par lots de PLANNING_BATCH_SIZE.
+
+    Rejouable et sûr en parallèle : les plannings en cours de traitement
+    sont ignorés par les autres workers (SKIP LOCKED) et une échéance déjà
+    générée n'est pas recréée.
+
+    Returns:
+        Nombre de plannings traités
+    """
+    from app.services.user_service import get_or_create_system_user
+
+    now = now or datetime.utcnow()
+    batch_size = batch_size or settings.PLANNING_BATCH_SIZE
+    system_user_id = get_or_create_system_user(db).id
+
+    total = 0
+    while True:
+        traites = _generate_planning_batch(db, now, batch_size, system_user_id)
+        total += traites
+        if traites < batch_size:
+            return total
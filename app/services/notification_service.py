@@ -3,30 +3,26 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from datetime import datetime
-from app.models.notification import Notification
+from app.models.notification import Notification, StatutEnvoiNotification
 from app.schemas.notification import NotificationCreate
 from app.models.user import User
-from app.core.config import settings
-import sys
 
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
-
-# Configuration des templates Jinja
-env = Environment(loader=FileSystemLoader("app/templates"))
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+from jinja2 import TemplateNotFound
+from app.core import template_registry
 
 
 def create_notification(db: Session, data: NotificationCreate) -> Notification:
     """
     Crée une notification (log ou email) pour un utilisateur.
 
-    Si canal == email, envoie un mail via SMTP.
+    Si canal == email, la notification est enregistrée en attente d'envoi :
+    le dispatcher (app.tasks.notification_dispatcher) l'envoie par lot sur
+    une connexion SMTP réutilisée, la requête n'attend pas le serveur mail.
 
     Raises:
         HTTPException 404: utilisateur ou intervention non trouvés
-        HTTPException 500: échec envoi email
     """
     user = db.query(User).filter(User.id == data.user_id).first()
     if not user:
@@ -46,64 +42,75 @@ def create_notification(db: Session, data: NotificationCreate) -> Notification:
     else:
         type_enum = raw_type
 
+    par_email = data.canal == "email"
     notif = Notification(
         type_notification=type_enum,
         canal=data.canal,
         contenu=data.contenu,
         user_id=data.user_id,
         intervention_id=data.intervention_id,
-        date_envoi=datetime.utcnow()
+        date_envoi=datetime.utcnow(),
+        statut_envoi=StatutEnvoiNotification.en_attente if par_email else StatutEnvoiNotification.envoyee,
+        tentatives=0,
     )
 
     db.add(notif)
     db.commit()
     db.refresh(notif)
 
-    if data.canal == "email":
-        # En environnement de test, ne pas tenter d'envoyer de vrai email
-        if "pytest" not in sys.modules:
-            send_email_notification(user.email, notif)
+    if par_email:
+        from app.tasks.notification_dispatcher import dispatcher
+        dispatcher.wake()
 
     return notif
 
 
-def send_email_notification(email_to: str, notification: Notification):
+def _email_subject(type_value: str) -> str:
+    return f"[MIF] Notification - {type_value.capitalize()}"
+
+
+def _email_context(notification: Notification) -> Dict[str, str]:
+    return {
+        "type": notification.type_notification.value,
+        "contenu": notification.contenu or "Voir détails dans l’application.",
+    }
+
+
+def render_notification_email(notification: Notification) -> Tuple[str, str]:
     """
-    Envoie un email à l'utilisateur cible avec rendu HTML.
+    Construit le sujet et le corps HTML d'une notification email.
 
     Le template est choisi dynamiquement selon le type (ex: "notification_affectation.html").
 
     Raises:
-        HTTPException 500: en cas d’échec d’envoi
+        TemplateNotFound: aucun template pour ce type
     """
-    try:
-        subject = f"[MIF] Notification - {notification.type.capitalize()}"
-        template_name = f"notification_{notification.type}.html"
+    type_value = notification.type_notification.value
+    html_content = template_registry.render(f"notification_{type_value}.html", **_email_context(notification))
+    return _email_subject(type_value), html_content
+
 
+def render_notification_emails(notifications: Iterable[Notification]) -> Dict[int, Tuple[str, str]]:
+    """
+    Rendu groupé d'un lot de notifications : un `render_many` par type.
+
+    Returns:
+        Dict notification_id -> (sujet, html) ; les notifications dont le
+        type n'a pas de template sont absentes du résultat.
+    """
+    par_type: Dict[str, List[Notification]] = defaultdict(list)
+    for notification in notifications:
+        par_type[notification.type_notification.value].append(notification)
+
+    rendus: Dict[int, Tuple[str, str]] = {}
+    for type_value, lot in par_type.items():
         try:
-            template = env.get_template(template_name)
-        except TemplateNotFound:
-            raise HTTPException(status_code=500, detail=f"Template '{template_name}' introuvable")
-
-        html_content = template.render(
-            type=notification.type,
-            contenu=notification.contenu or "Voir détails dans l’application."
-        )
-
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = settings.EMAILS_FROM_EMAIL
-        msg["To"] = email_to
-        msg.attach(MIMEText(html_content, "html"))
-
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.starttls()
-            server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            server.sendmail(
-                settings.EMAILS_FROM_EMAIL,
-                email_to,
-                msg.as_string()
+            contenus = template_registry.render_many(
+                f"notification_{type_value}.html", [_email_context(n) for n in lot]
             )
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur envoi email : {str(e)}")
+        except TemplateNotFound:
+            continue
+        subject = _email_subject(type_value)
+        for notification, html_content in zip(lot, contenus):
+            rendus[notification.id] = (subject, html_content)
+    return rendus
@@ -1,6 +1,8 @@
 # app/services/planning_service.py
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from datetime import datetime
 from app.models.planning import Planning
@@ -72,6 +74,14 @@ def get_all_plannings(db: Session) -> list[Planning]:
     return db.query(Planning).all()
 
 
+async def get_all_plannings_async(db: AsyncSession) -> list[Planning]:
+    """
+    Équivalent asynchrone de get_all_plannings (get_async_db).
+    """
+    result = await db.execute(select(Planning))
+    return list(result.scalars())
+
+
 def update_planning_dates(db: Session, planning_id: int, nouvelle_date: datetime) -> Planning:
     """
     Met à jour les dates (dernière/prochaine) d’un planning.
@@ -0,0 +1,122 @@
+# app/services/report_schedule_service.py
+
+"""
+Déclenchement des rapports planifiés (ReportSchedule).
+
+Chaque échéance due crée un rapport en attente (status pending) et avance
+next_run_at selon l'expression cron de la planification, dans son fuseau.
+next_run_at est persisté : la recherche des planifications dues est un
+parcours d'intervalle sur l'index (is_active, next_run_at), sans évaluer
+les expressions cron des planifications qui ne sont pas dues.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cron import next_run
+from app.models.report import Report, ReportSchedule, ReportStatus, ReportType, ReportFormat
+
+
+def compute_next_run(cron_expression: str, timezone: str, after: datetime) -> Optional[datetime]:
+    """
+    Prochaine échéance strictement après `after` (UTC naïf), évaluée dans
+    le fuseau de la planification (expression compilée une fois, en cache).
+
+    Raises:
+        ValueError: expression cron ou fuseau invalide
+    """
+    return next_run(cron_expression, timezone, after)
+
+
+def _invalidate(schedule: ReportSchedule, exc: Exception) -> None:
+    # Expression ou fuseau invalide : planification désactivée
+    schedule.record_run_error(f"Planification invalide : {exc}")
+    schedule.is_active = False
+
+
+def initialize_next_runs(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Calcule next_run_at des planifications actives qui n'en ont pas encore
+    (créées ou réactivées sans échéance). Ne valide pas la transaction.
+
+    Returns:
+        Nombre de planifications initialisées
+    """
+    now = now or datetime.utcnow()
+    schedules = db.execute(
+        select(ReportSchedule)
+        .where(ReportSchedule.is_active.is_(True), ReportSchedule.next_run_at.is_(None))
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    for schedule in schedules:
+        try:
+            schedule.next_run_at = compute_next_run(schedule.cron_expression, schedule.timezone, now)
+        except ValueError as exc:
+            _invalidate(schedule, exc)
+        else:
+            if schedule.next_run_at is None:
+                _invalidate(schedule, ValueError("aucune échéance future"))
+    return len(schedules)
+
+
+def _create_pending_report(schedule: ReportSchedule, now: datetime) -> Report:
+    return Report(
+        title=schedule.get_report_title(date=now.strftime("%Y-%m-%d")),
+        description=schedule.description,
+        report_type=ReportType(schedule.report_type),
+        report_format=ReportFormat(schedule.report_format),
+        status=ReportStatus.pending,
+        filters_json=schedule.filters_json,
+        parameters=schedule.parameters_json,
+        template_id=schedule.template_id,
+        created_by_id=schedule.created_by_id,
+    )
+
+
+def run_due_report_schedules(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Crée un rapport en attente pour chaque planification due et avance son
+    échéance (une transaction). Les planifications actives sans échéance
+    reçoivent leur première next_run_at.
+
+    Returns:
+        Nombre de rapports créés
+    """
+    now = now or datetime.utcnow()
+    initialize_next_runs(db, now)
+
+    # Deux conditions indexables (pas de OR) : parcours d'intervalle sur
+    # idx_report_schedule_due
+    schedules = db.execute(
+        select(ReportSchedule)
+        .where(ReportSchedule.is_active.is_(True), ReportSchedule.next_run_at <= now)
+        .order_by(ReportSchedule.next_run_at)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+
+    crees = 0
+    for schedule in schedules:
+        try:
+            prochaine = compute_next_run(schedule.cron_expression, schedule.timezone, now)
+        except ValueError as exc:
+            _invalidate(schedule, exc)
+            continue
+
+        schedule.record_run_start()
+        try:
+            db.add(_create_pending_report(schedule, now))
+        except ValueError as exc:
+            schedule.record_run_error(str(exc), next_run_at=prochaine)
+            continue
+        schedule.record_run_success(next_run_at=prochaine)
+        if prochaine is None:
+            # Dernière échéance possible (ex : date fixe passée)
+            schedule.is_active = False
+            schedule.next_run_at = None
+        crees += 1
+
+    db.commit()
+    return crees
@@ -0,0 +1,537 @@
+# app/services/report_service.py
+
+"""
+Moteur de génération des rapports.
+
+Chaque type de rapport est décrit par un jeu de colonnes SQL ; la requête
+ne sélectionne que ces colonnes (pas d'objets ORM) et est lue par lots de
+REPORT_YIELD_PER lignes via un curseur côté serveur, puis transmise au
+writer du format demandé. Un export d'un million d'interventions se fait
+ainsi à mémoire constante.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, time as dt_time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_, select, Select, Join, Alias
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.change_tracking import data_versions
+from app.db.database import SessionLocal
+from app.models.client import Client
+from app.models.equipement import Equipement
+from app.models.intervention import Intervention, PrioriteIntervention
+from app.models.planning import Planning
+from app.models.report import Report, ReportStatus, ReportType
+from app.models.technicien import Technicien
+from app.models.user import User
+from app.schemas.report import ReportFilters, ReportPeriod
+from app.services.report_writers import get_writer_class
+
+logger = logging.getLogger(__name__)
+
+REPORTS_DIR = settings.REPORTS_DIRECTORY
+
+
+@dataclass(frozen=True)
+class ReportColumn:
+    label: str
+    expression: Any
+    convert: Optional[Callable[[Any], Any]] = None
+
+
+def _euros(centimes: Optional[int]) -> Optional[float]:
+    return None if centimes is None else centimes / 100
+
+
+@dataclass(frozen=True)
+class ReportDataset:
+    """Colonnes, jointures et champs filtrables d'un type de rapport."""
+    columns: Tuple[ReportColumn, ...]
+    select_from: Any
+    order_by: Any
+    date_column: Any = None
+    statut_column: Any = None
+    type_column: Any = None
+    technicien_column: Any = None
+    equipement_column: Any = None
+    client_column: Any = None
+
+
+def _datasets() -> Dict[ReportType, ReportDataset]:
+    technicien_user = User.__table__.alias("technicien_user")
+    return {
+        ReportType.interventions: ReportDataset(
+            columns=(
+                ReportColumn("ID", Intervention.id),
+                ReportColumn("Titre", Intervention.titre),
+                ReportColumn("Type", Intervention.type_intervention),
+                ReportColumn("Statut", Intervention.statut),
+                ReportColumn("Priorité", Intervention.priorite),
+                ReportColumn("Urgence", Intervention.urgence),
+                ReportColumn("Date de création", Intervention.date_creation),
+                ReportColumn("Date limite", Intervention.date_limite),
+                ReportColumn("Date de clôture", Intervention.date_cloture),
+                ReportColumn("Durée réelle (min)", Intervention.duree_reelle),
+                ReportColumn("Coût réel (€)", Intervention.cout_reel, _euros),
+                ReportColumn("Équipement", Equipement.nom),
+                ReportColumn("Technicien", technicien_user.c.username),
+                ReportColumn("Client", Client.nom_entreprise),
+            ),
+            select_from=Intervention.__table__
+            .outerjoin(Equipement.__table__, Equipement.id == Intervention.equipement_id)
+            .outerjoin(Technicien.__table__, Technicien.id == Intervention.technicien_id)
+            .outerjoin(technicien_user, technicien_user.c.id == Technicien.user_id)
+            .outerjoin(Client.__table__, Client.id == Intervention.client_id),
+            order_by=Intervention.id,
+            date_column=Intervention.date_creation,
+            statut_column=Intervention.statut,
+            type_column=Intervention.type_intervention,
+            technicien_column=Intervention.technicien_id,
+            equipement_column=Intervention.equipement_id,
+            client_column=Intervention.client_id,
+        ),
+        ReportType.equipements: ReportDataset(
+            columns=(
+                ReportColumn("ID", Equipement.id),
+                ReportColumn("Nom", Equipement.nom),
+                ReportColumn("Type", Equipement.type_equipement),
+                ReportColumn("Localisation", Equipement.localisation),
+                ReportColumn("Statut", Equipement.statut),
+                ReportColumn("Criticité", Equipement.criticite),
+                ReportColumn("Mise en service", Equipement.date_mise_en_service),
+                ReportColumn("Fin de garantie", Equipement.date_fin_garantie),
+                ReportColumn("Client", Client.nom_entreprise),
+            ),
+            select_from=Equipement.__table__.outerjoin(Client.__table__, Client.id == Equipement.client_id),
+            order_by=Equipement.id,
+            date_column=Equipement.created_at,
+            statut_column=Equipement.statut,
+            type_column=Equipement.type_equipement,
+            equipement_column=Equipement.id,
+            client_column=Equipement.client_id,
+        ),
+        ReportType.techniciens: ReportDataset(
+            columns=(
+                ReportColumn("ID", Technicien.id),
+                ReportColumn("Utilisateur", User.username),
+                ReportColumn("Nom", User.full_name),
+                ReportColumn("Email", User.email),
+                ReportColumn("Équipe", Technicien.equipe),
+                ReportColumn("Niveau", Technicien.niveau_technicien),
+                ReportColumn("Zone", Technicien.zone_intervention),
+                ReportColumn("Disponibilité", Technicien.disponibilite),
+                ReportColumn("Actif", Technicien.is_active),
+            ),
+            select_from=Technicien.__table__.join(User.__table__, User.id == Technicien.user_id),
+            order_by=Technicien.id,
+            date_column=Technicien.created_at,
+            statut_column=Technicien.disponibilite,
+            technicien_column=Technicien.id,
+        ),
+        ReportType.clients: ReportDataset(
+            columns=(
+                ReportColumn("ID", Client.id),
+                ReportColumn("Entreprise", Client.nom_entreprise),
+                ReportColumn("Type", Client.type_client),
+                ReportColumn("Contact", Client.nom_contact),
+                ReportColumn("Email", Client.email),
+                ReportColumn("Ville", Client.ville),
+                ReportColumn("Niveau de service", Client.niveau_service),
+                ReportColumn("Actif", Client.is_active),
+                ReportColumn("Dernière intervention", Client.date_derniere_intervention),
+            ),
+            select_from=Client.__table__,
+            order_by=Client.id,
+            date_column=Client.date_creation,
+            type_column=Client.type_client,
+            client_column=Client.id,
+        ),
+        ReportType.planning: ReportDataset(
+            columns=(
+                ReportColumn("ID", Planning.id),
+                ReportColumn("Équipement", Equipement.nom),
+                ReportColumn("Fréquence", Planning.frequence),
+                ReportColumn("Prochaine date", Planning.prochaine_date),
+                ReportColumn("Dernière date", Planning.derniere_date),
+                ReportColumn("Statut", Planning.statut),
+                ReportColumn("Commentaire", Planning.commentaire),
+            ),
+            select_from=Planning.__table__.join(Equipement.__table__, Equipement.id == Planning.equipement_id),
+            order_by=Planning.id,
+            date_column=Planning.prochaine_date,
+            statut_column=Planning.statut,
+            equipement_column=Planning.equipement_id,
+        ),
+    }
+
+
+_DATASETS: Optional[Dict[ReportType, ReportDataset]] = None
+
+
+def get_dataset(report_type: ReportType) -> ReportDataset:
+    global _DATASETS
+    if _DATASETS is None:
+        _DATASETS = _datasets()
+    try:
+        return _DATASETS[ReportType(report_type)]
+    except KeyError:
+        raise ValueError(f"Type de rapport non pris en charge : {ReportType(report_type).value}")
+
+
+def resolve_period(filters: ReportFilters, now: datetime) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Bornes [début, fin[ de la période. Les dates explicites priment ; la
+    période prédéfinie n'est appliquée que si elle a été demandée.
+    """
+    if filters.date_debut or filters.date_fin:
+        debut = datetime.combine(filters.date_debut, dt_time.min) if filters.date_debut else None
+        fin = datetime.combine(filters.date_fin, dt_time.min) + timedelta(days=1) if filters.date_fin else None
+        return debut, fin
+    if "period" not in filters.model_fields_set or filters.period in (None, ReportPeriod.CUSTOM):
+        return None, None
+
+    today = datetime.combine(now.date(), dt_time.min)
+    period = filters.period
+    if period == ReportPeriod.TODAY:
+        return today, today + timedelta(days=1)
+    if period == ReportPeriod.YESTERDAY:
+        return today - timedelta(days=1), today
+    if period == ReportPeriod.LAST_7_DAYS:
+        return today - timedelta(days=7), today + timedelta(days=1)
+    if period == ReportPeriod.LAST_30_DAYS:
+        return today - timedelta(days=30), today + timedelta(days=1)
+    month_start = today.replace(day=1)
+    if period == ReportPeriod.THIS_MONTH:
+        return month_start, None
+    if period == ReportPeriod.LAST_MONTH:
+        return (month_start - timedelta(days=1)).replace(day=1), month_start
+    if period == ReportPeriod.THIS_QUARTER:
+        return month_start.replace(month=3 * ((today.month - 1) // 3) + 1), None
+    return today.replace(month=1, day=1), None
+
+
+def build_report_query(
+    report_type: ReportType,
+    filters_json: Optional[Dict[str, Any]] = None,
+    now: Optional[datetime] = None,
+) -> Tuple[Select, Tuple[ReportColumn, ...]]:
+    """
+    Requête (colonnes uniquement, ordre stable) d'un type de rapport avec ses
+    filtres. Les filtres sans correspondance pour ce type sont ignorés.
+
+    Raises:
+        ValueError: type non pris en charge ou filtres invalides
+    """
+    dataset = get_dataset(report_type)
+    filters = ReportFilters.model_validate(filters_json or {})
+    stmt = (
+        select(*[column.expression for column in dataset.columns])
+        .select_from(dataset.select_from)
+        .order_by(dataset.order_by)
+    )
+
+    if dataset.date_column is not None:
+        debut, fin = resolve_period(filters, now or datetime.utcnow())
+        if debut is not None:
+            stmt = stmt.where(dataset.date_column >= debut)
+        if fin is not None:
+            stmt = stmt.where(dataset.date_column < fin)
+    if filters.statuts and dataset.statut_column is not None:
+        stmt = stmt.where(dataset.statut_column.in_(filters.statuts))
+    if filters.types and dataset.type_column is not None:
+        stmt = stmt.where(dataset.type_column.in_(filters.types))
+    if filters.priorites and ReportType(report_type) == ReportType.interventions:
+        # Priorités numérotées dans l'ordre de PrioriteIntervention (1 = urgente)
+        niveaux = list(PrioriteIntervention)
+        stmt = stmt.where(Intervention.priorite.in_([niveaux[p - 1] for p in filters.priorites if 1 <= p <= len(niveaux)]))
+    for ids, column in (
+        (filters.technicien_ids, dataset.technicien_column),
+        (filters.equipement_ids, dataset.equipement_column),
+        (filters.client_ids, dataset.client_column),
+    ):
+        if ids and column is not None:
+            stmt = stmt.where(column.in_(ids))
+    return stmt, dataset.columns
+
+
+def iter_report_rows(db: Session, stmt: Select, columns: Sequence[ReportColumn]) -> Iterator[List[List[Any]]]:
+    """Lots de lignes converties, lus par REPORT_YIELD_PER via un curseur serveur."""
+    converters = [(i, column.convert) for i, column in enumerate(columns) if column.convert]
+    result = db.execute(stmt.execution_options(yield_per=settings.REPORT_YIELD_PER))
+    for partition in result.partitions():
+        rows = [list(row) for row in partition]
+        for i, convert in converters:
+            for row in rows:
+                row[i] = convert(row[i])
+        yield rows
+
+
+def _file_name(report: Report, extension: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "_", report.title or "").strip("_")[:80] or "rapport"
+    return f"{report.id}_{slug}.{extension}"
+
+
+def generate_report(report_id: int, session_factory: Callable[[], Session] = SessionLocal) -> Optional[ReportStatus]:
+    """
+    Génère le fichier d'un rapport en attente et enregistre le résultat.
+
+    Le rapport est réservé (verrou SKIP LOCKED puis statut generating) : un
+    rapport n'est généré qu'une fois même si plusieurs workers le reçoivent.
+
+    Returns:
+        Statut final, ou None si le rapport n'était pas (ou plus) en attente
+    """
+    db = session_factory()
+    try:
+        report = db.execute(
+            select(Report)
+            .where(Report.id == report_id, Report.status == ReportStatus.pending)
+            .with_for_update(skip_locked=True)
+        ).scalar_one_or_none()
+        if report is None:
+            return None
+        report.start_generation()
+        try:
+            writer_class = get_writer_class(report.report_format.value)
+            stmt, columns = build_report_query(report.report_type, report.filters_json)
+            max_rows = writer_class.max_rows()
+            if max_rows is not None:
+                # Une ligne de plus que le plafond : le writer sait seulement qu'il tronque
+                stmt = stmt.limit(max_rows + 1)
+        except ValueError as exc:
+            # Demande invalide (type, format, filtres) : échec sans rien lire
+            report.fail_generation(str(exc))
+            db.commit()
+            return ReportStatus.failed
+        db.commit()
+
+        tmp_path = None
+        try:
+            os.makedirs(REPORTS_DIR, exist_ok=True)
+            file_name = _file_name(report, writer_class.extension)
+            path = os.path.join(REPORTS_DIR, file_name)
+            tmp_path = f"{path}.part"
+            with writer_class(tmp_path, report.title, [column.label for column in columns]) as writer:
+                for rows in iter_report_rows(db, stmt, columns):
+                    writer.write_rows(rows)
+            os.replace(tmp_path, path)
+        except Exception as exc:
+            db.rollback()
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            logger.exception("Échec de génération du rapport %s", report_id)
+            report.fail_generation(str(exc)[:2000])
+            db.commit()
+            return ReportStatus.failed
+
+        report.file_name = file_name
+        report.mime_type = writer_class.mime_type
+        report.complete_generation(path, os.path.getsize(path))
+        if report.date_expiration is None:
+            report.date_expiration = report.date_generation_end + timedelta(days=settings.REPORT_RETENTION_DAYS)
+        db.commit()
+        enforce_report_storage(db)
+        return ReportStatus.completed
+    finally:
+        db.close()
+
+
+def source_tables(report_type: ReportType) -> Set[str]:
+    """Tables lues par un type de rapport (alias résolus)."""
+    def tables(clause) -> Set[str]:
+        if isinstance(clause, Join):
+            return tables(clause.left) | tables(clause.right)
+        if isinstance(clause, Alias):
+            return tables(clause.element)
+        return {clause.name}
+
+    return tables(get_dataset(report_type).select_from)
+
+
+def compute_cache_key(
+    db: Session,
+    report_type: ReportType,
+    report_format: str,
+    filters_json: Optional[Dict[str, Any]] = None,
+    parameters: Optional[Dict[str, Any]] = None,
+    title: Optional[str] = None,
+    template_id: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> str:
+    """
+    Empreinte SHA-256 d'une demande de rapport : type, format, titre et
+    modèle (présents dans le fichier), filtres sous forme canonique (période
+    résolue en dates, listes triées), paramètres et version des données des
+    tables lues. Deux demandes de même empreinte produisent le même
+    fichier ; toute écriture sur une table source change l'empreinte.
+    """
+    filters = ReportFilters.model_validate(filters_json or {})
+    debut, fin = resolve_period(filters, now or datetime.utcnow())
+    canonical = filters.model_dump(mode="json", exclude={"period", "date_debut", "date_fin"})
+    canonical = {key: sorted(value) if isinstance(value, list) else value for key, value in canonical.items()}
+    payload = {
+        "type": ReportType(report_type).value,
+        "format": report_format,
+        "title": title,
+        "template_id": template_id,
+        "filters": canonical,
+        "periode": [debut, fin],
+        "parameters": parameters or {},
+        "versions": data_versions(db, source_tables(report_type)),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def find_reusable_report(db: Session, cache_key: str, now: Optional[datetime] = None) -> Optional[Report]:
+    """
+    Rapport de même empreinte encore utilisable : terminé, non expiré et
+    fichier présent, ou en cours (demandes identiques simultanées). Une
+    demande en attente ou en génération depuis plus de
+    REPORT_GENERATION_TIMEOUT_SECONDS est considérée bloquée et ignorée.
+    """
+    limite = (now or datetime.utcnow()) - timedelta(seconds=settings.REPORT_GENERATION_TIMEOUT_SECONDS)
+    candidates = db.execute(
+        select(Report)
+        .where(
+            Report.cache_key == cache_key,
+            or_(
+                Report.status == ReportStatus.completed,
+                and_(Report.status == ReportStatus.generating, Report.date_generation_start >= limite),
+                and_(Report.status == ReportStatus.pending, Report.date_creation >= limite),
+            ),
+        )
+        .order_by(Report.date_creation.desc())
+        .limit(5)
+    ).scalars()
+    for report in candidates:
+        if report.status != ReportStatus.completed:
+            return report
+        if report.can_download and os.path.isfile(report.file_path):
+            return report
+    return None
+
+
+def create_report(db: Session, request, created_by_id: int) -> Tuple[Report, bool]:
+    """
+    Enregistre une demande de rapport (statut pending) à partir d'un
+    ReportRequest, ou retourne un rapport identique encore valide.
+
+    Returns:
+        (rapport, réutilisé)
+    """
+    report_type = ReportType(request.type.value)
+    get_dataset(report_type)
+    get_writer_class(request.format.value)
+    filters = request.filters.model_dump(mode="json", exclude_unset=True) if request.filters else None
+    cache_key = None
+    if settings.REPORT_CACHE_ENABLED:
+        cache_key = compute_cache_key(
+            db, report_type, request.format.value, filters, title=request.title, template_id=request.template_id
+        )
+        existing = find_reusable_report(db, cache_key)
+        if existing is not None:
+            return existing, True
+    report = Report(
+        title=request.title or f"Rapport {report_type.value} - {datetime.utcnow():%Y-%m-%d}",
+        description=request.description,
+        report_type=report_type,
+        report_format=request.format.value,
+        status=ReportStatus.pending,
+        filters_json=filters,
+        template_id=request.template_id,
+        created_by_id=created_by_id,
+        cache_key=cache_key,
+    )
+    db.add(report)
+    db.commit()
+    db.refresh(report)
+    return report, False
+
+
+def _evict(report: Report) -> None:
+    if report.file_path and os.path.exists(report.file_path):
+        os.remove(report.file_path)
+    report.status = ReportStatus.expired
+    report.file_path = None
+
+
+def enforce_report_storage(db: Session, max_bytes: Optional[int] = None, now: Optional[datetime] = None) -> int:
+    """
+    Supprime les fichiers des rapports expirés, puis, si le total dépasse
+    REPORT_STORAGE_MAX_MB, ceux des rapports les moins récemment téléchargés
+    (à défaut : générés). Les rapports évincés passent au statut expired.
+
+    Returns:
+        Nombre de rapports évincés
+    """
+    now = now or datetime.utcnow()
+    max_bytes = settings.REPORT_STORAGE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+    evicted = 0
+    for report in db.execute(
+        select(Report).where(Report.status == ReportStatus.completed, Report.date_expiration < now)
+    ).scalars():
+        _evict(report)
+        evicted += 1
+    db.flush()
+
+    total = db.execute(
+        select(func.coalesce(func.sum(Report.file_size), 0)).where(Report.status == ReportStatus.completed)
+    ).scalar_one()
+    if total > max_bytes:
+        lru = db.execute(
+            select(Report)
+            .where(Report.status == ReportStatus.completed)
+            .order_by(func.coalesce(Report.last_downloaded_at, Report.date_generation_end), Report.id)
+        ).scalars()
+        for report in lru:
+            if total <= max_bytes:
+                break
+            total -= report.file_size or 0
+            _evict(report)
+            evicted += 1
+    db.commit()
+    return evicted
+
+
+def run_report_maintenance(db: Session) -> int:
+    """Tâche planifiée : purge des rapports expirés et plafond de stockage."""
+    return enforce_report_storage(db)
+
+
+def get_report_or_404(db: Session, report_id: int, user: dict) -> Report:
+    """Rapport visible par l'utilisateur : son auteur, admin/responsable, ou rapport public."""
+    report = db.get(Report, report_id)
+    if report is None or not (
+        user.get("role") in ("admin", "responsable")
+        or report.created_by_id == user.get("user_id")
+        or report.is_public
+    ):
+        raise HTTPException(status_code=404, detail="Rapport introuvable")
+    return report
+
+
+def get_report_for_download(db: Session, report_id: int, user: dict, token: Optional[str] = None) -> Report:
+    """
+    Rapport téléchargeable (prêt, non expiré, quota non atteint) ; le jeton
+    d'accès du rapport ouvre le téléchargement à tout utilisateur authentifié.
+    Le compteur de téléchargements est incrémenté.
+    """
+    report = db.get(Report, report_id)
+    if report is None or not token or token != report.access_token:
+        report = get_report_or_404(db, report_id, user)
+    if not report.is_ready:
+        raise HTTPException(status_code=409, detail="Rapport en cours de génération ou en échec")
+    if not report.can_download or not os.path.isfile(report.file_path):
+        raise HTTPException(status_code=410, detail="Rapport expiré ou plus disponible")
+    report.increment_download()
+    db.commit()
+    return report
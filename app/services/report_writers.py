@@ -0,0 +1,277 @@
+# app/services/report_writers.py
+
+"""
+Écriture des rapports en flux, un format par classe.
+
+Chaque writer reçoit les lignes par lots et les écrit immédiatement dans
+le fichier de sortie : la mémoire consommée ne dépend pas du nombre de
+lignes (CSV ligne à ligne, XLSX en mode write-only, JSON élément par
+élément, PDF page par page avec un plafond REPORT_PDF_MAX_ROWS).
+"""
+
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Iterable, List, Optional, Sequence
+
+from app.core.config import settings
+
+
+def _to_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return str(value.value)
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "oui" if value else "non"
+    return str(value)
+
+
+class ReportWriter:
+    """
+    Base des writers : `write_rows` peut être appelé autant de fois que
+    nécessaire entre l'ouverture et `close`.
+    """
+
+    extension = ""
+    mime_type = "application/octet-stream"
+
+    def __init__(self, path: str, title: str, headers: Sequence[str]):
+        self.path = path
+        self.title = title
+        self.headers = list(headers)
+        self.rows_written = 0
+
+    @classmethod
+    def max_rows(cls) -> Optional[int]:
+        """Nombre maximal de lignes écrites (None : illimité)."""
+        return None
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class CsvReportWriter(ReportWriter):
+    extension = "csv"
+    mime_type = "text/csv"
+
+    def __init__(self, path: str, title: str, headers: Sequence[str]):
+        super().__init__(path, title, headers)
+        # BOM : accents correctement lus à l'ouverture dans Excel
+        self._file = open(path, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.writer(self._file, delimiter=settings.REPORT_CSV_DELIMITER)
+        self._writer.writerow(self.headers)
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        for row in rows:
+            self._writer.writerow([_to_text(value) for value in row])
+            self.rows_written += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class XlsxReportWriter(ReportWriter):
+    """
+    Classeur openpyxl en mode write-only : les lignes sont sérialisées au
+    fil de l'eau dans un fichier temporaire. Une feuille Excel étant limitée
+    à 1 048 576 lignes, les exports plus volumineux continuent sur une
+    nouvelle feuille.
+    """
+
+    extension = "xlsx"
+    mime_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    MAX_ROWS_PER_SHEET = 1_048_575  # en-tête compris
+
+    def __init__(self, path: str, title: str, headers: Sequence[str]):
+        from openpyxl import Workbook
+
+        super().__init__(path, title, headers)
+        self._workbook = Workbook(write_only=True)
+        self._sheet = None
+        self._sheet_rows = 0
+        self._new_sheet()
+
+    def _new_sheet(self) -> None:
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+
+        numero = len(self._workbook.worksheets) + 1
+        self._sheet = self._workbook.create_sheet("Données" if numero == 1 else f"Données ({numero})")
+        self._sheet.freeze_panes = "A2"
+        header = []
+        for label in self.headers:
+            cell = WriteOnlyCell(self._sheet, value=label)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        self._sheet.append(header)
+        self._sheet_rows = 0
+
+    @staticmethod
+    def _cell(value: Any) -> Any:
+        if isinstance(value, Enum):
+            return value.value
+        if isinstance(value, Decimal):
+            return float(value)
+        return value
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        for row in rows:
+            if self._sheet_rows >= self.MAX_ROWS_PER_SHEET:
+                self._new_sheet()
+            self._sheet.append([self._cell(value) for value in row])
+            self._sheet_rows += 1
+            self.rows_written += 1
+
+    def close(self) -> None:
+        self._workbook.save(self.path)
+
+
+class JsonReportWriter(ReportWriter):
+    """Document {"title", "columns", "data": [...]} écrit élément par élément."""
+
+    extension = "json"
+    mime_type = "application/json"
+
+    def __init__(self, path: str, title: str, headers: Sequence[str]):
+        super().__init__(path, title, headers)
+        self._file = open(path, "w", encoding="utf-8")
+        entete = json.dumps({"title": title, "columns": self.headers}, ensure_ascii=False)
+        self._file.write(entete[:-1] + ', "data": [')
+
+    @staticmethod
+    def _default(value: Any) -> Any:
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return float(value)
+        if isinstance(value, Enum):
+            return value.value
+        return str(value)
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        for row in rows:
+            if self.rows_written:
+                self._file.write(",")
+            self._file.write(json.dumps(dict(zip(self.headers, row)), default=self._default, ensure_ascii=False))
+            self.rows_written += 1
+
+    def close(self) -> None:
+        self._file.write("]}")
+        self._file.close()
+
+
+class PdfReportWriter(ReportWriter):
+    """
+    Tableau PDF (A4 paysage) dessiné page par page sur un canvas reportlab,
+    sans construire de tableau en mémoire. reportlab conserve toutefois les
+    pages jusqu'à l'enregistrement : au-delà de REPORT_PDF_MAX_ROWS lignes,
+    le PDF est tronqué avec une mention renvoyant vers l'export CSV/Excel.
+    La requête est limitée à max_rows() + 1 lignes : la ligne en trop
+    signale seulement la troncature.
+    """
+
+    extension = "pdf"
+    mime_type = "application/pdf"
+    FONT = "Helvetica"
+    FONT_SIZE = 7
+    ROW_HEIGHT = 11
+    MARGIN = 28
+
+    def __init__(self, path: str, title: str, headers: Sequence[str]):
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.pdfgen import canvas
+
+        super().__init__(path, title, headers)
+        self._width, self._height = landscape(A4)
+        self._canvas = canvas.Canvas(path, pagesize=(self._width, self._height), pageCompression=1)
+        self._canvas.setTitle(title)
+        self._col_width = (self._width - 2 * self.MARGIN) / max(len(self.headers), 1)
+        self._page = 0
+        self._y = 0.0
+        self.truncated = False
+        self._start_page()
+
+    def _fit(self, text: str) -> str:
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        limite = self._col_width - 4
+        if stringWidth(text, self.FONT, self.FONT_SIZE) <= limite:
+            return text
+        while text and stringWidth(text + "…", self.FONT, self.FONT_SIZE) > limite:
+            text = text[:-1]
+        return text + "…"
+
+    def _draw_row(self, values: List[str], bold: bool = False) -> None:
+        self._canvas.setFont(f"{self.FONT}-Bold" if bold else self.FONT, self.FONT_SIZE)
+        for i, text in enumerate(values):
+            self._canvas.drawString(self.MARGIN + i * self._col_width + 2, self._y, self._fit(text))
+        self._y -= self.ROW_HEIGHT
+
+    def _start_page(self) -> None:
+        if self._page:
+            self._canvas.showPage()
+        self._page += 1
+        self._y = self._height - self.MARGIN
+        self._canvas.setFont(f"{self.FONT}-Bold", 11)
+        self._canvas.drawString(self.MARGIN, self._y, self.title)
+        self._canvas.setFont(self.FONT, self.FONT_SIZE)
+        self._canvas.drawRightString(self._width - self.MARGIN, self._y, f"Page {self._page}")
+        self._y -= 2 * self.ROW_HEIGHT
+        self._draw_row(self.headers, bold=True)
+        self._canvas.line(self.MARGIN, self._y + self.ROW_HEIGHT - 2, self._width - self.MARGIN, self._y + self.ROW_HEIGHT - 2)
+
+    @classmethod
+    def max_rows(cls) -> Optional[int]:
+        return settings.REPORT_PDF_MAX_ROWS
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        for row in rows:
+            if self.rows_written >= self.max_rows():
+                self.truncated = True
+                break
+            if self._y < self.MARGIN:
+                self._start_page()
+            self._draw_row([_to_text(value) for value in row])
+            self.rows_written += 1
+
+    def close(self) -> None:
+        if self.truncated:
+            if self._y < self.MARGIN + self.ROW_HEIGHT:
+                self._start_page()
+            self._canvas.setFont(f"{self.FONT}-Oblique", self.FONT_SIZE + 1)
+            self._canvas.drawString(
+                self.MARGIN, self._y - self.ROW_HEIGHT,
+                f"Tableau limité aux {self.rows_written} premières lignes : utiliser l'export CSV ou Excel.",
+            )
+        self._canvas.save()
+
+
+WRITERS = {
+    "csv": CsvReportWriter,
+    "excel": XlsxReportWriter,
+    "json": JsonReportWriter,
+    "pdf": PdfReportWriter,
+}
+
+
+def get_writer_class(report_format: str) -> type:
+    try:
+        return WRITERS[report_format]
+    except KeyError:
+        raise ValueError(f"Format de rapport non pris en charge : {report_format}")
@@ -0,0 +1,81 @@
+# app/services/search_service.py
+
+"""
+Recherche plein texte sur l'index search_entries (interventions,
+équipements, documents), classée par pertinence et paginée par curseur
+sur (score, id).
+
+PostgreSQL : websearch_to_tsquery en français sur la colonne tsvector
+(index GIN), classement ts_rank_cd. SQLite : table FTS5, chaque mot
+recherché en préfixe (à défaut de racinisation), classement bm25.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Float, and_, cast, column, func, literal_column, or_, select, table
+from sqlalchemy.orm import Session
+
+from app.core.pagination import clamp_limit, decode_cursor, encode_cursor
+from app.db.search_index import CONFIG_TEXTE
+from app.models.search_entry import SearchEntry
+from app.schemas.search import SearchResult, SourceRecherche
+
+_FTS = table("search_entries_fts", column("rowid"))
+# Poids bm25 (titre, contenu) : même rapport que les poids A (1.0) et B (0.4) de ts_rank_cd
+_POIDS_FTS5 = (2.5, 1.0)
+
+
+def requete_fts5(texte: str) -> Optional[str]:
+    """Expression MATCH FTS5 : tous les mots, chacun en préfixe ; None si aucun mot."""
+    mots = re.findall(r"\w+", texte)
+    return " ".join(f'"{mot}"*' for mot in mots) or None
+
+
+def search(
+    db: Session,
+    texte: str,
+    sources: Optional[List[SourceRecherche]] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[SearchResult], Optional[str]]:
+    """
+    Retourne une page de résultats et le curseur de la page suivante
+    (None sur la dernière page).
+
+    Raises:
+        HTTPException 400: curseur invalide
+    """
+    limit = clamp_limit(limit)
+    after = tuple(decode_cursor(cursor, 2)) if cursor else None
+
+    if db.get_bind().dialect.name == "postgresql":
+        requete = func.websearch_to_tsquery(CONFIG_TEXTE, texte)
+        # ts_rank_cd renvoie un real : en double, le score du curseur (float
+        # Python) se compare au même type, sans perdre les ex æquo
+        score = cast(func.ts_rank_cd(SearchEntry.vecteur, requete), Float(precision=53))
+        stmt = select(SearchEntry.source, SearchEntry.source_id, SearchEntry.titre, SearchEntry.id, score.label("score"))
+        stmt = stmt.where(SearchEntry.vecteur.op("@@")(requete))
+    else:
+        expression = requete_fts5(texte)
+        if expression is None:
+            return [], None
+        fts = literal_column("search_entries_fts")
+        score = -func.bm25(fts, *_POIDS_FTS5)
+        stmt = select(SearchEntry.source, SearchEntry.source_id, SearchEntry.titre, SearchEntry.id, score.label("score"))
+        stmt = stmt.join_from(SearchEntry, _FTS, _FTS.c.rowid == SearchEntry.id).where(fts.op("MATCH")(expression))
+
+    if sources:
+        stmt = stmt.where(SearchEntry.source.in_([s.value for s in sources]))
+    if after is not None:
+        last_score, last_id = after
+        stmt = stmt.where(or_(score < last_score, and_(score == last_score, SearchEntry.id < last_id)))
+    # Une ligne de plus que demandé indique s'il reste une page
+    rows = db.execute(stmt.order_by(score.desc(), SearchEntry.id.desc()).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].score, rows[-1].id)
+    results = [SearchResult(type=row.source, id=row.source_id, titre=row.titre, score=row.score) for row in rows]
+    return results, next_cursor
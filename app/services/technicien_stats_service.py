@@ -0,0 +1,183 @@
+# app/services/technicien_stats_service.py
+
+"""
+Calcul en lot des KPI techniciens.
+
+Les propriétés KPI de `Technicien` (taux_reussite, satisfaction_moyenne,
+score_affectation...) exécutent chacune une ou plusieurs requêtes : lister
+N techniciens avec leurs KPI coûtait plusieurs milliers d'allers-retours SQL.
+Ce service calcule les KPI d'un ensemble de techniciens en trois requêtes
+(quel que soit N) et les attache aux instances, que les propriétés lisent
+en priorité.
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select, func, case, and_, or_
+from sqlalchemy.orm import Session
+
+from app.models.intervention import Intervention, StatutIntervention, PrioriteIntervention
+from app.models.technicien import Technicien
+from app.schemas.technicien import TechnicienStats
+
+STATUTS_ACTIFS = (
+    StatutIntervention.affectee,
+    StatutIntervention.en_cours,
+    StatutIntervention.en_attente,
+)
+STATUTS_TERMINES = (StatutIntervention.cloturee, StatutIntervention.archivee)
+
+# Une intervention clôturée est un échec si le même technicien est rappelé
+# sur le même équipement dans ce délai (même règle que Technicien.taux_reussite)
+DELAI_REOUVERTURE = timedelta(days=7)
+
+
+def _count_if(condition):
+    return func.count(case((condition, 1)))
+
+
+def _taux_reussite(
+    db: Session,
+    technicien_ids: List[int],
+    nb_terminees: Dict[int, int]
+) -> Dict[int, Optional[float]]:
+    """
+    Taux de réussite par technicien : deux requêtes, puis recherche
+    dichotomique des réouvertures dans les dates de création triées.
+    """
+    clotures = db.execute(
+        select(Intervention.technicien_id, Intervention.equipement_id, Intervention.date_cloture)
+        .where(
+            Intervention.technicien_id.in_(technicien_ids),
+            Intervention.statut == StatutIntervention.cloturee,
+            Intervention.date_cloture.isnot(None),
+        )
+    ).all()
+
+    creations: Dict[tuple, List[datetime]] = defaultdict(list)
+    equipement_ids = {row.equipement_id for row in clotures}
+    if equipement_ids:
+        # Comme la version unitaire, equipement_id NULL correspond à NULL
+        meme_equipement = Intervention.equipement_id.in_(equipement_ids - {None})
+        if None in equipement_ids:
+            meme_equipement = or_(meme_equipement, Intervention.equipement_id.is_(None))
+        rows = db.execute(
+            select(Intervention.technicien_id, Intervention.equipement_id, Intervention.date_creation)
+            .where(
+                Intervention.technicien_id.in_(technicien_ids),
+                meme_equipement,
+                Intervention.date_creation.isnot(None),
+            )
+            .order_by(Intervention.date_creation)
+        ).all()
+        for row in rows:
+            creations[(row.technicien_id, row.equipement_id)].append(row.date_creation)
+
+    reussites: Dict[int, int] = defaultdict(int)
+    for row in clotures:
+        dates = creations.get((row.technicien_id, row.equipement_id), [])
+        idx = bisect_right(dates, row.date_cloture)
+        if idx == len(dates) or dates[idx] > row.date_cloture + DELAI_REOUVERTURE:
+            reussites[row.technicien_id] += 1
+
+    return {
+        tid: (round(reussites[tid] / nb_terminees[tid] * 100, 1) if nb_terminees.get(tid) else None)
+        for tid in technicien_ids
+    }
+
+
+def compute_technicien_stats(
+    db: Session,
+    technicien_ids: Optional[Iterable[int]] = None,
+    periode_mois: int = 6,
+) -> Dict[int, TechnicienStats]:
+    """
+    Calcule les KPI des techniciens demandés (tous si `technicien_ids` est None).
+
+    Returns:
+        Dict technicien_id -> TechnicienStats (une entrée par technicien,
+        y compris ceux sans intervention)
+    """
+    if technicien_ids is None:
+        ids = list(db.execute(select(Technicien.id)).scalars())
+    else:
+        ids = list(dict.fromkeys(technicien_ids))
+    if not ids:
+        return {}
+
+    maintenant = datetime.utcnow()
+    debut_mois = maintenant.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    debut_periode = maintenant - timedelta(days=periode_mois * 30)
+    dans_periode = Intervention.date_creation >= debut_periode
+
+    agregats = db.execute(
+        select(
+            Intervention.technicien_id,
+            func.count(Intervention.id).label("total"),
+            _count_if(Intervention.statut.in_(STATUTS_ACTIFS)).label("actives"),
+            _count_if(Intervention.statut == StatutIntervention.en_cours).label("en_cours"),
+            _count_if(Intervention.date_creation >= debut_mois).label("mois_courant"),
+            _count_if(Intervention.statut == StatutIntervention.cloturee).label("terminees"),
+            func.avg(Intervention.duree_reelle).label("duree_moyenne"),
+            func.avg(Intervention.satisfaction_client).label("satisfaction"),
+            func.max(Intervention.date_creation).label("derniere"),
+            _count_if(dans_periode).label("periode"),
+            _count_if(and_(dans_periode, Intervention.statut.in_(STATUTS_TERMINES))).label("terminees_periode"),
+            _count_if(and_(
+                dans_periode,
+                or_(Intervention.urgence.is_(True), Intervention.priorite == PrioriteIntervention.urgente)
+            )).label("urgentes_periode"),
+        )
+        .where(Intervention.technicien_id.in_(ids))
+        .group_by(Intervention.technicien_id)
+    ).all()
+    par_technicien = {row.technicien_id: row for row in agregats}
+
+    taux = _taux_reussite(
+        db, ids, {tid: row.terminees for tid, row in par_technicien.items()}
+    )
+
+    stats: Dict[int, TechnicienStats] = {}
+    for tid in ids:
+        row = par_technicien.get(tid)
+        if row is None:
+            stats[tid] = TechnicienStats(technicien_id=tid, periode_mois=periode_mois)
+            continue
+        stats[tid] = TechnicienStats(
+            technicien_id=tid,
+            nb_interventions_total=row.total,
+            nb_interventions_actives=row.actives,
+            nb_interventions_en_cours=row.en_cours,
+            nb_interventions_mois_courant=row.mois_courant,
+            nb_interventions_terminees=row.terminees,
+            taux_reussite=taux[tid],
+            temps_moyen_intervention=round(float(row.duree_moyenne) / 60, 1) if row.duree_moyenne is not None else None,
+            satisfaction_moyenne=round(float(row.satisfaction), 2) if row.satisfaction is not None else None,
+            derniere_intervention_date=row.derniere,
+            periode_mois=periode_mois,
+            nb_interventions_periode=row.periode,
+            nb_terminees_periode=row.terminees_periode,
+            nb_urgentes_periode=row.urgentes_periode,
+        )
+    return stats
+
+
+def attach_technicien_stats(
+    db: Session,
+    techniciens: List[Technicien],
+    periode_mois: int = 6,
+) -> List[Technicien]:
+    """
+    Calcule les KPI d'une liste de techniciens et les attache aux instances :
+    les propriétés KPI et generer_rapport_performance ne requêtent plus.
+
+    NOTE: les statistiques sont un instantané ; les recalculer après
+    modification des interventions.
+    """
+    stats = compute_technicien_stats(db, [t.id for t in techniciens], periode_mois=periode_mois)
+    for technicien in techniciens:
+        technicien._stats = stats.get(technicien.id)
+    return techniciens
@@ -1,29 +1,31 @@
+import secrets
+from sqlalchemy import select, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from fastapi import HTTPException, status
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 from app.core.security import get_password_hash
+from app.core.rbac import invalidate_user_status
 from app.models.user import UserRole
-from app.db.database import SessionLocal
 
-def _check_exists_in_fallback(email: str | None = None, username: str | None = None) -> bool:
+def _find_identity_conflicts(db: Session, email: str, username: str) -> tuple[bool, bool]:
     """
-    Vérifie l'existence d'un utilisateur dans une session fallback (utile en tests
-    où la session de route et la session utilisée directement dans les tests diffèrent).
-    """
-    try:
-        with SessionLocal() as alt_db:  # type: ignore
-            q = alt_db.query(User)
-            if email is not None:
-                if q.filter(User.email == email).first():
-                    return True
-            if username is not None:
-                if q.filter(User.username == username).first():
-                    return True
-    except Exception:
-        # Silencieux si indisponible
-        return False
-    return False
+    Vérifie l'unicité email/username en une seule requête.
+
+    Returns:
+        (email_pris, username_pris)
+    """
+    rows = db.execute(
+        select(User.email, User.username)
+        .where(or_(User.email == email, User.username == username))
+        .limit(2)  # au plus un compte par contrainte unique
+    ).all()
+    return (
+        any(row.email == email for row in rows),
+        any(row.username == username for row in rows),
+    )
 
 def create_user(db: Session, user_data: UserCreate) -> User:
     """
@@ -35,12 +37,13 @@ def create_user(db: Session, user_data: UserCreate) -> User:
     Raises:
         HTTPException 409: email ou username déjà utilisé.
     """
-    if db.query(User).filter(User.email == user_data.email).first() or _check_exists_in_fallback(email=user_data.email):
+    email_pris, username_pris = _find_identity_conflicts(db, user_data.email, user_data.username)
+    if email_pris:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Email déjà utilisé."
         )
-    if db.query(User).filter(User.username == user_data.username).first() or _check_exists_in_fallback(username=user_data.username):
+    if username_pris:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Username déjà utilisé."
@@ -66,34 +69,20 @@ def get_user_by_id(db: Session, user_id: int) -> User:
     Raises:
         HTTPException 404: si utilisateur inexistant.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    # Session.get sert l'instance depuis l'identity map si déjà chargée
+    user = db.get(User, user_id)
     if not user:
-        # Fallback: tente autre session (notamment en tests)
-        try:
-            with SessionLocal() as alt_db:  # type: ignore
-                user = alt_db.query(User).filter(User.id == user_id).first()
-        except Exception:
-            user = None
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Utilisateur non trouvé."
-            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Utilisateur non trouvé."
+        )
     return user
 
 def get_user_by_email(db: Session, email: str) -> User | None:
     """
     Récupère un utilisateur par email.
     """
-    user = db.query(User).filter(User.email == email).first()
-    if user:
-        return user
-    # Fallback (tests)
-    try:
-        with SessionLocal() as alt_db:  # type: ignore
-            return alt_db.query(User).filter(User.email == email).first()
-    except Exception:
-        return None
+    return db.execute(select(User).where(User.email == email)).scalar_one_or_none()
 
 def ensure_user_for_email(db: Session, email: str, role: UserRole) -> User:
     """Retourne l'utilisateur pour l'email, ou crée un compte minimal si absent.
@@ -124,6 +113,33 @@ def ensure_user_for_email(db: Session, email: str, role: UserRole) -> User:
     db.refresh(user)
     return user
 
+def get_or_create_system_user(db: Session) -> User:
+    """
+    Compte technique (SYSTEM_USER_EMAIL) auteur des actions automatiques.
+    Inactif et sans mot de passe connu : il ne peut pas se connecter.
+    """
+    user = get_user_by_email(db, settings.SYSTEM_USER_EMAIL)
+    if user:
+        return user
+    user = User(
+        username=settings.SYSTEM_USERNAME,
+        full_name="Système",
+        email=settings.SYSTEM_USER_EMAIL,
+        role=UserRole.admin,
+        hashed_password=get_password_hash(secrets.token_urlsafe(32)),
+        is_active=False,
+    )
+    db.add(user)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Créé en parallèle par un autre worker
+        db.rollback()
+        return get_user_by_email(db, settings.SYSTEM_USER_EMAIL)
+    db.refresh(user)
+    return user
+
+
 def get_all_users(db: Session) -> list[User]:
     """
     Liste tous les utilisateurs.
@@ -152,6 +168,7 @@ def deactivate_user(db: Session, user_id: int) -> None:
     user = get_user_by_id(db, user_id)
     user.is_active = False
     db.commit()
+    invalidate_user_status(user.id)
 
 def reactivate_user(db: Session, user_id: int) -> User:
     """
@@ -160,5 +177,6 @@ def reactivate_user(db: Session, user_id: int) -> User:
     user = get_user_by_id(db, user_id)
     user.is_active = True
     db.commit()
+    invalidate_user_status(user.id)
     db.refresh(user)
     return user
@@ -0,0 +1,147 @@
+# app/tasks/derivative_tasks.py
+
+"""
+Génération des miniatures et aperçus des images uploadées.
+
+Le décodage et le redimensionnement (Pillow, CPU) tournent dans un pool de
+processus ; un petit pool de threads attend chaque tâche puis enregistre le
+statut du contenu. Les dérivés sont rangés par empreinte : un contenu
+dédupliqué n'est dérivé qu'une fois.
+"""
+
+import logging
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.document import DocumentBlob, StatutDerives, DERIVE_FORMATS
+
+logger = logging.getLogger(__name__)
+
+# Formats décodés par Pillow pour lesquels une miniature a du sens
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+
+_PIL_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+_lock = Lock()
+_process_pool: Optional[ProcessPoolExecutor] = None
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_pending: Set[Future] = set()
+
+
+def is_image(filename: str) -> bool:
+    return os.path.splitext(filename or "")[1].lower() in IMAGE_EXTENSIONS
+
+
+def derive_dir(upload_dir: str, hash_sha256: str) -> str:
+    """Répertoire des dérivés d'un contenu : <upload_dir>/derives/<aa>/<bb>/<sha256>/"""
+    return os.path.join(upload_dir, "derives", hash_sha256[:2], hash_sha256[2:4], hash_sha256)
+
+
+def derive_path(upload_dir: str, hash_sha256: str, taille: str, fmt: str) -> str:
+    return os.path.join(derive_dir(upload_dir, hash_sha256), f"{taille}.{fmt}")
+
+
+def generate_derivatives(source: str, dest_dir: str, tailles: Dict[str, int], quality: int) -> List[str]:
+    """
+    Exécuté dans un processus du pool : une lecture de l'image source, puis
+    un fichier par taille et par format (écriture temporaire + renommage).
+
+    Returns:
+        Chemins des fichiers écrits
+    """
+    from PIL import Image, ImageOps
+
+    os.makedirs(dest_dir, exist_ok=True)
+    written = []
+    with Image.open(source) as img:
+        # JPEG : décodage directement à résolution réduite
+        img.draft("RGB", (max(tailles.values()),) * 2)
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "PA") else "RGB")
+        # Plus grande taille d'abord : chaque réduction part de la précédente
+        for taille, cote in sorted(tailles.items(), key=lambda item: -item[1]):
+            img.thumbnail((cote, cote), Image.Resampling.LANCZOS)
+            for fmt in DERIVE_FORMATS:
+                frame = img.convert("RGB") if fmt == "jpeg" and img.mode != "RGB" else img
+                path = os.path.join(dest_dir, f"{taille}.{fmt}")
+                tmp = f"{path}.part"
+                frame.save(tmp, _PIL_FORMATS[fmt], quality=quality)
+                os.replace(tmp, path)
+                written.append(path)
+    return written
+
+
+def _pools() -> tuple[ProcessPoolExecutor, ThreadPoolExecutor]:
+    global _process_pool, _thread_pool
+    with _lock:
+        if _process_pool is None:
+            # spawn : un fork depuis un processus multi-thread (serveur, pools, connexions) peut
+            # hériter de verrous tenus par d'autres threads et se bloquer
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.DOCUMENT_DERIVATIVE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+            _thread_pool = ThreadPoolExecutor(
+                max_workers=settings.DOCUMENT_DERIVATIVE_WORKERS, thread_name_prefix="derivatives"
+            )
+        return _process_pool, _thread_pool
+
+
+def _set_statut(blob_id: int, statut: StatutDerives) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(update(DocumentBlob).where(DocumentBlob.id == blob_id).values(derives_statut=statut))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _run(blob_id: int, source: str, dest_dir: str) -> None:
+    process_pool, _ = _pools()
+    tailles = {"thumbnail": settings.DOCUMENT_THUMBNAIL_SIZE, "preview": settings.DOCUMENT_PREVIEW_SIZE}
+    try:
+        process_pool.submit(
+            generate_derivatives, source, dest_dir, tailles, settings.DOCUMENT_DERIVATIVE_QUALITY
+        ).result()
+        statut = StatutDerives.pret
+    except Exception:
+        logger.exception("Échec de génération des dérivés pour le contenu %s", blob_id)
+        shutil.rmtree(dest_dir, ignore_errors=True)
+        statut = StatutDerives.echec
+    _set_statut(blob_id, statut)
+
+
+def enqueue_derivatives(blob_id: int, source: str, dest_dir: str) -> Future:
+    """Planifie la génération des dérivés d'un contenu (statut déjà en_attente)."""
+    _, thread_pool = _pools()
+    future = thread_pool.submit(_run, blob_id, source, dest_dir)
+    with _lock:
+        _pending.add(future)
+    future.add_done_callback(lambda f: _pending.discard(f))
+    return future
+
+
+def wait_for_derivatives(timeout: Optional[float] = None) -> None:
+    """Attend la fin des générations en cours (tests, arrêt propre)."""
+    with _lock:
+        pending = list(_pending)
+    wait(pending, timeout=timeout)
+
+
+def shutdown_derivative_pools() -> None:
+    global _process_pool, _thread_pool
+    with _lock:
+        process_pool, thread_pool = _process_pool, _thread_pool
+        _process_pool = _thread_pool = None
+    if thread_pool is not None:
+        thread_pool.shutdown(wait=True, cancel_futures=True)
+    if process_pool is not None:
+        process_pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,322 @@
+# app/tasks/notification_dispatcher.py
+
+"""
+Envoi par lots des notifications email.
+
+`create_notification` enregistre les notifications email au statut
+en_attente (outbox). Le dispatcher les draine par lots sur une connexion
+SMTP ouverte une fois et réutilisée, avec reprise à backoff exponentiel
+sur les erreurs temporaires ; les résultats d'un lot sont écrits en une
+seule mise à jour groupée.
+"""
+
+import logging
+import smtplib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select, update, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.notification import Notification, CanalNotification, StatutEnvoiNotification
+from app.models.user import User
+from app.services.notification_service import render_notification_emails
+
+logger = logging.getLogger(__name__)
+
+
+def _is_connection_error(exc: BaseException) -> bool:
+    """
+    Erreur de transport (connexion à rouvrir), par opposition à une réponse
+    SMTP du serveur. SMTPException dérive d'OSError : on l'exclut.
+    """
+    if isinstance(exc, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+
+class PooledSMTPConnection:
+    """
+    Connexion SMTP réutilisée d'un envoi à l'autre.
+
+    Ouverte au premier envoi (STARTTLS et authentification selon Settings),
+    vérifiée par NOOP avant réutilisation après une période d'inactivité,
+    rouverte automatiquement si le serveur l'a fermée.
+    """
+
+    def __init__(self, factory: Callable[..., smtplib.SMTP] = smtplib.SMTP, idle_check_s: float = 30.0):
+        self._factory = factory
+        self._idle_check_s = idle_check_s
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = self._factory(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT)
+        try:
+            if settings.SMTP_STARTTLS:
+                server.starttls()
+            if settings.SMTP_USE_CREDENTIALS:
+                server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        self.connections_opened += 1
+        return server
+
+    def _alive(self) -> bool:
+        if self._server is None:
+            return False
+        if time.monotonic() - self._last_used < self._idle_check_s:
+            return True
+        try:
+            return self._server.noop()[0] == 250
+        except OSError:
+            return False
+
+    def send(self, from_addr: str, to_addr: str, message: str) -> None:
+        """Envoie un message ; lève les exceptions smtplib telles quelles."""
+        if not self._alive():
+            self.close()
+            self._server = self._connect()
+        try:
+            self._server.sendmail(from_addr, [to_addr], message)
+        except OSError as exc:
+            if _is_connection_error(exc):
+                self.close()
+            raise
+        self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            self._server.close()
+        self._server = None
+
+
+@dataclass
+class DispatchResult:
+    envoyees: int = 0
+    reportees: int = 0
+    echecs: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.envoyees + self.reportees + self.echecs
+
+
+def _build_message(subject: str, html_content: str, email_to: str) -> str:
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = settings.EMAILS_FROM_EMAIL
+    msg["To"] = email_to
+    msg.attach(MIMEText(html_content, "html"))
+    return msg.as_string()
+
+
+def _is_permanent(exc: Exception) -> bool:
+    """Codes SMTP 5xx (destinataire refusé, message rejeté...) : inutile de réessayer."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code >= 500
+    return False
+
+
+def _retry_delay(tentatives: int) -> timedelta:
+    return timedelta(seconds=settings.NOTIFICATION_RETRY_BASE_SECONDS * 2 ** (tentatives - 1))
+
+
+def dispatch_pending(
+    db: Session,
+    smtp: PooledSMTPConnection,
+    batch_size: Optional[int] = None,
+) -> DispatchResult:
+    """
+    Envoie un lot de notifications email dues et enregistre les résultats.
+
+    Les lignes sont verrouillées (SKIP LOCKED) le temps du lot : plusieurs
+    dispatchers peuvent tourner sans envoyer deux fois la même notification.
+    Une erreur de connexion interrompt le lot ; le reste est reporté. Toute
+    autre erreur n'affecte que la notification concernée.
+    """
+    maintenant = datetime.utcnow()
+    rows = db.execute(
+        select(Notification, User.email)
+        .join(User, User.id == Notification.user_id)
+        .where(
+            Notification.canal == CanalNotification.email,
+            Notification.statut_envoi == StatutEnvoiNotification.en_attente,
+            or_(Notification.prochaine_tentative.is_(None), Notification.prochaine_tentative <= maintenant),
+        )
+        .order_by(Notification.id)
+        .limit(batch_size or settings.NOTIFICATION_BATCH_SIZE)
+        .with_for_update(of=Notification, skip_locked=True)
+    ).all()
+
+    result = DispatchResult()
+    updates: List[Dict[str, Any]] = []
+
+    def reporter(notification: Notification, erreur: str) -> None:
+        tentatives = notification.tentatives + 1
+        if tentatives >= settings.NOTIFICATION_MAX_ATTEMPTS:
+            echouer(notification, erreur, tentatives)
+            return
+        result.reportees += 1
+        updates.append({
+            "id": notification.id,
+            "tentatives": tentatives,
+            "prochaine_tentative": maintenant + _retry_delay(tentatives),
+            "derniere_erreur": erreur[:500],
+        })
+
+    def echouer(notification: Notification, erreur: str, tentatives: int) -> None:
+        result.echecs += 1
+        updates.append({
+            "id": notification.id,
+            "statut_envoi": StatutEnvoiNotification.echec,
+            "tentatives": tentatives,
+            "prochaine_tentative": None,
+            "derniere_erreur": erreur[:500],
+        })
+
+    rendus = render_notification_emails(notification for notification, _ in rows)
+
+    connexion_perdue: Optional[str] = None
+    for notification, email_to in rows:
+        if connexion_perdue:
+            reporter(notification, connexion_perdue)
+            continue
+        if notification.id not in rendus:
+            template = f"notification_{notification.type_notification.value}.html"
+            echouer(notification, f"Template introuvable : {template}", notification.tentatives + 1)
+            continue
+        try:
+            message = _build_message(*rendus[notification.id], email_to)
+            try:
+                smtp.send(settings.EMAILS_FROM_EMAIL, email_to, message)
+            except OSError as exc:
+                if not _is_connection_error(exc):
+                    raise
+                # Connexion fermée côté serveur entre deux envois : une reconnexion
+                smtp.send(settings.EMAILS_FROM_EMAIL, email_to, message)
+        except OSError as exc:
+            if _is_connection_error(exc):
+                connexion_perdue = f"Connexion SMTP : {exc!r}"
+                reporter(notification, connexion_perdue)
+            elif _is_permanent(exc):
+                echouer(notification, repr(exc), notification.tentatives + 1)
+            else:
+                reporter(notification, repr(exc))
+            continue
+        except Exception as exc:
+            # Erreur propre à cette notification (adresse non encodable...) :
+            # le lot continue et les envois déjà faits restent enregistrés
+            reporter(notification, repr(exc))
+            continue
+
+        result.envoyees += 1
+        updates.append({
+            "id": notification.id,
+            "statut_envoi": StatutEnvoiNotification.envoyee,
+            "tentatives": notification.tentatives + 1,
+            "prochaine_tentative": None,
+            "derniere_erreur": None,
+            "date_envoi": datetime.utcnow(),
+        })
+
+    if updates:
+        # Les dictionnaires n'ont pas tous les mêmes clés : regroupement par
+        # forme pour garder des exécutions executemany homogènes
+        par_forme: Dict[tuple, List[Dict[str, Any]]] = {}
+        for item in updates:
+            par_forme.setdefault(tuple(sorted(item)), []).append(item)
+        for lot in par_forme.values():
+            db.execute(update(Notification), lot)
+    db.commit()
+    return result
+
+
+class NotificationDispatcher:
+    """
+    Thread de fond drainant l'outbox : lots successifs tant qu'il reste des
+    notifications dues, puis attente de NOTIFICATION_DISPATCH_INTERVAL ou
+    d'un réveil explicite (`wake`, appelé à chaque création).
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self._session_factory = session_factory
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.smtp = PooledSMTPConnection()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def drain(self) -> DispatchResult:
+        """Envoie toutes les notifications dues, lot par lot."""
+        total = DispatchResult()
+        while not self._stop.is_set():
+            db = self._session_factory()
+            try:
+                result = dispatch_pending(db, self.smtp)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            total.envoyees += result.envoyees
+            total.reportees += result.reportees
+            total.echecs += result.echecs
+            if result.total < settings.NOTIFICATION_BATCH_SIZE:
+                break
+        return total
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                self._wake.clear()
+                try:
+                    result = self.drain()
+                    if result.total:
+                        logger.info(
+                            "Notifications : %d envoyées, %d reportées, %d en échec",
+                            result.envoyees, result.reportees, result.echecs,
+                        )
+                except Exception:
+                    logger.exception("Échec du passage du dispatcher de notifications")
+                self._wake.wait(settings.NOTIFICATION_DISPATCH_INTERVAL)
+        finally:
+            self.smtp.close()
+
+
+dispatcher = NotificationDispatcher()
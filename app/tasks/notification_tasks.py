@@ -10,8 +10,7 @@ from datetime import datetime
 from app.schemas.notification import NotificationCreate
 
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from jinja2 import Environment, FileSystemLoader
-from pathlib import Path
+from app.core import template_registry
 
 conf = ConnectionConfig(
     MAIL_USERNAME=settings.SMTP_USER,
@@ -26,13 +25,9 @@ conf = ConnectionConfig(
     VALIDATE_CERTS=True
 )
 
-templates_path = Path("app/templates")
-env = Environment(loader=FileSystemLoader(templates_path))
-
 def send_email_notification(subject: str, to_email: str, template_name: str, context: dict):
     """Construit et envoie un e-mail avec template HTML"""
-    template = env.get_template(template_name)
-    html_content = template.render(**context)
+    html_content = template_registry.render(template_name, **context)
 
     message = MessageSchema(
         subject=subject,
@@ -0,0 +1,114 @@
+# app/tasks/report_tasks.py
+
+"""
+Exécution des générations de rapports hors des workers HTTP.
+
+Les rapports demandés via l'API sont confiés immédiatement au pool de
+threads du processus ; ceux créés par les planifications (ou restés en
+attente après un redémarrage) sont repris périodiquement par la tâche
+planifiée `report_generation`, qui remet aussi en attente les rapports
+restés en génération au-delà de REPORT_GENERATION_TIMEOUT_SECONDS (worker
+arrêté en cours de route). La réservation faite par generate_report
+garantit une seule génération par rapport.
+"""
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Dict, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.report import Report, ReportStatus
+from app.services.report_service import generate_report
+
+logger = logging.getLogger(__name__)
+
+_lock = Lock()
+_pool: Optional[ThreadPoolExecutor] = None
+_pending: Dict[int, Future] = {}
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=settings.REPORT_WORKERS, thread_name_prefix="reports")
+        return _pool
+
+
+def _forget(report_id: int) -> None:
+    with _lock:
+        _pending.pop(report_id, None)
+
+
+def enqueue_report(report_id: int) -> Future:
+    """Planifie la génération d'un rapport (sans doublon dans ce processus)."""
+    pool = _get_pool()
+    with _lock:
+        future = _pending.get(report_id)
+        if future is not None:
+            return future
+        future = _pending[report_id] = pool.submit(generate_report, report_id)
+    # Hors verrou : le callback s'exécute tout de suite si la tâche est déjà finie
+    future.add_done_callback(lambda f: _forget(report_id))
+    return future
+
+
+def reset_stuck_reports(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Remet en attente les rapports en génération depuis plus de
+    REPORT_GENERATION_TIMEOUT_SECONDS.
+
+    Returns:
+        Nombre de rapports remis en attente
+    """
+    limite = (now or datetime.utcnow()) - timedelta(seconds=settings.REPORT_GENERATION_TIMEOUT_SECONDS)
+    result = db.execute(
+        update(Report)
+        .where(Report.status == ReportStatus.generating, Report.date_generation_start < limite)
+        .values(status=ReportStatus.pending, date_generation_start=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if result.rowcount:
+        logger.warning("%s rapport(s) bloqué(s) en génération remis en attente", result.rowcount)
+    return result.rowcount
+
+
+def process_pending_reports(db: Session, limit: int = 100) -> int:
+    """
+    Tâche planifiée : remet en attente les générations bloquées, puis
+    confie au pool les rapports en attente (les plus anciens d'abord).
+
+    Returns:
+        Nombre de rapports planifiés
+    """
+    reset_stuck_reports(db)
+    ids = db.execute(
+        select(Report.id)
+        .where(Report.status == ReportStatus.pending)
+        .order_by(Report.date_creation)
+        .limit(limit)
+    ).scalars().all()
+    for report_id in ids:
+        enqueue_report(report_id)
+    return len(ids)
+
+
+def wait_for_reports(timeout: Optional[float] = None) -> None:
+    """Attend la fin des générations en cours (tests, arrêt propre)."""
+    with _lock:
+        pending = list(_pending.values())
+    wait(pending, timeout=timeout)
+
+
+def shutdown_report_pool() -> None:
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -1,30 +1,421 @@
 # app/tasks/scheduler.py
 
-from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime
-from app.db.database import SessionLocal
-from app.models.planning import Planning
-from app.models.equipement import Equipement
-from app.services.intervention_service import create_intervention_from_planning
+"""
+Planificateur de tâches distribué.
 
-scheduler = BackgroundScheduler()
+L'état des tâches vit en base (scheduled_jobs) : tous les workers uvicorn
+et toutes les répliques démarrent le planificateur, mais seul le détenteur
+du bail de leader (scheduler_leases) déclenche les tâches. Chaque échéance
+est de plus réservée par une mise à jour de next_run_at avant exécution :
+même pendant une bascule de leader, une échéance ne s'exécute qu'une fois.
+Chaque exécution est tracée (job_runs) avec sa durée et son statut ;
+l'historique est purgé au-delà de SCHEDULER_JOB_RUN_RETENTION_DAYS.
+"""
 
-def run_planning_generation():
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import case, delete, select, update, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.change_tracking import compact_table_versions
+from app.db.dashboard_counters import rebuild_dashboard_counters
+from app.db.database import SessionLocal, dialect_insert, insert_ignoring_conflicts
+from app.db.search_index import rebuild_search_index
+from app.models.scheduler import ScheduledJob, JobRun, SchedulerLease, TypePlanification, StatutExecution
+from app.services.intervention_service import generate_interventions_from_plannings
+from app.core.cron import compile_cron, next_run
+from app.services.report_schedule_service import run_due_report_schedules
+from app.services.report_service import run_report_maintenance
+from app.tasks.report_tasks import process_pending_reports
+
+logger = logging.getLogger(__name__)
+
+LEADER_LEASE = "leader"
+
+
+@dataclass
+class JobDefinition:
+    name: str
+    func: Callable[[Session], Any]
+    interval_seconds: Optional[int] = None
+    cron_expression: Optional[str] = None
+    timezone: str = "UTC"
+
+
+_registry: Dict[str, JobDefinition] = {}
+
+
+def register_job(
+    name: str,
+    func: Callable[[Session], Any],
+    *,
+    interval_seconds: Optional[int] = None,
+    cron: Optional[str] = None,
+    timezone: str = "UTC",
+) -> JobDefinition:
     """
-    Tâche planifiée : génère automatiquement des interventions à partir du planning.
+    Déclare une tâche récurrente (intervalle OU expression cron). La fonction
+    reçoit une session dédiée ; la planification par défaut n'est utilisée
+    qu'à la création de la ligne en base.
+    """
+    if (interval_seconds is None) == (cron is None):
+        raise ValueError("Préciser interval_seconds ou cron (un seul des deux)")
+    if cron is not None:
+        compile_cron(cron)
+    definition = JobDefinition(name, func, interval_seconds, cron, timezone)
+    _registry[name] = definition
+    return definition
+
+
+def get_registered_jobs() -> Dict[str, JobDefinition]:
+    return dict(_registry)
+
+
+def worker_id() -> str:
+    """Identifiant du processus courant (calculé à l'appel : sûr après fork)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def compute_next_job_run(job: ScheduledJob, scheduled_for: Optional[datetime], now: datetime) -> datetime:
+    """
+    Échéance suivante d'une tâche. Les échéances manquées (workers arrêtés)
+    ne sont pas rattrapées une à une : la suivante est dans le futur.
+    """
+    if job.type_planification == TypePlanification.interval:
+        pas = timedelta(seconds=job.interval_seconds)
+        prochaine = (scheduled_for or now) + pas
+        return prochaine if prochaine > now else now + pas
+    return next_run(job.cron_expression, job.timezone, now)
+
+
+# ---------- BAIL DE LEADER ----------
+
+def try_acquire_leadership(db: Session, holder: str, lease_seconds: Optional[int] = None) -> bool:
+    """
+    Prend ou renouvelle le bail de leader. Réussit si le bail est libre,
+    expiré, ou déjà détenu par `holder` (mise à jour conditionnelle atomique).
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=lease_seconds or settings.SCHEDULER_LEASE_SECONDS)
+    result = db.execute(
+        update(SchedulerLease)
+        .where(
+            SchedulerLease.name == LEADER_LEASE,
+            or_(SchedulerLease.holder == holder, SchedulerLease.holder.is_(None), SchedulerLease.expires_at < now),
+        )
+        .values(holder=holder, expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    )
+    acquired = result.rowcount == 1
+    if not acquired:
+        # Première élection : la ligne n'existe pas encore
+        result = db.execute(
+            insert_ignoring_conflicts(db, SchedulerLease.__table__, ["name"]),
+            {"name": LEADER_LEASE, "holder": holder, "expires_at": expires_at},
+        )
+        acquired = result.rowcount == 1
+    db.commit()
+    return acquired
+
+
+def release_leadership(db: Session, holder: str) -> None:
+    """Libère le bail (arrêt propre) : un autre worker reprend sans attendre l'expiration."""
+    db.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == LEADER_LEASE, SchedulerLease.holder == holder)
+        .values(holder=None, expires_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+# ---------- TÂCHES ----------
+
+# Colonnes dont le registre (code) est la source : réalignées à chaque démarrage
+_SCHEDULE_COLUMNS = ("type_planification", "interval_seconds", "cron_expression", "timezone")
+
+
+def sync_jobs(db: Session, now: Optional[datetime] = None) -> None:
+    """
+    Aligne scheduled_jobs sur le registre : crée les tâches inconnues et
+    met à jour la planification des existantes. is_active et les métriques
+    sont conservés ; next_run_at n'est recalculé que si la planification a
+    changé.
+    """
+    now = now or datetime.utcnow()
+    table = ScheduledJob.__table__
+    for definition in _registry.values():
+        if definition.interval_seconds is not None:
+            type_planification, next_run_at = TypePlanification.interval, now
+        else:
+            type_planification = TypePlanification.cron
+            next_run_at = next_run(definition.cron_expression, definition.timezone, now)
+        stmt = dialect_insert(db, table)
+        modifiee = or_(*(table.c[name].is_distinct_from(stmt.excluded[name]) for name in _SCHEDULE_COLUMNS))
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["name"],
+                set_={
+                    **{name: stmt.excluded[name] for name in _SCHEDULE_COLUMNS},
+                    "next_run_at": case((modifiee, stmt.excluded.next_run_at), else_=table.c.next_run_at),
+                },
+            ),
+            {
+                "name": definition.name,
+                "type_planification": type_planification,
+                "interval_seconds": definition.interval_seconds,
+                "cron_expression": definition.cron_expression,
+                "timezone": definition.timezone,
+                "is_active": True,
+                "next_run_at": next_run_at,
+                "run_count": 0,
+                "error_count": 0,
+            },
+        )
+    db.commit()
+
+
+def claim_due_jobs(db: Session, now: Optional[datetime] = None, exclude: Set[str] = frozenset()) -> List[Tuple[str, datetime]]:
+    """
+    Réserve les tâches dues : next_run_at est avancé et validé AVANT
+    l'exécution (au plus une exécution par échéance).
+
+    Returns:
+        Liste (nom, échéance réservée)
     """
-    db = SessionLocal()
+    now = now or datetime.utcnow()
+    query = (
+        select(ScheduledJob)
+        .where(
+            ScheduledJob.is_active.is_(True),
+            ScheduledJob.next_run_at <= now,
+            ScheduledJob.name.in_(list(_registry)),
+        )
+        .with_for_update(skip_locked=True)
+    )
+    if exclude:
+        query = query.where(ScheduledJob.name.notin_(list(exclude)))
+
+    claimed = []
+    for job in db.execute(query).scalars():
+        scheduled_for = job.next_run_at
+        try:
+            job.next_run_at = compute_next_job_run(job, scheduled_for, now)
+        except ValueError as exc:
+            job.is_active = False
+            job.last_error = f"Planification invalide : {exc}"
+            continue
+        claimed.append((job.name, scheduled_for))
+    db.commit()
+    return claimed
+
+
+def run_job(name: str, scheduled_for: Optional[datetime] = None, session_factory: Callable[[], Session] = SessionLocal) -> JobRun:
+    """Exécute une tâche réservée et enregistre ses métriques (job_runs + cumul scheduled_jobs)."""
+    definition = _registry[name]
+    db = session_factory()
     try:
-        now = datetime.utcnow()
-        plannings = db.query(Planning).filter(Planning.prochaine_date <= now).all()
-        for plan in plannings:
-            create_intervention_from_planning(db, plan)
+        run = JobRun(job_name=name, worker_id=worker_id(), scheduled_for=scheduled_for, started_at=datetime.utcnow())
+        db.add(run)
+        db.commit()
+
+        debut = time.perf_counter()
+        erreur = None
+        try:
+            definition.func(db)
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Échec de la tâche planifiée %s", name)
+            erreur = repr(exc)[:2000]
+
+        run.finished_at = datetime.utcnow()
+        run.duration_ms = int((time.perf_counter() - debut) * 1000)
+        run.status = StatutExecution.echec if erreur else StatutExecution.succes
+        run.error = erreur
+        db.execute(
+            update(ScheduledJob)
+            .where(ScheduledJob.name == name)
+            .values(
+                last_run_at=run.started_at,
+                last_status=run.status,
+                last_duration_ms=run.duration_ms,
+                last_error=erreur,
+                run_count=ScheduledJob.run_count + 1,
+                error_count=ScheduledJob.error_count + (1 if erreur else 0),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return run
     finally:
         db.close()
 
-#def start_scheduler():
+
+def purge_job_runs(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Supprime les exécutions démarrées avant la période de rétention (les
+    métriques cumulées restent dans scheduled_jobs).
+
+    Returns:
+        Nombre d'exécutions supprimées
+    """
+    now = now or datetime.utcnow()
+    limite = now - timedelta(days=settings.SCHEDULER_JOB_RUN_RETENTION_DAYS)
+    result = db.execute(
+        delete(JobRun).where(JobRun.started_at < limite).execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+class DistributedScheduler:
+    """
+    Thread de fond démarré dans chaque processus. À chaque tick : prise ou
+    renouvellement du bail ; le leader réserve les tâches dues et les exécute
+    dans un pool (une tâche longue ne bloque pas le renouvellement du bail).
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self._session_factory = session_factory
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._running: Set[str] = set()
+        self._running_lock = threading.Lock()
+        self.is_leader = False
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=settings.SCHEDULER_MAX_WORKERS, thread_name_prefix="job")
+        self._thread = threading.Thread(target=self._run, name="distributed-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self.is_leader:
+            db = self._session_factory()
+            try:
+                release_leadership(db, worker_id())
+            finally:
+                db.close()
+            self.is_leader = False
+
+    def _execute(self, name: str, scheduled_for: datetime) -> None:
+        try:
+            run_job(name, scheduled_for, self._session_factory)
+        finally:
+            with self._running_lock:
+                self._running.discard(name)
+
+    def tick(self) -> List[Tuple[str, datetime]]:
+        """Un passage : bail puis, si leader, réservation et lancement des tâches dues."""
+        db = self._session_factory()
+        try:
+            self.is_leader = try_acquire_leadership(db, worker_id())
+            if not self.is_leader:
+                return []
+            with self._running_lock:
+                running = set(self._running)
+            claimed = claim_due_jobs(db, exclude=running)
+        finally:
+            db.close()
+        for name, scheduled_for in claimed:
+            with self._running_lock:
+                self._running.add(name)
+            self._executor.submit(self._execute, name, scheduled_for)
+        return claimed
+
+    def _run(self) -> None:
+        db = self._session_factory()
+        try:
+            sync_jobs(db)
+        except Exception:
+            logger.exception("Synchronisation des tâches planifiées échouée")
+        finally:
+            db.close()
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Passage du planificateur échoué")
+            self._stop.wait(settings.SCHEDULER_TICK_SECONDS)
+
+
+# ---------- TÂCHES DE L'APPLICATION ----------
+
+def run_planning_generation(db: Session) -> int:
+    """
+    Tâche planifiée : génère automatiquement des interventions à partir du planning.
+    """
+    return generate_interventions_from_plannings(db)
+
+
+def run_blob_gc(db: Session) -> int:
+    from app.services.document_service import collect_orphan_blobs
+
+    return collect_orphan_blobs(db)
+
+
+def run_derivative_requeue(db: Session) -> int:
+    from app.services.document_service import requeue_stale_derivatives
+
+    return requeue_stale_derivatives(db)
+
+
+register_job(
+    "planning_generation",
+    run_planning_generation,
+    interval_seconds=settings.PLANNING_GENERATION_INTERVAL_MINUTES * 60,
+)
+register_job("report_schedules", run_due_report_schedules, interval_seconds=settings.REPORT_SCHEDULE_POLL_SECONDS)
+register_job(
+    "report_generation",
+    process_pending_reports,
+    interval_seconds=settings.REPORT_GENERATION_POLL_SECONDS,
+)
+register_job(
+    "report_maintenance",
+    run_report_maintenance,
+    interval_seconds=settings.REPORT_MAINTENANCE_INTERVAL_SECONDS,
+)
+register_job(
+    "table_versions_compact",
+    compact_table_versions,
+    interval_seconds=settings.TABLE_VERSION_COMPACT_INTERVAL_SECONDS,
+)
+register_job("dashboard_reconcile", rebuild_dashboard_counters, cron=settings.DASHBOARD_RECONCILE_CRON)
+register_job("document_blob_gc", run_blob_gc, interval_seconds=settings.DOCUMENT_BLOB_GC_INTERVAL_SECONDS)
+register_job(
+    "document_derivatives_requeue",
+    run_derivative_requeue,
+    interval_seconds=settings.DOCUMENT_DERIVATIVE_REQUEUE_INTERVAL_SECONDS,
+)
+register_job("search_reindex", rebuild_search_index, cron=settings.SEARCH_REINDEX_CRON)
+register_job("job_runs_purge", purge_job_runs, cron=settings.SCHEDULER_JOB_RUN_PURGE_CRON)
+
+scheduler = DistributedScheduler()
+
+
+def start_scheduler():
     """
-    Lance le scheduler APScheduler avec les tâches récurrentes définies.
+    Lance le planificateur distribué dans ce processus (sans risque de
+    doublon avec les autres workers).
     """
-    scheduler.add_job(run_planning_generation, 'interval', hours=1, id="planning_job")
-    scheduler.start()##
+    scheduler.start()
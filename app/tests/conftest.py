@@ -1,12 +1,14 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
 from app.main import app
-from app.db.database import Base, get_db
+from app.db.database import Base, get_db, get_async_db, SyncSessionAdapter
 from app.core.security import create_access_token
+from app.core.rbac import clear_auth_caches
 from app.models.user import UserRole
 
 # ----------- CONFIG BDD TEST EN MÉMOIRE -----------
@@ -22,6 +24,18 @@ Base.metadata.create_all(bind=engine)
 
 TestingSessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+# ----------- CACHES D'AUTHENTIFICATION -----------
+
+@pytest.fixture(autouse=True)
+def _clear_auth_caches():
+    """
+    Les données de chaque test sont annulées : les principaux et statuts mis
+    en cache ne doivent pas survivre au test qui les a résolus.
+    """
+    clear_auth_caches()
+    yield
+    clear_auth_caches()
+
 # ----------- SESSION DB ISOLÉE PAR TEST -----------
 
 @pytest.fixture(scope="function")
@@ -51,7 +65,58 @@ def client(db_session):
     def override_get_db():
         yield db_session
 
+    async def override_get_async_db():
+        # Les routes async lisent la même session que les routes sync
+        yield SyncSessionAdapter(db_session)
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
+
+# ----------- CLIENT FASTAPI AVEC ASYNCSESSION RÉELLE -----------
+
+@pytest.fixture(scope="function")
+def async_db_url(tmp_path):
+    """Base SQLite fichier propre au test, partagée par l'engine sync et aiosqlite."""
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+    return url
+
+@pytest.fixture(scope="function")
+def async_db_session(async_db_url):
+    """Session synchrone sur la base de async_client (préparation et vérification des données)."""
+    sync_engine = create_engine(async_db_url, connect_args={"check_same_thread": False})
+    session = sessionmaker(bind=sync_engine, autocommit=False, autoflush=False)()
+    yield session
+    session.close()
+    sync_engine.dispose()
+
+@pytest.fixture(scope="function")
+def async_client(async_db_url, async_db_session):
+    """
+    Client FastAPI dont get_async_db fournit une vraie AsyncSession
+    (aiosqlite), réglée comme en production : un chargement paresseux
+    oublié dans une route async y lève MissingGreenlet, ce que
+    SyncSessionAdapter masque. Les routes sync lisent async_db_session.
+    """
+    async_engine = create_async_engine(
+        async_db_url.replace("sqlite://", "sqlite+aiosqlite://", 1), poolclass=NullPool
+    )
+    factory = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+    def override_get_db():
+        yield async_db_session
+
+    async def override_get_async_db():
+        async with factory() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
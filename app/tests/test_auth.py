@@ -130,3 +130,81 @@ def test_me_route(client, create_test_user):
     assert data["role"] == "admin"
     assert data["is_active"] is True
 
+
+# ============ POOL DE HACHAGE / REHASH ============
+
+def test_login_rehash_hash_deprecie(client, monkeypatch):
+    """
+    Un hash bcrypt moins coûteux que BCRYPT_ROUNDS est remplacé au login,
+    sans relire l'utilisateur (expiré par le commit) hors du threadpool.
+    """
+    from passlib.hash import bcrypt
+    from app.core.config import settings
+    from app.core.security import verify_token
+    from app.services import auth_service
+
+    save_rehash = auth_service._save_rehash
+
+    def save_rehash_detache(db, user, new_hash):
+        save_rehash(db, user, new_hash)
+        # Toute lecture ultérieure d'un attribut expiré échouerait
+        db.expunge(user)
+
+    monkeypatch.setattr(auth_service, "_save_rehash", save_rehash_detache)
+
+    db = next(get_db())
+    existing = db.query(User).filter(User.email == "rehash@test.com").first()
+    if existing:
+        db.delete(existing)
+        db.commit()
+    user = User(
+        username="rehash",
+        email="rehash@test.com",
+        hashed_password=bcrypt.using(rounds=4).hash("secret123"),
+        role=UserRole.technicien,
+        is_active=True
+    )
+    db.add(user)
+    db.commit()
+
+    response = client.post("/auth/token", data={"email": "rehash@test.com", "password": "secret123"})
+    assert response.status_code == 200
+    claims = verify_token(response.json()["access_token"])
+    assert claims["sub"] == "rehash@test.com" and claims["user_id"] == user.id
+
+    db.expire_all()
+    stored = db.query(User).filter(User.email == "rehash@test.com").first().hashed_password
+    assert stored.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+
+def test_login_pool_sature(client, create_test_user, monkeypatch):
+    """
+    File de hachage pleine : 503 immédiat avec Retry-After.
+    """
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 0)
+    response = client.post("/auth/token", data={"email": "admin@test.com", "password": "secret123"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(settings.PASSWORD_HASH_RETRY_AFTER)
+
+
+def test_me_route_deleted_user(client, create_test_user):
+    """
+    Un utilisateur supprimé après émission du token n'est plus authentifié (401).
+    """
+    from app.core.rbac import invalidate_user_status
+
+    login_resp = client.post("/auth/token", data={
+        "email": "admin@test.com",
+        "password": "secret123"
+    }, headers={"Content-Type": "application/x-www-form-urlencoded"})
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/auth/me", headers=headers).status_code == 200
+
+    db = next(get_db())
+    db.delete(db.get(User, create_test_user.id))
+    db.commit()
+    invalidate_user_status(create_test_user.id)
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    # Toujours refusé au second appel (statut absent non mis en cache)
+    assert client.get("/auth/me", headers=headers).status_code == 401
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models.client import Client
+from app.models.equipement import Equipement
+from app.models.intervention import Intervention, InterventionType
+from app.models.user import User
+
+
+def _client(db_session, nom):
+    user = User(username=nom, email=f"{nom}@example.com", hashed_password="x", role="client")
+    db_session.add(user)
+    db_session.flush()
+    client = Client(nom_entreprise=nom, nom_contact="Contact", email=f"contact-{nom}@example.com", user_id=user.id)
+    db_session.add(client)
+    db_session.flush()
+    return client
+
+
+def test_cost_aggregates_per_instance_and_in_queries(db_session):
+    now = datetime.utcnow()
+    acme, globex, initech = (_client(db_session, nom) for nom in ("acme", "globex", "initech"))
+    equipement = Equipement(nom="Pompe", type="Pompe", localisation="Usine", client_id=acme.id)
+    db_session.add(equipement)
+    db_session.flush()
+
+    def intervention(client, cout, jours, **extra):
+        return Intervention(titre="Dépannage", type_intervention=InterventionType.corrective, client_id=client.id,
+                            cout_reel=cout, date_creation=now - timedelta(days=jours), **extra)
+
+    db_session.add_all([
+        intervention(acme, 12000, 10, equipement_id=equipement.id, satisfaction_client=4,
+                     date_cloture=now - timedelta(days=10) + timedelta(hours=6)),
+        intervention(acme, 30000, 400, equipement_id=equipement.id, satisfaction_client=5,
+                     date_cloture=now - timedelta(days=400) + timedelta(hours=12)),
+        intervention(globex, 25000, 20),
+        intervention(globex, None, 5),
+    ])
+    db_session.commit()
+
+    assert (acme.cout_maintenance_total, acme.cout_maintenance_annuel) == (420.0, 120.0)
+    assert (acme.taux_satisfaction_moyen, acme.delai_moyen_intervention) == (4.5, 9.0)
+    assert (initech.cout_maintenance_total, initech.taux_satisfaction_moyen) == (0.0, None)
+    assert equipement.cout_maintenance_total == 420.0
+
+    # Mêmes agrégats comme expressions SQL : tri et filtre sans charger les interventions
+    top = db_session.execute(
+        select(Client.nom_entreprise, Client.cout_maintenance_annuel)
+        .order_by(Client.cout_maintenance_annuel.desc(), Client.id)
+        .limit(50)
+    ).all()
+    assert [(nom, float(cout)) for nom, cout in top] == [("globex", 250.0), ("acme", 120.0), ("initech", 0.0)]
+    assert db_session.scalars(
+        select(Client.nom_entreprise).where(Client.delai_moyen_intervention > 8)
+    ).all() == ["acme"]
+
+
+
+def test_activity_statistics_load_only_scalar_columns(db_session):
+    from sqlalchemy import event
+
+    now = datetime.utcnow()
+    acme = _client(db_session, "acme")
+    equipement = Equipement(nom="Pompe", type="Pompe", localisation="Usine", client_id=acme.id,
+                            frequence_entretien_jours=30)
+    db_session.add(equipement)
+    db_session.flush()
+    db_session.add_all([
+        Intervention(titre="Entretien", type_intervention=InterventionType.preventive, client_id=acme.id,
+                     equipement_id=equipement.id, description="x" * 1000, cout_pieces=50,
+                     date_creation=now - timedelta(days=3), date_cloture=now - timedelta(days=3) + timedelta(hours=2)),
+        Intervention(titre="Dépannage", type_intervention=InterventionType.corrective, client_id=acme.id,
+                     description="y" * 1000, cout_main_oeuvre=80, date_creation=now - timedelta(days=1)),
+    ])
+    db_session.commit()
+    db_session.expire_all()
+
+    requetes = []
+
+    def capturer(conn, cursor, statement, parameters, context, executemany):
+        if "FROM interventions" in statement:
+            requetes.append(statement)
+
+    bind = db_session.get_bind()
+    event.listen(bind, "before_cursor_execute", capturer)
+    try:
+        rapport = acme.generer_rapport_activite()
+        sla = acme.calculer_sla_global()
+        prochaine = equipement.prochaine_maintenance_calculee
+    finally:
+        event.remove(bind, "before_cursor_execute", capturer)
+
+    assert (rapport["nb_preventives"], rapport["nb_correctives"], rapport["cout_total"]) == (1, 1, 1.3)
+    assert sla == 100.0
+    assert prochaine.date() == (now - timedelta(days=3) + timedelta(hours=2, days=30)).date()
+    assert requetes and not any("description" in sql or "rapport_intervention" in sql for sql in requetes)
+
+
+def test_hybrid_aggregates_are_floats_on_postgresql():
+    from sqlalchemy.dialects import mysql, postgresql
+    from sqlalchemy.exc import CompileError
+
+    from app.db.sql_functions import heures_entre
+
+    # SUM/AVG/EXTRACT renvoient des numeric sous PostgreSQL (Decimal côté Python)
+    for expression in (Client.cout_maintenance_total, Client.delai_moyen_intervention, Equipement.cout_maintenance_total):
+        sql = str(select(expression).compile(dialect=postgresql.dialect()))
+        assert "AS FLOAT)" in sql
+    duree = heures_entre(Intervention.date_creation, Intervention.date_cloture)
+    assert "DOUBLE PRECISION" in str(select(duree).compile(dialect=postgresql.dialect()))
+    with pytest.raises(CompileError):
+        select(duree).compile(dialect=mysql.dialect())
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.cron import compile_cron, next_run, CronError
+
+
+def test_standard_crontab_semantics():
+    """Jours de semaine crontab (1 = lundi, 0/7 = dimanche), noms, listes, pas, macros"""
+    lundi = datetime(2026, 3, 2, 9, 30)  # lundi
+    assert next_run("0 9 * * 1", "UTC", lundi) == datetime(2026, 3, 9, 9, 0)
+    assert next_run("0 9 * * sun", "UTC", lundi) == datetime(2026, 3, 8, 9, 0)
+    assert next_run("0 9 * * 7", "UTC", lundi) == next_run("0 9 * * 0", "UTC", lundi)
+    assert next_run("*/15 * * * *", "UTC", lundi) == datetime(2026, 3, 2, 9, 45)
+    assert next_run("0 0 1 jan,jul *", "UTC", lundi) == datetime(2026, 7, 1, 0, 0)
+    assert next_run("@monthly", "UTC", lundi) == datetime(2026, 4, 1, 0, 0)
+    # Strictement après : une échéance égale à `after` n'est pas retenue
+    assert next_run("30 9 * * *", "UTC", lundi) == datetime(2026, 3, 3, 9, 30)
+    # Jour du mois ET jour de semaine restreints : l'un OU l'autre
+    assert next_run("0 0 13 * 5", "UTC", lundi) == datetime(2026, 3, 6, 0, 0)
+    # 31 uniquement les mois qui en ont un ; 30 février jamais
+    assert next_run("0 0 31 * *", "UTC", datetime(2026, 4, 1)) == datetime(2026, 5, 31, 0, 0)
+    assert next_run("0 0 30 2 *", "UTC", lundi) is None
+
+
+def test_timezone_and_dst():
+    """Évaluation en heure locale, résultat en UTC naïf ; changements d'heure"""
+    # 9h à Paris : 8h UTC en hiver, 7h UTC en été
+    assert next_run("0 9 * * *", "Europe/Paris", datetime(2026, 3, 2, 12, 0)) == datetime(2026, 3, 3, 8, 0)
+    assert next_run("0 9 * * *", "Europe/Paris", datetime(2026, 6, 1, 12, 0)) == datetime(2026, 6, 2, 7, 0)
+    # 29 mars 2026 : 2h30 n'existe pas à Paris, décalé après le saut (3h30 CEST)
+    assert next_run("30 2 * * *", "Europe/Paris", datetime(2026, 3, 28, 12, 0)) == datetime(2026, 3, 29, 1, 30)
+    # 25 octobre 2026 : 2h30 existe deux fois, une seule exécution
+    premiere = next_run("30 2 * * *", "Europe/Paris", datetime(2026, 10, 24, 12, 0))
+    assert premiere == datetime(2026, 10, 25, 0, 30)
+    assert next_run("30 2 * * *", "Europe/Paris", premiere) == datetime(2026, 10, 26, 1, 30)
+
+
+@pytest.mark.parametrize("expression", ["", "* * * *", "61 * * * *", "* * * 13 *", "*/0 * * * *", "5-1 * * * *", "a b c d e"])
+def test_invalid_expressions(expression):
+    with pytest.raises(CronError):
+        compile_cron(expression)
+
+
+def test_compiled_once_and_invalid_timezone():
+    compile_cron.cache_clear()
+    for _ in range(3):
+        next_run("0 6 * * 1-5", "UTC", datetime(2026, 1, 1))
+    assert compile_cron.cache_info().misses == 1
+    with pytest.raises(ValueError):
+        next_run("0 6 * * *", "Mars/Olympus", datetime(2026, 1, 1))
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.security import create_access_token
+from app.db.dashboard_counters import rebuild_dashboard_counters
+from app.models.dashboard import DashboardCounter
+from app.models.equipement import Equipement, StatutEquipement
+from app.models.intervention import Intervention, InterventionType, StatutIntervention
+from app.models.technicien import Technicien
+from app.models.user import User
+from app.schemas.dashboard import StatutSante
+from app.services.dashboard_service import kpi_admin, kpi_technicien
+from app.services.equipement_health_service import compute_fleet_health, get_fleet_health_page
+
+
+def _counters(db_session):
+    rows = db_session.execute(
+        select(DashboardCounter.scope, DashboardCounter.scope_id, DashboardCounter.metric,
+               DashboardCounter.periode, DashboardCounter.valeur)
+    ).all()
+    return {tuple(row[:4]): row[4] for row in rows if row[4]}
+
+
+@pytest.fixture
+def technicien(db_session):
+    user = User(username="tech-kpi", email="tech-kpi@example.com", hashed_password="x", role="technicien")
+    db_session.add(user)
+    db_session.flush()
+    technicien = Technicien(user_id=user.id)
+    db_session.add(technicien)
+    db_session.commit()
+    return technicien
+
+
+def test_counters_follow_intervention_lifecycle(db_session, technicien):
+    now = datetime.utcnow()
+    retard, semaine, annulee = [
+        Intervention(titre=titre, type_intervention=InterventionType.corrective, date_limite=limite)
+        for titre, limite in [("Fuite", now - timedelta(days=2)), ("Contrôle", now + timedelta(days=3)), ("Doublon", None)]
+    ]
+    db_session.add_all([retard, semaine, annulee])
+    db_session.commit()
+
+    # Attributs expirés après commit : l'ancien statut est rechargé avant affectation
+    retard.technicien_id = technicien.id
+    retard.statut = StatutIntervention.en_cours
+    semaine.technicien_id = technicien.id
+    semaine.statut = StatutIntervention.affectee
+    db_session.commit()
+    kpi = kpi_technicien(db_session, technicien.id, now)
+    assert (kpi.mes_interventions_en_cours, kpi.mes_interventions_ouvertes, kpi.prochaines_interventions) == (1, 1, 1)
+
+    retard.statut = StatutIntervention.cloturee
+    retard.date_cloture = now
+    db_session.delete(annulee)
+    db_session.commit()
+
+    admin = kpi_admin(db_session, now)
+    assert (admin.interventions_ouvertes, admin.interventions_en_cours) == (0, 0)
+    assert (admin.interventions_en_retard, admin.interventions_cloturees_mois) == (0, 1)
+    assert kpi_technicien(db_session, technicien.id, now).ma_charge_travail == 20.0
+
+    # La réconciliation retrouve exactement les compteurs incrémentaux
+    incremental = _counters(db_session)
+    rebuild_dashboard_counters(db_session)
+    assert _counters(db_session) == incremental
+
+
+def test_en_retard_and_kpi_endpoint(client, db_session, technicien):
+    now = datetime.utcnow()
+    db_session.add_all([
+        Intervention(titre=f"Retard {i}", type_intervention=InterventionType.preventive,
+                     date_limite=now - timedelta(hours=2 + i), technicien_id=technicien.id)
+        for i in range(3)
+    ])
+    db_session.commit()
+
+    admin = {"Authorization": f"Bearer {create_access_token(data={'sub': 'admin@test.com', 'role': 'admin'})}"}
+    data = client.get("/api/v1/dashboard/kpi", headers=admin).json()
+    assert data["interventions_ouvertes"] == 3 and data["interventions_en_retard"] == 3
+    assert "nb_equipements_total" in data
+
+    tech = {"Authorization": f"Bearer {create_access_token(data={'sub': 'tech-kpi@example.com', 'role': 'technicien'})}"}
+    data = client.get("/api/v1/dashboard/kpi", headers=tech).json()
+    assert data["technicien_id"] == technicien.id and data["mes_interventions_ouvertes"] == 3
+
+    sans_profil = {"Authorization": f"Bearer {create_access_token(data={'sub': 'tech@test.com', 'role': 'technicien'})}"}
+    assert client.get("/api/v1/dashboard/kpi", headers=sans_profil).status_code == 404
+    assert client.post("/api/v1/dashboard/kpi/rebuild", headers=tech).status_code == 403
+    assert client.post("/api/v1/dashboard/kpi/rebuild", headers=admin).json()["success"] is True
+
+
+def test_fleet_health_scores_and_pagination(client, db_session):
+    now = datetime(2026, 3, 20, 12, 0)
+    sain = Equipement(nom="Compresseur", type="Compresseur", localisation="Atelier A")
+    fragile = Equipement(nom="Presse", type="Presse", localisation="Atelier B")
+    entretien = Equipement(nom="Four", type="Four", localisation="Atelier C", frequence_entretien_jours=30)
+    panne = Equipement(nom="Tour", type="Tour", localisation="Atelier D", statut=StatutEquipement.panne)
+    db_session.add_all([sain, fragile, entretien, panne])
+    db_session.flush()
+    db_session.add_all([
+        # Arrêts qui se chevauchent : du 10 mars à maintenant, comptés une fois
+        Intervention(titre="Fuite", type_intervention=InterventionType.corrective, equipement_id=fragile.id,
+                     statut=StatutIntervention.cloturee, date_creation=datetime(2026, 3, 10),
+                     date_cloture=datetime(2026, 3, 12), cout_reel=5000),
+        Intervention(titre="Fuite bis", type_intervention=InterventionType.corrective, equipement_id=fragile.id,
+                     date_creation=datetime(2026, 3, 11)),
+        Intervention(titre="Révision", type_intervention=InterventionType.preventive, equipement_id=entretien.id,
+                     statut=StatutIntervention.cloturee, date_creation=datetime(2025, 12, 30),
+                     date_cloture=datetime(2026, 1, 1)),
+    ])
+    db_session.commit()
+
+    sante = {h.equipement_id: h for h in compute_fleet_health(db_session, now=now)}
+    h = sante[fragile.id]
+    assert (h.nb_pannes_mois, h.temps_arret_mois, h.cout_maintenance_mois) == (2, 252.0, 50.0)
+    assert h.disponibilite == 46.15 and h.score_fiabilite == 57.1 and h.statut_sante == StatutSante.attention
+    h = sante[entretien.id]
+    assert h.prochaine_maintenance == datetime(2026, 1, 31) and h.jours_depuis_derniere_maintenance == 78
+    assert h.score_fiabilite == 85.0 and h.statut_sante == StatutSante.excellent
+    assert sante[sain.id].score_fiabilite == 100.0 and sante[panne.id].statut_sante == StatutSante.hors_service
+
+    page, cursor = get_fleet_health_page(db_session, limit=2, now=now)
+    assert [h.equipement_id for h in page] == [fragile.id, entretien.id] and cursor
+    page, cursor = get_fleet_health_page(db_session, limit=2, cursor=cursor, now=now)
+    assert [h.equipement_id for h in page] == [sain.id, panne.id] and cursor is None
+
+    admin = {"Authorization": f"Bearer {create_access_token(data={'sub': 'admin@test.com', 'role': 'admin'})}"}
+    response = client.get("/api/v1/dashboard/equipements/sante?limit=1&ordre=desc", headers=admin)
+    assert response.status_code == 200 and response.json()[0]["equipement_id"] == panne.id
+    assert response.headers["X-Next-Cursor"]
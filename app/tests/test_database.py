@@ -0,0 +1,105 @@
+# app/tests/test_database.py
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, make_url, text
+
+from app.main import app
+from app.db.database import InstrumentedQueuePool, _create_async_engine, pool_metrics
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def metrics():
+    pool_metrics.reset()
+    yield pool_metrics
+    pool_metrics.reset()
+
+
+def test_pool_instrumente_compte_checkouts_et_timeouts(tmp_path, metrics):
+    eng = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    with eng.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        # Pool épuisé : le second checkout attend puis échoue
+        with pytest.raises(exc.TimeoutError):
+            eng.connect()
+    snapshot = metrics.snapshot()
+    assert snapshot["checkouts"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["wait_ms_max"] >= 100
+    eng.dispose()
+
+
+def test_health_db():
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "healthy"
+    assert data["pool"]["backend"] == "sqlite"
+    assert "checkouts" in data["pool"]
+
+
+@pytest.mark.asyncio
+async def test_services_async_sur_aiosqlite(tmp_path):
+    """
+    Vérifie les services de lecture async sur un véritable AsyncEngine (aiosqlite).
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from app.db.database import Base
+    from app.models.intervention import Intervention, InterventionType
+    from app.services.intervention_service import (
+        get_intervention_by_id_async, get_interventions_page_async, stream_interventions_async
+    )
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    factory = async_sessionmaker(async_engine, expire_on_commit=False)
+    async with factory() as session:
+        session.add_all([
+            Intervention(titre=f"Async {i}", type_intervention=InterventionType.corrective)
+            for i in range(3)
+        ])
+        await session.commit()
+
+        page, cursor = await get_interventions_page_async(session, limit=2)
+        assert len(page) == 2 and cursor
+        suite, fin = await get_interventions_page_async(session, limit=2, cursor=cursor)
+        assert len(suite) == 1 and fin is None
+
+        detail = await get_intervention_by_id_async(session, page[0].id)
+        assert detail.titre == page[0].titre
+
+        titres = [i.titre async for i in await stream_interventions_async(session)]
+        assert sorted(titres) == ["Async 0", "Async 1", "Async 2"]
+    await async_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_engine_async_selon_url(tmp_path, caplog):
+    # SQLite fichier : vrai AsyncEngine aiosqlite ; mémoire : repli sur la session synchrone
+    async_engine = _create_async_engine(make_url(f"sqlite:///{tmp_path / 'fichier.db'}"))
+    assert async_engine.url.drivername == "sqlite+aiosqlite"
+    async with async_engine.connect() as conn:
+        assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+    await async_engine.dispose()
+    assert _create_async_engine(make_url("sqlite://")) is None
+    assert _create_async_engine(make_url("sqlite:///:memory:")) is None
+
+    # PostgreSQL sans asyncpg : repli signalé en erreur
+    try:
+        import asyncpg  # noqa: F401
+        pytest.skip("asyncpg installé")
+    except ImportError:
+        pass
+    with caplog.at_level("ERROR", logger="app.db.database"):
+        assert _create_async_engine(make_url("postgresql://u:p@localhost/db")) is None
+    assert "asyncpg" in caplog.text
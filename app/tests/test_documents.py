@@ -1,3 +1,5 @@
+import hashlib
+import io
 import os
 import pytest
 from fastapi.testclient import TestClient
@@ -5,7 +7,12 @@ from app.main import app
 from app.db.database import SessionLocal
 from app.models.user import User
 from app.models.intervention import Intervention
+from app.models.document import DocumentBlob
 from app.core.security import get_password_hash
+from app.core.config import settings
+from app.services import document_service
+from app.tasks.derivative_tasks import wait_for_derivatives
+from PIL import Image
 
 client = TestClient(app)
 
@@ -79,6 +86,23 @@ def test_upload_document(user_and_token, intervention):
     data = response.json()
     assert data["filename"] == "test_upload.txt"
     assert data["intervention_id"] == intervention_id
+    assert data["hash_sha256"] == hashlib.sha256(b"Contenu de test").hexdigest()
+    assert data["taille_octets"] == len(b"Contenu de test")
+
+def test_upload_document_too_large(user_and_token, intervention, monkeypatch, tmp_path):
+    """Au-delà de UPLOAD_MAX_BYTES : 413, aucun fichier (même partiel) conservé"""
+    headers, _ = user_and_token
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 1024)
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 256)
+    monkeypatch.setattr(document_service, "UPLOAD_DIR", str(tmp_path))
+
+    response = client.post(
+        f"/api/v1/documents/?intervention_id={intervention.id}",
+        files={"file": ("video.mp4", io.BytesIO(b"x" * 4096), "video/mp4")},
+        headers=headers
+    )
+    assert response.status_code == 413
+    assert os.listdir(tmp_path) == []
 
 def test_get_documents_by_intervention(user_and_token, intervention):
     """Récupération des documents liés à une intervention"""
@@ -115,3 +139,199 @@ def test_get_documents_empty_list(user_and_token, db):
 
     assert response.status_code == 200
     assert response.json() == []
+
+def test_upload_deduplication_and_gc(user_and_token, intervention, db, monkeypatch, tmp_path):
+    """Même contenu : un seul fichier référencé deux fois, supprimé par le GC une fois orphelin"""
+    headers, _ = user_and_token
+    monkeypatch.setattr(document_service, "UPLOAD_DIR", str(tmp_path))
+    contenu = b"Manuel constructeur v2"
+    empreinte = hashlib.sha256(contenu).hexdigest()
+
+    assert client.get(f"/api/v1/documents/blobs/{empreinte}", headers=headers).status_code == 404
+
+    premier = client.post(
+        f"/api/v1/documents/?intervention_id={intervention.id}",
+        files={"file": ("manuel.pdf", io.BytesIO(contenu), "application/pdf")},
+        headers=headers
+    ).json()
+    precheck = client.get(f"/api/v1/documents/blobs/{empreinte}", headers=headers)
+    assert precheck.status_code == 200
+    assert precheck.json()["taille_octets"] == len(contenu)
+
+    second = client.post(
+        "/api/v1/documents/from-hash",
+        json={"intervention_id": intervention.id, "hash_sha256": empreinte, "filename": "manuel-copie.pdf"},
+        headers=headers
+    )
+    assert second.status_code == 201
+    second = second.json()
+    assert second["path"] == premier["path"]
+    assert client.get(f"/api/v1/documents/blobs/{empreinte}", headers=headers).json()["ref_count"] == 2
+    fichiers = [p for p in tmp_path.rglob("*") if p.is_file()]
+    assert [p.name for p in fichiers] == [empreinte]
+
+    for doc in (premier, second):
+        assert client.delete(f"/api/v1/documents/{doc['id']}", headers=headers).status_code == 204
+    blob = db.query(DocumentBlob).filter_by(hash_sha256=empreinte).one()
+    db.refresh(blob)
+    assert blob.ref_count == 0 and blob.date_orphelin is not None
+
+    assert document_service.collect_orphan_blobs(db, grace_seconds=0) == 1
+    assert not fichiers[0].exists()
+    assert client.get(f"/api/v1/documents/blobs/{empreinte}", headers=headers).status_code == 404
+
+def test_attach_from_unknown_hash(user_and_token, intervention):
+    """Association d'une empreinte inconnue : 404, il faut uploader le fichier"""
+    headers, _ = user_and_token
+    response = client.post(
+        "/api/v1/documents/from-hash",
+        json={"intervention_id": intervention.id, "hash_sha256": "0" * 64, "filename": "absent.pdf"},
+        headers=headers
+    )
+    assert response.status_code == 404
+
+def test_download_document_range_and_etag(user_and_token, intervention, monkeypatch, tmp_path, technicien_token):
+    """Téléchargement : contenu complet, plage d'octets, 304 sur ETag, 403 hors périmètre"""
+    headers, _ = user_and_token
+    monkeypatch.setattr(document_service, "UPLOAD_DIR", str(tmp_path))
+    contenu = b"0123456789" * 100
+    doc = client.post(
+        f"/api/v1/documents/?intervention_id={intervention.id}",
+        files={"file": ("video.mp4", io.BytesIO(contenu), "video/mp4")},
+        headers=headers
+    ).json()
+    url = f"/api/v1/documents/{doc['id']}/download"
+
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.content == contenu
+    etag = response.headers["etag"]
+    assert etag == f'"{hashlib.sha256(contenu).hexdigest()}"'
+
+    partiel = client.get(url, headers={**headers, "Range": "bytes=10-19"})
+    assert partiel.status_code == 206
+    assert partiel.content == contenu[10:20]
+    assert partiel.headers["content-range"] == f"bytes 10-19/{len(contenu)}"
+
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    # Technicien non affecté à l'intervention
+    refuse = client.get(url, headers={"Authorization": f"Bearer {technicien_token}"})
+    assert refuse.status_code == 403
+
+    client.delete(f"/api/v1/documents/{doc['id']}", headers=headers)
+
+def test_image_upload_generates_derivatives(user_and_token, intervention, monkeypatch, tmp_path):
+    """Upload d'une image : miniature et aperçu WebP/JPEG générés en tâche de fond"""
+    headers, _ = user_and_token
+    monkeypatch.setattr(document_service, "UPLOAD_DIR", str(tmp_path))
+    image = io.BytesIO()
+    Image.new("RGB", (2000, 1000), (200, 30, 30)).save(image, "PNG")
+
+    doc = client.post(
+        f"/api/v1/documents/?intervention_id={intervention.id}",
+        files={"file": ("photo.png", io.BytesIO(image.getvalue()), "image/png")},
+        headers=headers
+    ).json()
+    wait_for_derivatives(timeout=60)
+
+    listed = client.get(f"/api/v1/documents/{intervention.id}", headers=headers).json()
+    derives = next(d for d in listed if d["id"] == doc["id"])["derives"]
+    assert set(derives) == {"thumbnail", "preview"}
+
+    response = client.get(derives["thumbnail"]["webp"], headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert Image.open(io.BytesIO(response.content)).size == (settings.DOCUMENT_THUMBNAIL_SIZE, settings.DOCUMENT_THUMBNAIL_SIZE // 2)
+    preview = client.get(derives["preview"]["jpeg"], headers=headers)
+    assert Image.open(io.BytesIO(preview.content)).format == "JPEG"
+
+    client.delete(f"/api/v1/documents/{doc['id']}", headers=headers)
+
+def test_upload_routes_with_real_async_session(async_client, async_db_session, admin_token, monkeypatch, tmp_path):
+    """Routes d'upload sur une vraie AsyncSession : le contenu est chargé avant la sérialisation"""
+    from app.models.document import StatutDerives
+
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    monkeypatch.setattr(document_service, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "DOCUMENT_DERIVATIVES_ENABLED", False)
+    intervention = Intervention(titre="Async", type_intervention="corrective")
+    async_db_session.add(intervention)
+    async_db_session.commit()
+
+    for route, nom in (("/api/v1/documents/", "a.pdf"), ("/api/v1/documents/upload", "b.pdf")):
+        response = async_client.post(
+            f"{route}?intervention_id={intervention.id}",
+            files={"file": (nom, io.BytesIO(b"Notice async"), "application/pdf")},
+            headers=headers
+        )
+        assert response.status_code == 201
+        assert response.json()["derives"] is None
+
+    empreinte = hashlib.sha256(b"Notice async").hexdigest()
+    blob = async_db_session.query(DocumentBlob).filter_by(hash_sha256=empreinte).one()
+    blob.derives_statut = StatutDerives.pret
+    async_db_session.commit()
+    response = async_client.post(
+        "/api/v1/documents/from-hash",
+        json={"intervention_id": intervention.id, "hash_sha256": empreinte, "filename": "c.pdf"},
+        headers=headers
+    )
+    assert response.status_code == 201
+    assert set(response.json()["derives"]) == {"thumbnail", "preview"}
+
+@pytest.mark.asyncio
+async def test_upload_commit_failure_removes_new_file(async_db_session, async_db_url, monkeypatch, tmp_path):
+    """Commit en échec (hors violation d'unicité) : ni fichier définitif ni temporaire conservé"""
+    from fastapi import UploadFile
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    upload_dir = tmp_path / "uploads"
+    monkeypatch.setattr(document_service, "UPLOAD_DIR", str(upload_dir))
+    intervention = Intervention(titre="Commit", type_intervention="corrective")
+    async_db_session.add(intervention)
+    async_db_session.commit()
+
+    async def commit_en_echec(self):
+        raise OperationalError("COMMIT", {}, Exception("disk I/O error"))
+
+    monkeypatch.setattr(AsyncSession, "commit", commit_en_echec)
+    async_engine = create_async_engine(async_db_url.replace("sqlite://", "sqlite+aiosqlite://", 1))
+    async with async_sessionmaker(async_engine, expire_on_commit=False)() as session:
+        upload = UploadFile(io.BytesIO(b"Rapport perdu"), filename="perdu.pdf")
+        with pytest.raises(OperationalError):
+            await document_service.create_document(session, upload, intervention.id)
+    await async_engine.dispose()
+
+    assert [p for p in upload_dir.rglob("*") if p.is_file()] == []
+    assert async_db_session.query(DocumentBlob).count() == 0
+
+def test_stale_pending_derivatives_requeued(db_session, monkeypatch, tmp_path):
+    """Contenu resté en attente (tâche perdue) : remis en file par la tâche planifiée, une fois par échéance"""
+    from datetime import datetime, timedelta
+    from app.models.document import StatutDerives
+
+    queued = []
+    monkeypatch.setattr(document_service, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(document_service, "enqueue_derivatives", lambda *args: queued.append(args))
+    now = datetime.utcnow()
+    timeout = timedelta(seconds=settings.DOCUMENT_DERIVATIVE_TIMEOUT_SECONDS)
+    blobs = [
+        DocumentBlob(hash_sha256=f"{i}" * 64, taille_octets=1, chemin=f"uploads/blobs/{i}", ref_count=1,
+                     derives_statut=statut, date_derives=date)
+        for i, (statut, date) in enumerate([
+            (StatutDerives.en_attente, now - timeout - timedelta(minutes=1)),
+            (StatutDerives.en_attente, now),
+            (StatutDerives.pret, now - timeout - timedelta(minutes=1)),
+        ])
+    ]
+    db_session.add_all(blobs)
+    db_session.commit()
+
+    assert document_service.requeue_stale_derivatives(db_session, now) == 1
+    blob_id, source, dest_dir = queued[0]
+    assert blob_id == blobs[0].id
+    assert source == document_service._blob_file_path("0" * 64)
+    assert dest_dir.endswith("0" * 64)
+    assert document_service.requeue_stale_derivatives(db_session, now) == 0
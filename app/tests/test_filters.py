@@ -1,10 +1,13 @@
 import pytest
+from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
 from app.main import app
 from app.db.database import SessionLocal
 from app.models.user import User
-from app.models.intervention import Intervention
+from app.models.intervention import Intervention, InterventionType, PrioriteIntervention, StatutIntervention
 from app.core.security import get_password_hash
+from app.schemas.intervention import TriIntervention
+from app.services.intervention_search_service import planifier
 
 client = TestClient(app)
 
@@ -92,3 +95,89 @@ def test_filter_combined(filter_user_and_token, seed_interventions):
     assert intervention["type"] == "corrective"
     assert intervention["urgence"] is False
     assert intervention["statut"] == "en_attente"
+
+
+# ---------- Recherche multicritère (planificateur, curseur, total estimé) ----------
+
+def test_planner_merges_conditions_and_picks_index():
+    now = datetime(2026, 5, 1)
+    plan = planifier(
+        {"statut": [StatutIntervention.ouverte, StatutIntervention.cloturee], "priorite": [PrioriteIntervention.haute],
+         "date_limite_max": datetime(2026, 6, 1)},
+        en_retard=True, now=now,
+    )
+    assert plan.egalites["statut"] == {StatutIntervention.ouverte}
+    assert plan.plages["date_limite"] == (None, (now, False))
+    assert plan.index == "idx_intervention_statut_priorite"
+    # priorite seule : le composite (statut, priorite) n'est pas utilisable
+    assert planifier({"priorite": [PrioriteIntervention.haute]}).index == "ix_interventions_priorite"
+    assert planifier({}, tri=TriIntervention.date_limite).index == "idx_intervention_limite_id"
+    assert planifier({"statut": [StatutIntervention.cloturee]}, en_retard=True).vide
+    assert planifier({"date_creation_min": now, "date_creation_max": now - timedelta(days=1)}).vide
+
+
+@pytest.fixture
+def api(client):
+    """Client de test sur db_session (annulée après le test)."""
+    return client
+
+
+def test_search_keyset_pages_and_estimate(api, db_session, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    base = datetime(2001, 3, 1)
+    db_session.add_all([
+        Intervention(
+            titre=f"Recherche {i}", type_intervention=InterventionType.corrective,
+            statut=StatutIntervention.cloturee if i == 4 else StatutIntervention.ouverte,
+            date_creation=base + timedelta(hours=i), date_limite=base + timedelta(days=5 - i),
+        )
+        for i in range(5)
+    ])
+    db_session.commit()
+    params = {"date_creation_min": "2001-03-01T00:00:00", "date_creation_max": "2001-03-02T00:00:00",
+              "tri": "date_limite", "limit": 2}
+
+    titres, cursor = [], None
+    while True:
+        response = api.get("/api/v1/filters/interventions", params={**params, "cursor": cursor}, headers=headers)
+        assert response.status_code == 200
+        assert response.headers["X-Total-Estimate"] == "5"
+        titres += [i["titre"] for i in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert titres == [f"Recherche {i}" for i in (4, 3, 2, 1, 0)]
+
+    first = api.get("/api/v1/filters/interventions", params=params, headers=headers)
+    autre_tri = {**params, "tri": "-date_creation", "cursor": first.headers["X-Next-Cursor"]}
+    assert api.get("/api/v1/filters/interventions", params=autre_tri, headers=headers).status_code == 400
+
+    # Retard : actives dont l'échéance est passée (la clôturée est exclue)
+    response = api.get(
+        "/api/v1/filters/interventions",
+        params={"date_creation_max": "2001-03-02T00:00:00", "en_retard": True, "statut": ["ouverte", "cloturee"]},
+        headers=headers,
+    )
+    assert [i["titre"] for i in response.json()] == [f"Recherche {i}" for i in (3, 2, 1, 0)]
+    assert response.headers["X-Total-Estimate"] == "4"
+
+
+def test_search_accepts_timezone_aware_dates(api, db_session, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    base = datetime(2002, 6, 1, 12)
+    db_session.add_all([
+        Intervention(titre=f"Fuseau {i}", type_intervention=InterventionType.corrective,
+                     date_creation=base + timedelta(hours=i), date_limite=base - timedelta(days=1))
+        for i in range(3)
+    ])
+    db_session.commit()
+
+    # 15:00+02:00 = 13:00 UTC : seules les interventions de 12h et 13h UTC
+    response = api.get(
+        "/api/v1/filters/interventions",
+        params={"date_creation_min": "2002-06-01T00:00:00Z", "date_creation_max": "2002-06-01T15:00:00+02:00",
+                "en_retard": True},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert [i["titre"] for i in response.json()] == ["Fuseau 1", "Fuseau 0"]
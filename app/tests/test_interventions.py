@@ -77,3 +77,204 @@ def test_update_intervention_statut(client, technicien_token, responsable_token,
     )
     assert response.status_code == 200
     assert response.json()["statut"] == "en_cours"
+
+def _create_interventions(client, headers, equipement, count):
+    for i in range(count):
+        payload = {
+            "titre": f"Paginée {i}",
+            "description": "Test pagination",
+            "type": "corrective",
+            "statut": "ouverte",
+            "urgence": False,
+            "equipement_id": equipement["id"]
+        }
+        assert client.post("/api/v1/interventions/", json=payload, headers=headers).status_code == 200
+
+def test_list_interventions_keyset_pagination(client, responsable_token, equipement):
+    headers = {"Authorization": f"Bearer {responsable_token}"}
+    _create_interventions(client, headers, equipement, 5)
+    total = len(client.get("/api/v1/interventions/", params={"limit": 500}, headers=headers).json())
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/interventions/", params=params, headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen.extend(item["id"] for item in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == total
+    assert len(set(seen)) == total
+
+def test_list_interventions_invalid_cursor(client, responsable_token):
+    headers = {"Authorization": f"Bearer {responsable_token}"}
+    response = client.get("/api/v1/interventions/", params={"cursor": "pas-un-curseur"}, headers=headers)
+    assert response.status_code == 400
+
+def test_list_interventions_ndjson(client, responsable_token, equipement):
+    import json
+    headers = {"Authorization": f"Bearer {responsable_token}"}
+    _create_interventions(client, headers, equipement, 3)
+    response = client.get("/api/v1/interventions/", params={"format": "ndjson"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    assert len(lines) >= 3
+    assert all("titre" in item for item in lines)
+
+def _technicien(db_session, suffix, **kwargs):
+    from app.core.security import get_password_hash
+    from app.models.user import User, UserRole
+    from app.models.technicien import Technicien
+    user = User(
+        username=f"tech_aff_{suffix}", full_name="Tech Affectation", email=f"tech_aff_{suffix}@example.com",
+        hashed_password=get_password_hash("testpass123"), role=UserRole.technicien, is_active=True,
+    )
+    db_session.add(user)
+    db_session.flush()
+    technicien = Technicien(user_id=user.id, **kwargs)
+    db_session.add(technicien)
+    db_session.commit()
+    return technicien
+
+def test_affectation_automatique(client, db_session, responsable_token, equipement):
+    import uuid
+    from app.models.technicien import (
+        Competence, DisponibiliteTechnicien, NiveauCompetence, technicien_competence
+    )
+    suffix = str(uuid.uuid4())[:6]
+    expert = _technicien(db_session, f"a{suffix}", niveau_technicien=NiveauCompetence.expert)
+    _technicien(db_session, f"b{suffix}", disponibilite=DisponibiliteTechnicien.conge,
+                niveau_technicien=NiveauCompetence.expert)
+    _technicien(db_session, f"c{suffix}")
+    competence = Competence(nom=f"elec_{suffix}", domaine="électrique")
+    db_session.add(competence)
+    db_session.flush()
+    db_session.execute(technicien_competence.insert().values(
+        technicien_id=expert.id, competence_id=competence.id, niveau=NiveauCompetence.expert
+    ))
+    db_session.commit()
+
+    headers = {"Authorization": f"Bearer {responsable_token}"}
+    payload = {
+        "titre": "À affecter", "type": "corrective", "statut": "ouverte",
+        "urgence": True, "equipement_id": equipement["id"]
+    }
+    interv_id = client.post("/api/v1/interventions/", json=payload, headers=headers).json()["id"]
+
+    response = client.post(
+        "/api/v1/interventions/affectations/propositions",
+        json={"intervention_ids": [interv_id], "top_k": 2}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    proposition = response.json()[0]
+    assert proposition["technicien_id"] == expert.id
+    assert len(proposition["candidats"]) <= 2
+
+    response = client.post("/api/v1/interventions/affectations", json={"intervention_ids": [interv_id]}, headers=headers)
+    assert response.status_code == 200, response.text
+    affectee = response.json()[0]
+    assert affectee["technicien_id"] == expert.id
+    assert affectee["statut"] == "affectee"
+
+def test_affectation_bulk_technicien_inconnu(client, responsable_token, equipement):
+    headers = {"Authorization": f"Bearer {responsable_token}"}
+    payload = {"titre": "Bulk", "type": "corrective", "statut": "ouverte", "equipement_id": equipement["id"]}
+    interv_id = client.post("/api/v1/interventions/", json=payload, headers=headers).json()["id"]
+    response = client.post(
+        "/api/v1/interventions/affectations",
+        json={"affectations": [{"intervention_id": interv_id, "technicien_id": 999999}]},
+        headers=headers
+    )
+    assert response.status_code == 404
+
+def test_appliquer_affectations_reloads_batch_once(db_session):
+    from sqlalchemy import event
+    from app.models.intervention import Intervention, InterventionType, StatutIntervention
+    from app.schemas.intervention import AffectationItem
+    from app.services.affectation_service import appliquer_affectations
+
+    technicien = _technicien(db_session, "lot")
+    interventions = [
+        Intervention(titre=f"Lot {i}", type_intervention=InterventionType.corrective) for i in range(3)
+    ]
+    db_session.add_all(interventions)
+    db_session.commit()
+
+    affectations = [AffectationItem(intervention_id=i.id, technicien_id=technicien.id) for i in interventions]
+    user_id = technicien.user_id
+
+    requetes = []
+    ecouter = lambda conn, cursor, statement, *args: requetes.append(statement)
+    event.listen(db_session.get_bind(), "before_cursor_execute", ecouter)
+    try:
+        resultat = appliquer_affectations(db_session, affectations, user_id=user_id)
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", ecouter)
+
+    # Sélection initiale puis un seul rechargement après le commit
+    selections = [r for r in requetes if r.lstrip().startswith("SELECT") and "\nFROM interventions" in r]
+    assert len(selections) == 2
+    assert all(i.__dict__["statut"] == StatutIntervention.affectee for i in resultat)
+
+
+def test_text_columns_loaded_only_by_detail(client, db_session, responsable_token, equipement):
+    from sqlalchemy import event, select
+    from sqlalchemy.exc import InvalidRequestError
+    from app.models.intervention import Intervention, profil_chargement
+
+    headers = {"Authorization": f"Bearer {responsable_token}"}
+    payload = {"titre": "Rapport long", "description": "x" * 5000, "type": "corrective", "equipement_id": equipement["id"]}
+    interv_id = client.post("/api/v1/interventions/", json=payload, headers=headers).json()["id"]
+
+    listed = client.get("/api/v1/interventions/", headers=headers).json()
+    assert listed[0]["id"] == interv_id and "description" not in listed[0]
+    assert client.get(f"/api/v1/interventions/{interv_id}", headers=headers).json()["description"] == "x" * 5000
+
+    db_session.expunge_all()
+    requetes = []
+    event.listen(db_session.bind, "before_cursor_execute", lambda *args: requetes.append(args[2]))
+    ligne = db_session.execute(select(Intervention).options(*profil_chargement("liste"))).scalars().one()
+    with pytest.raises(InvalidRequestError):
+        ligne.description
+    assert "description" not in requetes[0]
+
+    db_session.expunge_all()
+    detail = db_session.execute(
+        select(Intervention).options(*profil_chargement("detail")).where(Intervention.id == interv_id)
+    ).scalar_one()
+    assert len(detail.description) == 5000 and detail.rapport_intervention is None and len(requetes) == 2
+
+
+def test_async_routes_with_real_async_session(async_client, responsable_token):
+    headers = {"Authorization": f"Bearer {responsable_token}"}
+    equipement = async_client.post(
+        "/api/v1/equipements/", json={"nom": "Compresseur", "type": "pneumatique", "localisation": "Atelier B"},
+        headers=headers,
+    ).json()
+    ids = [
+        async_client.post(
+            "/api/v1/interventions/",
+            json={"titre": f"Async {i}", "description": "détail", "type": "corrective", "equipement_id": equipement["id"]},
+            headers=headers,
+        ).json()["id"]
+        for i in range(3)
+    ]
+
+    page = async_client.get("/api/v1/interventions/", params={"limit": 2}, headers=headers)
+    assert page.status_code == 200 and len(page.json()) == 2
+    suite = async_client.get(
+        "/api/v1/interventions/", params={"limit": 2, "cursor": page.headers["X-Next-Cursor"]}, headers=headers
+    )
+    assert sorted(i["id"] for i in page.json() + suite.json()) == ids
+
+    ndjson = async_client.get("/api/v1/interventions/", params={"format": "ndjson"}, headers=headers)
+    assert ndjson.status_code == 200 and len(ndjson.text.splitlines()) == 3
+
+    detail = async_client.get(f"/api/v1/interventions/{ids[0]}", headers=headers)
+    assert detail.status_code == 200 and detail.json()["description"] == "détail"
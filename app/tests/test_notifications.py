@@ -116,3 +116,237 @@ def test_get_user_notifications_empty(notif_user_and_token, db):
     response = client.get(f"/api/v1/notifications/user/{user.id}", headers=headers)
     assert response.status_code == 200
     assert response.json() == []
+
+
+# ---------- ENVOI PAR LOTS (OUTBOX) ----------
+
+import socket
+from datetime import datetime, timedelta
+from aiosmtpd.controller import Controller
+from app.core.config import settings
+from app.models.notification import StatutEnvoiNotification
+from app.tasks.notification_dispatcher import PooledSMTPConnection, dispatch_pending
+
+
+class _SMTPRecorder:
+    """Serveur SMTP local : enregistre les messages et la connexion d'origine."""
+
+    def __init__(self, reponses=None):
+        self.messages = []
+        self.peers = set()
+        self.reponses = list(reponses or [])
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.reponses:
+            return self.reponses.pop(0)
+        self.messages.append(envelope)
+        self.peers.add(session.peer)
+        return "250 Message accepted for delivery"
+
+
+@pytest.fixture()
+def smtp_server(monkeypatch):
+    def _start(reponses=None):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        handler = _SMTPRecorder(reponses)
+        controller = Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        started.append(controller)
+        monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+        monkeypatch.setattr(settings, "SMTP_PORT", port)
+        monkeypatch.setattr(settings, "SMTP_STARTTLS", False)
+        monkeypatch.setattr(settings, "SMTP_USE_CREDENTIALS", False)
+        return handler
+
+    started = []
+    yield _start
+    for controller in started:
+        controller.stop()
+
+
+@pytest.fixture()
+def outbox_user(db_session):
+    user = User(
+        username="outboxuser",
+        email="outbox@example.com",
+        hashed_password="x",
+        role="technicien",
+        is_active=True
+    )
+    intervention = Intervention(titre="Outbox", statut="ouverte", type="corrective", urgence=False)
+    db_session.add_all([user, intervention])
+    db_session.flush()
+    return user, intervention
+
+
+def _pending(db_session, cible, n, type_notification="information"):
+    user, intervention = cible
+    notifs = [
+        Notification(
+            type_notification=type_notification,
+            canal="email",
+            contenu=f"Message {i}",
+            user_id=user.id,
+            intervention_id=intervention.id,
+            statut_envoi=StatutEnvoiNotification.en_attente,
+            tentatives=0,
+        )
+        for i in range(n)
+    ]
+    db_session.add_all(notifs)
+    db_session.commit()
+    return notifs
+
+
+def test_create_notification_email_is_queued(client, auth_headers, outbox_user):
+    """La création n'envoie rien : la notification email attend le dispatcher"""
+    user, intervention = outbox_user
+    response = client.post(
+        "/api/v1/notifications/",
+        json={"type": "rappel", "canal": "email", "contenu": "Rappel", "user_id": user.id, "intervention_id": intervention.id},
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+    assert response.json()["statut_envoi"] == "en_attente"
+    assert response.json()["tentatives"] == 0
+
+
+def test_dispatch_pending_reuses_one_connection(smtp_server, outbox_user, db_session):
+    """Un lot est envoyé sur une seule connexion SMTP et marqué envoyé en bloc"""
+    handler = smtp_server()
+    notifs = _pending(db_session, outbox_user, 5)
+    smtp = PooledSMTPConnection()
+    try:
+        result = dispatch_pending(db_session, smtp, batch_size=10)
+    finally:
+        smtp.close()
+
+    assert result.envoyees == 5
+    assert len(handler.messages) == 5
+    assert len(handler.peers) == 1
+    assert smtp.connections_opened == 1
+    assert all(env.rcpt_tos == ["outbox@example.com"] for env in handler.messages)
+    for notif in notifs:
+        db_session.refresh(notif)
+        assert notif.statut_envoi == StatutEnvoiNotification.envoyee
+        assert notif.tentatives == 1
+
+
+def test_dispatch_pending_retry_then_failure(smtp_server, outbox_user, db_session, monkeypatch):
+    """4xx : reportée avec backoff ; 5xx : échec définitif sans nouvel essai"""
+    smtp_server(reponses=["451 Try again later", "550 Mailbox unavailable"])
+    temporaire, definitive = _pending(db_session, outbox_user, 2)
+    smtp = PooledSMTPConnection()
+    try:
+        result = dispatch_pending(db_session, smtp)
+        # La notification reportée n'est pas due : rien à envoyer
+        assert dispatch_pending(db_session, smtp).total == 0
+    finally:
+        smtp.close()
+
+    assert (result.envoyees, result.reportees, result.echecs) == (0, 1, 1)
+    db_session.refresh(temporaire)
+    db_session.refresh(definitive)
+    assert temporaire.statut_envoi == StatutEnvoiNotification.en_attente
+    assert temporaire.tentatives == 1
+    assert temporaire.prochaine_tentative >= datetime.utcnow() + timedelta(
+        seconds=settings.NOTIFICATION_RETRY_BASE_SECONDS - 5
+    )
+    assert "451" in temporaire.derniere_erreur
+    assert definitive.statut_envoi == StatutEnvoiNotification.echec
+
+
+def test_dispatch_pending_unexpected_error_keeps_batch(smtp_server, outbox_user, db_session):
+    """Erreur inattendue sur un message : reportée seule, les autres restent envoyées"""
+    handler = smtp_server()
+    premiere, fautive, derniere = _pending(db_session, outbox_user, 3)
+    smtp = PooledSMTPConnection()
+    envoyer = smtp.send
+    appels = []
+
+    def send(from_addr, to_addr, message):
+        appels.append(to_addr)
+        if len(appels) == 2:
+            raise UnicodeEncodeError("ascii", "é", 0, 1, "ordinal not in range(128)")
+        return envoyer(from_addr, to_addr, message)
+
+    smtp.send = send
+    try:
+        result = dispatch_pending(db_session, smtp)
+    finally:
+        smtp.close()
+
+    assert (result.envoyees, result.reportees, result.echecs) == (2, 1, 0)
+    assert len(handler.messages) == 2
+    for notif in (premiere, fautive, derniere):
+        db_session.refresh(notif)
+    assert premiere.statut_envoi == derniere.statut_envoi == StatutEnvoiNotification.envoyee
+    assert fautive.statut_envoi == StatutEnvoiNotification.en_attente
+    assert "UnicodeEncodeError" in fautive.derniere_erreur
+
+
+def test_dispatch_pending_server_down(outbox_user, db_session, monkeypatch):
+    """Serveur injoignable : tout le lot est reporté, échec après la dernière tentative"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", port)
+    monkeypatch.setattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 2)
+    notifs = _pending(db_session, outbox_user, 3)
+
+    result = dispatch_pending(db_session, PooledSMTPConnection())
+    assert result.reportees == 3
+
+    for notif in notifs:
+        notif.prochaine_tentative = None
+    db_session.commit()
+    result = dispatch_pending(db_session, PooledSMTPConnection())
+    assert result.echecs == 3
+    for notif in notifs:
+        db_session.refresh(notif)
+        assert notif.statut_envoi == StatutEnvoiNotification.echec
+        assert notif.tentatives == 2
+
+
+# ---------- TEMPLATES ----------
+
+from app.core import template_registry
+
+
+def test_precompile_notification_templates():
+    """Tous les templates de notification sont chargés dans l'environnement partagé"""
+    noms = template_registry.precompile_templates()
+    assert {f"notification_{t}.html" for t in ("affectation", "cloture", "rappel", "retard", "information")} <= set(noms)
+
+
+def test_render_many_autoescape():
+    """Rendu groupé : un rendu par contexte, contenu utilisateur échappé"""
+    rendus = template_registry.render_many(
+        "notification_information.html",
+        [{"type": "information", "contenu": "<script>alert(1)</script>"}, {"type": "information", "contenu": "Bonjour"}],
+    )
+    assert len(rendus) == 2
+    assert "<script>" not in rendus[0]
+    assert "&lt;script&gt;" in rendus[0]
+    assert "Bonjour" in rendus[1]
+
+
+def test_bytecode_cache_directory_must_be_private(tmp_path, monkeypatch):
+    """Répertoire de bytecode créé en 0700 ; un répertoire ouvert aux autres est refusé"""
+    import os
+    import stat
+
+    prive = tmp_path / "jinja"
+    monkeypatch.setattr(settings, "TEMPLATE_BYTECODE_CACHE_DIR", str(prive))
+    assert template_registry._bytecode_cache().directory == str(prive)
+    assert stat.S_IMODE(os.stat(prive).st_mode) == 0o700
+
+    partage = tmp_path / "partage"
+    partage.mkdir()
+    partage.chmod(0o777)
+    monkeypatch.setattr(settings, "TEMPLATE_BYTECODE_CACHE_DIR", str(partage))
+    with pytest.raises(RuntimeError):
+        template_registry._bytecode_cache()
@@ -131,3 +131,53 @@ def test_delete_planning_independent(admin_token_and_equipement):
 
     delete_resp = client.delete(f"/api/v1/planning/{planning_id}", headers=headers)
     assert delete_resp.status_code == 204
+
+# ---------- GÉNÉRATION DES INTERVENTIONS PRÉVENTIVES ----------
+
+from datetime import datetime, timedelta
+from app.models.intervention import Intervention
+from app.models.historique import HistoriqueIntervention
+from app.models.planning import FrequencePlanning, StatutPlanning
+from app.services.intervention_service import generate_interventions_from_plannings
+
+
+def test_generate_interventions_from_plannings(db_session):
+    """Génération par lots : une intervention par planning dû, échéances avancées, rejouable"""
+    now = datetime(2026, 3, 1, 2, 0)
+    equipement = Equipement(nom="Compresseur C3", type="Compresseur", localisation="Zone B", frequence_maintenance="mensuelle")
+    db_session.add(equipement)
+    db_session.flush()
+    dus = [
+        Planning(equipement_id=equipement.id, frequence=FrequencePlanning.hebdomadaire, prochaine_date=now - timedelta(hours=1)),
+        Planning(equipement_id=equipement.id, frequence=FrequencePlanning.journalier, prochaine_date=now - timedelta(days=1)),
+        # Trois mois de retard : une seule intervention de rattrapage
+        Planning(equipement_id=equipement.id, frequence=FrequencePlanning.mensuel, prochaine_date=now - timedelta(days=95)),
+    ]
+    ignores = [
+        Planning(equipement_id=equipement.id, frequence=FrequencePlanning.mensuel, prochaine_date=now + timedelta(days=3)),
+        Planning(equipement_id=equipement.id, frequence=FrequencePlanning.mensuel, prochaine_date=now - timedelta(days=3),
+                 statut=StatutPlanning.suspendu),
+    ]
+    db_session.add_all(dus + ignores)
+    db_session.commit()
+    echeances = {p.id: p.prochaine_date for p in dus}
+
+    assert generate_interventions_from_plannings(db_session, now=now, batch_size=2) == 3
+
+    generees = db_session.query(Intervention).filter(Intervention.equipement_id == equipement.id).all()
+    assert sorted(i.planning_id for i in generees) == sorted(echeances)
+    assert all(i.date_planifiee == echeances[i.planning_id] for i in generees)
+    assert db_session.query(HistoriqueIntervention).filter(
+        HistoriqueIntervention.intervention_id.in_([i.id for i in generees])
+    ).count() == 3
+    for planning in dus:
+        db_session.refresh(planning)
+        assert planning.prochaine_date > now
+
+    # Rejeu : rien de dû
+    assert generate_interventions_from_plannings(db_session, now=now) == 0
+    # Échéance remise en arrière (rejeu après incident) : pas de doublon
+    dus[0].prochaine_date = echeances[dus[0].id]
+    db_session.commit()
+    generate_interventions_from_plannings(db_session, now=now)
+    assert db_session.query(Intervention).filter(Intervention.planning_id == dus[0].id).count() == 1
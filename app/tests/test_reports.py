@@ -0,0 +1,276 @@
+import csv
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from openpyxl import load_workbook
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db import change_tracking
+from app.models.equipement import Equipement
+from app.models.intervention import Intervention, InterventionType, StatutIntervention
+from app.models.report import Report, ReportStatus, ReportType, ReportFormat
+from app.models.table_version import TableVersionIncrement
+from app.models.user import User
+from app.services import report_service
+from app.services.report_service import generate_report, build_report_query
+
+
+@pytest.fixture
+def reports_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_service, "REPORTS_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def sessions(db_session, monkeypatch):
+    """Fabrique de sessions pour generate_report : la session de test, jamais fermée"""
+    monkeypatch.setattr(db_session, "close", lambda: None)
+    return lambda: db_session
+
+
+@pytest.fixture
+def report_user(db_session):
+    user = User(username="rapports", email="rapports@example.com", hashed_password="x", role="responsable")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+@pytest.fixture
+def interventions(db_session):
+    equipement = Equipement(nom="Presse P1", type="Presse", localisation="Atelier")
+    db_session.add(equipement)
+    db_session.flush()
+    now = datetime.utcnow()
+    items = [
+        Intervention(
+            titre=f"Contrôle n°{i}", type_intervention=InterventionType.preventive if i % 2 else InterventionType.corrective,
+            statut=StatutIntervention.ouverte, equipement_id=equipement.id, cout_reel=1250 * i,
+            date_creation=now - timedelta(days=i),
+        )
+        for i in range(1, 8)
+    ]
+    db_session.add_all(items)
+    db_session.commit()
+    return items
+
+
+def _report(db_session, user, fmt, filters=None):
+    report = Report(
+        title="Interventions mars", report_type=ReportType.interventions, report_format=fmt,
+        filters_json=filters, created_by_id=user.id,
+    )
+    db_session.add(report)
+    db_session.commit()
+    return report
+
+
+@pytest.mark.parametrize("fmt", list(ReportFormat))
+def test_generate_report_formats(db_session, sessions, reports_dir, report_user, interventions, monkeypatch, fmt):
+    """Chaque format est écrit en flux (lots de 3 lignes ici) et le rapport finalisé"""
+    monkeypatch.setattr(report_service.settings, "REPORT_YIELD_PER", 3)
+    report = _report(db_session, report_user, fmt)
+
+    assert generate_report(report.id, sessions) == ReportStatus.completed
+    db_session.refresh(report)
+    assert report.status == ReportStatus.completed and report.generation_duration is not None
+    assert report.file_size > 0 and report.date_expiration > report.date_generation_end
+    path = reports_dir / report.file_name
+    assert str(path) == report.file_path and not list(reports_dir.glob("*.part"))
+
+    if fmt == ReportFormat.csv:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.reader(f, delimiter=";"))
+        assert rows[0][:2] == ["ID", "Titre"] and len(rows) == 8
+        assert rows[1][rows[0].index("Coût réel (€)")] == "12.5"
+    elif fmt == ReportFormat.excel:
+        sheet = load_workbook(path, read_only=True).active
+        assert len(list(sheet.iter_rows(values_only=True))) == 8
+    elif fmt == ReportFormat.json:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        assert len(data["data"]) == 7 and data["data"][0]["Équipement"] == "Presse P1"
+    else:
+        assert path.read_bytes().startswith(b"%PDF")
+
+    # Déjà généré : pas de seconde génération
+    assert generate_report(report.id, sessions) is None
+
+
+def test_pdf_report_reads_only_rows_it_draws(db_session, sessions, reports_dir, report_user, interventions, monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_PDF_MAX_ROWS", 3)
+    lus = []
+    iter_rows = report_service.iter_report_rows
+
+    def compter(db, stmt, columns):
+        for rows in iter_rows(db, stmt, columns):
+            lus.extend(rows)
+            yield rows
+
+    monkeypatch.setattr(report_service, "iter_report_rows", compter)
+    report = _report(db_session, report_user, ReportFormat.pdf)
+    assert generate_report(report.id, sessions) == ReportStatus.completed
+    # Plafond + 1 : la ligne en trop signale seulement la troncature
+    assert len(lus) == 4
+
+
+def test_stuck_generating_reports_requeued(db_session, report_user, monkeypatch):
+    from app.tasks import report_tasks
+
+    queued = []
+    monkeypatch.setattr(report_tasks, "enqueue_report", queued.append)
+    stuck, running = _report(db_session, report_user, ReportFormat.csv), _report(db_session, report_user, ReportFormat.csv)
+    for report in (stuck, running):
+        report.start_generation()
+    stuck.date_generation_start -= timedelta(seconds=settings.REPORT_GENERATION_TIMEOUT_SECONDS + 60)
+    db_session.commit()
+
+    assert report_tasks.process_pending_reports(db_session) == 1
+    db_session.refresh(stuck)
+    db_session.refresh(running)
+    assert queued == [stuck.id]
+    assert (stuck.status, running.status) == (ReportStatus.pending, ReportStatus.generating)
+
+
+def test_report_filters_and_failure(db_session, sessions, reports_dir, report_user, interventions):
+    stmt, _ = build_report_query(ReportType.interventions, {"types": ["preventive"], "period": "last_7_days"})
+    # Depuis minuit il y a 7 jours : i = 1, 3, 5, 7
+    assert len(db_session.execute(stmt).all()) == 4
+
+    report = Report(title="Stock", report_type=ReportType.stock, report_format=ReportFormat.csv, created_by_id=report_user.id)
+    db_session.add(report)
+    db_session.commit()
+    assert generate_report(report.id, sessions) == ReportStatus.failed
+    db_session.refresh(report)
+    assert "non pris en charge" in report.error_message
+
+
+def test_report_api_flow(client, db_session, sessions, reports_dir, report_user, interventions, monkeypatch):
+    queued = []
+    monkeypatch.setattr("app.api.v1.reports.enqueue_report", queued.append)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': report_user.email, 'role': 'responsable'})}"}
+
+    response = client.post(
+        "/api/v1/reports/",
+        json={"request": {"type": "interventions", "format": "csv", "filters": {"statuts": ["ouverte"]}}},
+        headers=headers,
+    )
+    assert response.status_code == 202
+    report_id = response.json()["report_id"]
+    assert queued == [report_id]
+    assert client.get(f"/api/v1/reports/{report_id}/download", headers=headers).status_code == 409
+
+    generate_report(report_id, sessions)
+    status_resp = client.get(f"/api/v1/reports/{report_id}", headers=headers)
+    assert status_resp.json()["status"] == "completed"
+    download = client.get(f"/api/v1/reports/{report_id}/download", headers=headers)
+    assert download.status_code == 200 and download.headers["content-type"].startswith("text/csv")
+    assert download.text.count("\n") == 8
+
+    autre = {"Authorization": f"Bearer {create_access_token(data={'sub': 'tech@test.com', 'role': 'technicien'})}"}
+    assert client.get(f"/api/v1/reports/{report_id}", headers=autre).status_code == 404
+
+
+def test_report_cache_reuse_and_invalidation(client, db_session, sessions, reports_dir, report_user, interventions, monkeypatch):
+    queued = []
+    monkeypatch.setattr("app.api.v1.reports.enqueue_report", queued.append)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': report_user.email, 'role': 'responsable'})}"}
+    payload = {"request": {"type": "interventions", "format": "csv", "filters": {"statuts": ["ouverte"], "period": "this_year"}}}
+
+    first = client.post("/api/v1/reports/", json=payload, headers=headers).json()
+    generate_report(first["report_id"], sessions)
+    second = client.post("/api/v1/reports/", json=payload, headers=headers).json()
+    assert second["report_id"] == first["report_id"] and second["message"] == "Rapport identique réutilisé"
+    assert second["download_url"] and queued == [first["report_id"]]
+
+    # Une écriture sur une table source change la version des données
+    interventions[0].cout_reel = 99
+    db_session.commit()
+    third = client.post("/api/v1/reports/", json=payload, headers=headers).json()
+    assert third["report_id"] != first["report_id"] and queued == [first["report_id"], third["report_id"]]
+
+
+def test_reusable_report_ignores_stuck_requests(db_session, report_user):
+    now = datetime.utcnow()
+    timeout = timedelta(seconds=settings.REPORT_GENERATION_TIMEOUT_SECONDS)
+    pending = _report(db_session, report_user, ReportFormat.csv)
+    generating = _report(db_session, report_user, ReportFormat.csv)
+    generating.start_generation()
+    for report in (pending, generating):
+        report.cache_key = "k" * 64
+    pending.date_creation = now - timeout - timedelta(minutes=1)
+    db_session.commit()
+
+    assert report_service.find_reusable_report(db_session, "k" * 64, now) == generating
+    generating.date_generation_start = now - timeout - timedelta(minutes=1)
+    db_session.commit()
+    assert report_service.find_reusable_report(db_session, "k" * 64, now) is None
+    pending.date_creation = now
+    db_session.commit()
+    assert report_service.find_reusable_report(db_session, "k" * 64, now) == pending
+
+
+def test_cache_key_canonical_filters(db_session, interventions):
+    key = report_service.compute_cache_key
+    base = key(db_session, ReportType.interventions, "csv", {"statuts": ["ouverte", "en_cours"]})
+    assert base == key(db_session, ReportType.interventions, "csv", {"statuts": ["en_cours", "ouverte"]})
+    assert base != key(db_session, ReportType.interventions, "excel", {"statuts": ["ouverte", "en_cours"]})
+    assert base != key(db_session, ReportType.interventions, "csv", {"statuts": ["ouverte", "en_cours"]}, title="Parc A")
+    assert base != key(db_session, ReportType.interventions, "csv", {"statuts": ["ouverte", "en_cours"]}, template_id=3)
+    assert report_service.source_tables(ReportType.interventions) <= change_tracking.TRACKED_TABLES
+    assert report_service.source_tables(ReportType.planning) == {"plannings", "equipements"}
+
+
+def test_data_versions_bumped_once_per_commit(db_session, interventions, report_user):
+    versions = lambda: change_tracking.data_versions(db_session, ["interventions", "plannings"])
+    before = versions()
+
+    interventions[0].cout_reel = 1
+    db_session.flush()
+    interventions[1].cout_reel = 2
+    db_session.commit()
+    assert versions() == {"interventions": before["interventions"] + 1, "plannings": before["plannings"]}
+
+    # Commit sans écriture sur une table suivie : versions inchangées
+    _report(db_session, report_user, ReportFormat.csv)
+    assert versions()["interventions"] == before["interventions"] + 1
+
+
+def test_compact_table_versions_keeps_versions(db_session, interventions):
+    versions = lambda: change_tracking.data_versions(db_session, ["interventions", "plannings"])
+    for cout in (1, 2):
+        interventions[0].cout_reel = cout
+        db_session.commit()
+    before = versions()
+    assert before["interventions"] >= 2
+
+    assert change_tracking.compact_table_versions(db_session) >= 2
+    assert db_session.query(TableVersionIncrement).count() == 0
+    assert versions() == before
+
+    # Les incréments suivants s'ajoutent au compteur compacté
+    interventions[0].cout_reel = 3
+    db_session.commit()
+    assert versions()["interventions"] == before["interventions"] + 1
+
+
+def test_enforce_report_storage(db_session, reports_dir, report_user):
+    now = datetime.utcnow()
+    reports = []
+    for i, downloaded in enumerate([now - timedelta(hours=1), now - timedelta(hours=3), None, now]):
+        path = reports_dir / f"r{i}.csv"
+        path.write_bytes(b"x" * 100)
+        report = _report(db_session, report_user, ReportFormat.csv)
+        report.complete_generation(str(path), 100)
+        report.date_generation_end = now - timedelta(hours=2)
+        report.last_downloaded_at = downloaded
+        report.date_expiration = now - timedelta(minutes=1) if i == 3 else now + timedelta(days=1)
+        reports.append(report)
+    db_session.commit()
+
+    # r3 expiré ; puis r1 (3 h) et r2 (généré il y a 2 h, jamais téléchargé) évincés
+    assert report_service.enforce_report_storage(db_session, max_bytes=150) == 3
+    statuses = [r.status for r in reports]
+    assert statuses == [ReportStatus.completed, ReportStatus.expired, ReportStatus.expired, ReportStatus.expired]
+    assert sorted(p.name for p in reports_dir.iterdir()) == ["r0.csv"]
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+
+from app.models.report import Report, ReportSchedule, ReportStatus
+from app.models.scheduler import ScheduledJob, JobRun, SchedulerLease, StatutExecution
+from app.models.user import User
+from app.services.report_schedule_service import run_due_report_schedules, compute_next_run
+from app.tasks import scheduler as job_scheduler
+
+
+# ---------- BAIL DE LEADER ----------
+
+def test_leader_lease_single_holder(db_session):
+    """Deux workers : un seul leader tant que le bail est valide, reprise après expiration"""
+    assert job_scheduler.try_acquire_leadership(db_session, "hote-a:1") is True
+    assert job_scheduler.try_acquire_leadership(db_session, "hote-b:2") is False
+    # Renouvellement par le détenteur
+    assert job_scheduler.try_acquire_leadership(db_session, "hote-a:1") is True
+
+    lease = db_session.get(SchedulerLease, job_scheduler.LEADER_LEASE)
+    lease.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db_session.commit()
+    assert job_scheduler.try_acquire_leadership(db_session, "hote-b:2") is True
+    assert job_scheduler.try_acquire_leadership(db_session, "hote-a:1") is False
+
+    job_scheduler.release_leadership(db_session, "hote-b:2")
+    assert job_scheduler.try_acquire_leadership(db_session, "hote-a:1") is True
+
+
+# ---------- RÉSERVATION ET EXÉCUTION ----------
+
+def test_claimed_job_runs_once(db_session, monkeypatch):
+    """Une échéance réservée n'est plus due ; l'exécution est tracée avec ses métriques"""
+    appels = []
+    monkeypatch.setattr(job_scheduler, "_registry", {})
+    job_scheduler.register_job("test_job", lambda db: appels.append(1), interval_seconds=300)
+    job_scheduler.register_job("test_job_ko", lambda db: 1 / 0, interval_seconds=60)
+    now = datetime(2026, 3, 1, 8, 0)
+    job_scheduler.sync_jobs(db_session, now=now)
+    # Déjà en base : conservée telle quelle
+    job_scheduler.sync_jobs(db_session, now=now + timedelta(hours=1))
+
+    claimed = job_scheduler.claim_due_jobs(db_session, now=now)
+    assert sorted(name for name, _ in claimed) == ["test_job", "test_job_ko"]
+    assert job_scheduler.claim_due_jobs(db_session, now=now) == []
+    job = db_session.query(ScheduledJob).filter_by(name="test_job").one()
+    assert job.next_run_at == now + timedelta(minutes=5)
+
+    session_factory = lambda: db_session
+    monkeypatch.setattr(db_session, "close", lambda: None)
+    for name, scheduled_for in claimed:
+        job_scheduler.run_job(name, scheduled_for, session_factory)
+    assert appels == [1]
+
+    db_session.refresh(job)
+    assert job.run_count == 1 and job.last_status == StatutExecution.succes
+    ko = db_session.query(ScheduledJob).filter_by(name="test_job_ko").one()
+    assert ko.error_count == 1 and "ZeroDivisionError" in ko.last_error
+    run = db_session.query(JobRun).filter_by(job_name="test_job").one()
+    assert run.status == StatutExecution.succes and run.scheduled_for == now
+
+    # Échéances manquées : la suivante est dans le futur, sans rattrapage
+    tard = now + timedelta(hours=2)
+    assert job_scheduler.claim_due_jobs(db_session, now=tard, exclude={"test_job_ko"}) == [("test_job", now + timedelta(minutes=5))]
+    db_session.refresh(job)
+    assert job.next_run_at == tard + timedelta(minutes=5)
+
+
+def test_sync_jobs_applies_schedule_changes(db_session, monkeypatch):
+    """La planification suit le registre ; is_active, compteurs et échéance inchangée sont conservés"""
+    monkeypatch.setattr(job_scheduler, "_registry", {})
+    job_scheduler.register_job("test_job", lambda db: None, interval_seconds=300)
+    job_scheduler.register_job("test_cron", lambda db: None, cron="0 6 * * *")
+    now = datetime(2026, 3, 1, 8, 0)
+    job_scheduler.sync_jobs(db_session, now=now)
+    job = db_session.query(ScheduledJob).filter_by(name="test_job").one()
+    job.is_active, job.run_count, job.next_run_at = False, 7, now + timedelta(minutes=2)
+    cron = db_session.query(ScheduledJob).filter_by(name="test_cron").one()
+    cron.next_run_at = now + timedelta(minutes=30)
+    db_session.commit()
+
+    job_scheduler.register_job("test_job", lambda db: None, cron="15 7 * * *", timezone="Europe/Paris")
+    plus_tard = now + timedelta(hours=1)
+    job_scheduler.sync_jobs(db_session, now=plus_tard)
+    db_session.expire_all()
+    job = db_session.query(ScheduledJob).filter_by(name="test_job").one()
+    assert (job.interval_seconds, job.cron_expression, job.timezone) == (None, "15 7 * * *", "Europe/Paris")
+    assert job.is_active is False and job.run_count == 7
+    assert job.next_run_at == job_scheduler.next_run("15 7 * * *", "Europe/Paris", plus_tard)
+    cron = db_session.query(ScheduledJob).filter_by(name="test_cron").one()
+    assert cron.next_run_at == now + timedelta(minutes=30)
+
+
+def test_purge_job_runs_keeps_retention_window(db_session):
+    now = datetime(2026, 3, 1, 8, 0)
+    retention = timedelta(days=job_scheduler.settings.SCHEDULER_JOB_RUN_RETENTION_DAYS)
+    for age in (retention + timedelta(hours=1), retention - timedelta(hours=1), timedelta(0)):
+        db_session.add(JobRun(job_name="test_job", worker_id="hote-a:1", started_at=now - age))
+    db_session.commit()
+
+    assert job_scheduler.purge_job_runs(db_session, now=now) == 1
+    restants = sorted(run.started_at for run in db_session.query(JobRun).filter_by(job_name="test_job"))
+    assert restants == [now - retention + timedelta(hours=1), now]
+    assert "job_runs_purge" in job_scheduler.get_registered_jobs()
+
+
+# ---------- RAPPORTS PLANIFIÉS ----------
+
+def test_run_due_report_schedules(db_session):
+    """Une planification due crée un rapport en attente et avance next_run_at"""
+    user = User(username="sched", email="sched@example.com", hashed_password="x", role="admin")
+    db_session.add(user)
+    db_session.flush()
+    now = datetime(2026, 3, 2, 9, 30)
+    due = ReportSchedule(
+        name="Hebdo", report_type="interventions", report_format="csv",
+        cron_expression="0 9 * * 1", timezone="Europe/Paris", email_recipients=[],
+        next_run_at=now - timedelta(minutes=5), created_by_id=user.id,
+    )
+    nouvelle = ReportSchedule(
+        name="Nouvelle", report_type="interventions", report_format="csv",
+        cron_expression="0 6 * * *", email_recipients=[], created_by_id=user.id,
+    )
+    invalide = ReportSchedule(
+        name="Invalide", report_type="interventions", report_format="csv",
+        cron_expression="pas un cron", email_recipients=[], created_by_id=user.id,
+    )
+    db_session.add_all([due, nouvelle, invalide])
+    db_session.commit()
+
+    assert run_due_report_schedules(db_session, now=now) == 1
+    report = db_session.query(Report).filter(Report.created_by_id == user.id).one()
+    assert report.status == ReportStatus.pending
+    # Lundi 9h à Paris (UTC+1 en mars) : semaine suivante, 8h UTC
+    assert due.next_run_at == datetime(2026, 3, 9, 8, 0)
+    assert due.run_count == 1
+    assert nouvelle.next_run_at == compute_next_run("0 6 * * *", "UTC", now)
+    assert invalide.is_active is False and invalide.last_error_message
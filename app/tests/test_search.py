@@ -0,0 +1,127 @@
+import pytest
+from sqlalchemy import event, select
+
+from app.db.search_index import rebuild_search_index
+from app.models.document import Document
+from app.models.equipement import Equipement
+from app.models.intervention import Intervention, InterventionType, StatutIntervention, profil_chargement
+from app.models.search_entry import SearchEntry
+from app.schemas.search import SourceRecherche
+from app.services.search_service import requete_fts5, search
+
+
+@pytest.fixture
+def parc(db_session):
+    equipement = Equipement(nom="Compresseur d'air C-12", type_equipement="compresseur", localisation="Atelier nord")
+    db_session.add(equipement)
+    db_session.flush()
+    fuite = Intervention(
+        titre="Fuite d'huile compresseur", type_intervention=InterventionType.corrective, equipement_id=equipement.id,
+        description="Fuites d'huile importantes au niveau du carter",
+    )
+    rapport = Intervention(
+        titre="Contrôle annuel", type_intervention=InterventionType.preventive, equipement_id=equipement.id,
+        rapport_intervention="Compresseur vérifié, légère fuite d'huile résorbée",
+    )
+    autre = Intervention(titre="Remplacement filtre", type_intervention=InterventionType.preventive)
+    db_session.add_all([fuite, rapport, autre])
+    db_session.flush()
+    db_session.add(Document(nom_fichier="photo_fuite_compresseur.jpg", chemin="uploads/x.jpg", intervention_id=fuite.id))
+    db_session.commit()
+    return equipement, fuite, rapport, autre
+
+
+def _titres(db_session, texte, **kwargs):
+    return [r.titre for r in search(db_session, texte, **kwargs)[0]]
+
+
+def test_index_follows_orm_writes(db_session, parc):
+    _, fuite, _, autre = parc
+    # Tous les mots requis ("fuite" trouve "Fuites"), correspondance dans le titre d'abord
+    assert _titres(db_session, "compresseur fuite huile") == [
+        "Fuite d'huile compresseur", "Contrôle annuel",
+    ]
+    assert set(_titres(db_session, "compresseur", sources=[SourceRecherche.equipement, SourceRecherche.document])) == {
+        "Compresseur d'air C-12", "photo_fuite_compresseur.jpg",
+    }
+
+    # Modification d'un champ indexé sur une intervention chargée en profil "liste"
+    fuite_id, autre_id = fuite.id, autre.id
+    db_session.expunge_all()
+    chargee = db_session.execute(
+        select(Intervention).options(*profil_chargement("liste")).where(Intervention.id == autre_id)
+    ).scalar_one()
+    chargee.titre = "Remplacement filtre compresseur"
+    chargee.statut = StatutIntervention.en_cours
+    db_session.commit()
+    assert "Remplacement filtre compresseur" in _titres(db_session, "compresseur")
+    assert _titres(db_session, "filtre") == ["Remplacement filtre compresseur"]
+
+    # Suppression : l'intervention et ses documents quittent l'index
+    db_session.delete(db_session.get(Intervention, fuite_id))
+    db_session.commit()
+    assert _titres(db_session, "carter") == []
+    assert _titres(db_session, "photo") == []
+
+
+def test_cascade_delete_removes_children_by_key(db_session, parc):
+    equipement, fuite, rapport, autre = parc
+    requetes = []
+    ecouter = lambda conn, cursor, statement, *args: requetes.append(statement)
+    event.listen(db_session.get_bind(), "before_cursor_execute", ecouter)
+    try:
+        db_session.delete(equipement)
+        db_session.commit()
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", ecouter)
+
+    restantes = db_session.execute(select(SearchEntry.source, SearchEntry.source_id)).all()
+    assert restantes == [("intervention", autre.id)]
+    # Entrées des enfants retirées par clé, sans parcourir tout l'index
+    assert not [r for r in requetes if "search_entries" in r and "EXISTS" in r]
+
+
+def test_rebuild_and_fts5_query(db_session, parc):
+    assert requete_fts5("compresseur, fuite d'huile") == '"compresseur"* "fuite"* "d"* "huile"*'
+    assert requete_fts5("  -- ") is None
+    db_session.execute(SearchEntry.__table__.delete())
+    assert _titres(db_session, "filtre") == []
+    assert rebuild_search_index(db_session) == 5
+    assert _titres(db_session, "filtre") == ["Remplacement filtre"]
+
+
+def test_search_endpoint_pagination_and_roles(client, parc, admin_token, client_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    titres, cursor = [], None
+    while True:
+        response = client.get("/api/v1/search/", params={"q": "compresseur", "limit": 2, "cursor": cursor}, headers=headers)
+        assert response.status_code == 200
+        titres += [r["titre"] for r in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(titres) == len(set(titres)) == 4
+    assert titres[-1] == "Contrôle annuel"  # mot présent seulement dans le rapport
+
+    response = client.get("/api/v1/search/", params={"q": "huile", "type": "intervention"}, headers=headers)
+    assert [r["type"] for r in response.json()] == ["intervention", "intervention"]
+    assert client.get(
+        "/api/v1/search/", params={"q": "huile"}, headers={"Authorization": f"Bearer {client_token}"}
+    ).status_code == 403
+
+
+def test_pagination_through_tied_scores(db_session):
+    # Titres identiques : même score, seul l'id départage les résultats
+    db_session.add_all([
+        Intervention(titre="Vidange pompe", type_intervention=InterventionType.preventive) for _ in range(5)
+    ])
+    db_session.commit()
+    ids, cursor = [], None
+    while True:
+        results, cursor = search(db_session, "vidange", limit=2, cursor=cursor)
+        ids += [r.id for r in results]
+        if cursor is None:
+            break
+    assert len(set(r.score for r in search(db_session, "vidange")[0])) == 1
+    assert len(ids) == len(set(ids)) == 5
+    assert ids == sorted(ids, reverse=True)
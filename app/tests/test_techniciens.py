@@ -7,6 +7,8 @@ from sqlalchemy.orm import Session
 from app.core.security import get_password_hash, create_access_token
 from app.models.user import User, UserRole
 from app.models.technicien import Technicien, Competence
+from app.models.intervention import Intervention, InterventionType
+from sqlalchemy import select
 
 def create_user_with_role(db: Session, role: UserRole, suffix: str = "") -> User:
     user = User(
@@ -95,3 +97,87 @@ def test_technicien_create_forbidden(client: TestClient, db_session: Session, te
     }
     response = client.post("/techniciens/", json=payload, headers=headers)
     assert response.status_code == 403
+
+def test_stats_batch_identiques_aux_proprietes(db_session: Session):
+    """
+    Vérifie que les KPI calculés en lot égalent ceux des propriétés unitaires.
+    """
+    from datetime import datetime, timedelta
+    from app.models.intervention import Intervention, InterventionType, StatutIntervention
+    from app.services.technicien_stats_service import attach_technicien_stats, compute_technicien_stats
+
+    suffix = str(uuid.uuid4())[:6]
+    user = create_user_with_role(db_session, UserRole.technicien, suffix)
+    technicien = Technicien(user_id=user.id)
+    db_session.add(technicien)
+    db_session.commit()
+
+    maintenant = datetime.utcnow()
+    db_session.add_all([
+        # Clôturée puis rappel sur le même équipement sous 7 jours : échec
+        Intervention(titre="A", type_intervention=InterventionType.corrective, statut=StatutIntervention.cloturee,
+                     technicien_id=technicien.id, date_creation=maintenant - timedelta(days=20),
+                     date_cloture=maintenant - timedelta(days=10), duree_reelle=90, satisfaction_client=5),
+        Intervention(titre="B", type_intervention=InterventionType.corrective, statut=StatutIntervention.en_cours,
+                     technicien_id=technicien.id, date_creation=maintenant - timedelta(days=8), urgence=True),
+        Intervention(titre="C", type_intervention=InterventionType.corrective, statut=StatutIntervention.cloturee,
+                     technicien_id=technicien.id, date_creation=maintenant - timedelta(days=3),
+                     date_cloture=maintenant - timedelta(days=1), duree_reelle=30, satisfaction_client=4),
+    ])
+    db_session.commit()
+
+    attendu = {
+        "nb_interventions_total": technicien.nb_interventions_total,
+        "nb_interventions_actives": technicien.nb_interventions_actives,
+        "nb_interventions_terminees": technicien.nb_interventions_terminees,
+        "taux_reussite": technicien.taux_reussite,
+        "temps_moyen_intervention": technicien.temps_moyen_intervention,
+        "satisfaction_moyenne": technicien.satisfaction_moyenne,
+        "score_affectation": technicien.score_affectation,
+        "rapport": technicien.generer_rapport_performance(6),
+    }
+    assert attendu["taux_reussite"] == 50.0
+
+    stats = compute_technicien_stats(db_session, [technicien.id])[technicien.id]
+    assert stats.taux_reussite == attendu["taux_reussite"]
+
+    attach_technicien_stats(db_session, [technicien])
+    assert technicien.nb_interventions_total == attendu["nb_interventions_total"]
+    assert technicien.nb_interventions_actives == attendu["nb_interventions_actives"]
+    assert technicien.nb_interventions_terminees == attendu["nb_interventions_terminees"]
+    assert technicien.temps_moyen_intervention == attendu["temps_moyen_intervention"]
+    assert technicien.satisfaction_moyenne == attendu["satisfaction_moyenne"]
+    assert technicien.score_affectation == attendu["score_affectation"]
+    assert technicien.generer_rapport_performance(6) == attendu["rapport"]
+
+def test_list_techniciens_stats(client: TestClient, db_session: Session, responsable_token):
+    suffix = str(uuid.uuid4())[:6]
+    user = create_user_with_role(db_session, UserRole.technicien, suffix)
+    technicien = Technicien(user_id=user.id)
+    db_session.add(technicien)
+    db_session.commit()
+
+    headers = {"Authorization": f"Bearer {responsable_token}"}
+    response = client.get("/techniciens/stats", headers=headers)
+    assert response.status_code == 200, response.text
+    stats = {s["technicien_id"]: s for s in response.json()}
+    assert stats[technicien.id]["nb_interventions_total"] == 0
+    assert stats[technicien.id]["taux_reussite"] is None
+
+
+def test_technicien_temps_moyen_expression(db_session):
+    user = create_user_with_role(db_session, UserRole.technicien, "moyenne")
+    technicien = Technicien(user_id=user.id)
+    db_session.add(technicien)
+    db_session.flush()
+    db_session.add_all([
+        Intervention(titre=f"I{d}", type_intervention=InterventionType.preventive, technicien_id=technicien.id,
+                     duree_reelle=d)
+        for d in (60, 120, None)
+    ])
+    db_session.commit()
+
+    assert technicien.temps_moyen_intervention == 1.5
+    assert db_session.scalar(
+        select(Technicien.id).where(Technicien.temps_moyen_intervention >= 1.5)
+    ) == technicien.id
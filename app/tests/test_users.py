@@ -1,7 +1,6 @@
 import pytest
 import uuid
 from fastapi.testclient import TestClient
-from app.db.database import get_db
 from app.models.user import User, UserRole
 from app.core.security import get_password_hash
 
@@ -28,11 +27,11 @@ def test_create_user_success(client: TestClient, admin_token):
     assert result["full_name"] == data["full_name"]
     assert result["is_active"] is True
 
-def test_create_user_duplicate_email(client: TestClient, admin_token):
+def test_create_user_duplicate_email(client: TestClient, db_session, admin_token):
     """
     ❌ Erreur si email déjà utilisé
     """
-    db = next(get_db())
+    db = db_session  # même session que le client (plus de session de repli côté service)
     unique = str(uuid.uuid4())[:8]
     email = f"duplicate_{unique}@example.com"
     username = f"userdup_{unique}"
@@ -60,11 +59,11 @@ def test_create_user_duplicate_email(client: TestClient, admin_token):
     assert response.status_code in (400, 409)
     assert "Email déjà utilisé" in response.text
 
-def test_get_user_by_id(client: TestClient, admin_token):
+def test_get_user_by_id(client: TestClient, db_session, admin_token):
     """
     ✅ Lecture utilisateur par ID
     """
-    db = next(get_db())
+    db = db_session  # même session que le client (plus de session de repli côté service)
     unique = str(uuid.uuid4())[:8]
     user = User(
         username=f"lookup_{unique}",
@@ -100,3 +99,65 @@ def test_user_access_forbidden_for_non_admin(client: TestClient, technicien_toke
     headers = {"Authorization": f"Bearer {technicien_token}"}
     response = client.get("/users/", headers=headers)
     assert response.status_code == 403
+
+def test_get_current_user_cache_et_invalidation(db_session):
+    """
+    ✅ Le second appel est servi par les caches (aucune requête SQL) ;
+    ❌ la désactivation est prise en compte immédiatement
+    """
+    from fastapi import HTTPException
+    from sqlalchemy import event
+    from app.core.rbac import get_current_user
+    from app.core.security import create_access_token
+    from app.services.user_service import deactivate_user
+
+    unique = str(uuid.uuid4())[:8]
+    user = User(
+        username=f"cache_{unique}", email=f"cache_{unique}@example.com",
+        hashed_password=get_password_hash("x"), role=UserRole.technicien, is_active=True
+    )
+    db_session.add(user)
+    db_session.commit()
+    token = create_access_token(data={"sub": user.email, "role": "technicien"})
+
+    assert get_current_user(token, db_session)["user_id"] == user.id
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    bind = db_session.connection()
+    event.listen(bind, "before_cursor_execute", listener)
+    try:
+        assert get_current_user(token, db_session)["user_id"] == user.id
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+    assert statements == []
+
+    deactivate_user(db_session, user.id)
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_user(token, db_session)
+    assert exc_info.value.status_code == 403
+
+def test_user_service_une_requete_par_recherche(db_session):
+    """
+    ✅ Recherche absente et contrôle d'unicité : une seule requête, une seule session
+    """
+    from fastapi import HTTPException
+    from sqlalchemy import event
+    from app.services.user_service import get_user_by_id, get_user_by_email, _find_identity_conflicts
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    bind = db_session.connection()
+    event.listen(bind, "before_cursor_execute", listener)
+    try:
+        with pytest.raises(HTTPException):
+            get_user_by_id(db_session, 987654)
+        assert len(statements) == 1
+
+        assert get_user_by_email(db_session, "absent_bench@example.com") is None
+        assert len(statements) == 2
+
+        assert _find_identity_conflicts(db_session, "libre@example.com", "libre") == (False, False)
+        assert len(statements) == 3
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
@@ -0,0 +1,101 @@
+# benchmarks/bench_intervention_loading.py
+"""
+Volume lu et temps de décodage des listes d'interventions.
+
+Compare le chargement complet (textes longs compris, comportement avant
+le groupe différé "texte") au profil "liste" de profil_chargement, sur une
+base SQLite en mémoire peuplée d'interventions avec rapports rédigés.
+
+Usage:
+    python benchmarks/bench_intervention_loading.py [--rows N] [--repetitions R]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import sessionmaker, undefer_group  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.db.database import Base  # noqa: E402
+from app.models.intervention import (  # noqa: E402
+    Intervention, InterventionType, StatutIntervention, PrioriteIntervention, TEXT_GROUP, profil_chargement,
+)
+
+# Taille typique des textes saisis (caractères)
+TAILLES = {"description": 800, "rapport_intervention": 4000, "travaux_realises": 1500, "recommandations": 600}
+
+
+def peupler(factory, rows):
+    now = datetime.utcnow()
+    with factory() as db:
+        for debut in range(0, rows, 5000):
+            db.execute(insert(Intervention), [
+                {
+                    "titre": f"Intervention {i}",
+                    "type_intervention": InterventionType.corrective,
+                    "statut": StatutIntervention.cloturee,
+                    "priorite": PrioriteIntervention.normale,
+                    "urgence": False,
+                    "validation_client": True,
+                    "date_creation": now - timedelta(minutes=i),
+                    "created_at": now,
+                    "updated_at": now,
+                    **{nom: f"{nom} {i} " + "lorem ipsum " * (taille // 12) for nom, taille in TAILLES.items()},
+                }
+                for i in range(debut, min(debut + 5000, rows))
+            ])
+        db.commit()
+
+
+def octets_lus(factory, stmt):
+    """Somme des tailles des valeurs renvoyées par le driver (hors ORM)."""
+    total = 0
+    with factory() as db:
+        for row in db.connection().execute(stmt):
+            total += sum(len(v) if isinstance(v, (str, bytes)) else 8 for v in row if v is not None)
+    return total
+
+
+def temps_chargement(factory, stmt, repetitions):
+    """Meilleur temps de chargement ORM complet (requête + décodage + instances)."""
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        with factory() as db:
+            debut = time.perf_counter()
+            db.execute(stmt).scalars().all()
+            meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repetitions", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    peupler(factory, args.rows)
+
+    scenarios = [
+        ("avant", select(Intervention).options(undefer_group(TEXT_GROUP))),
+        ("après", select(Intervention).options(*profil_chargement("liste"))),
+    ]
+    print(f"{args.rows} interventions")
+    print(f"{'impl.':<10}{'Mo lus':>10}{'ms':>10}{'µs/ligne':>11}")
+    for impl, stmt in scenarios:
+        mo = octets_lus(factory, stmt) / 1024 / 1024
+        secondes = temps_chargement(factory, stmt, args.repetitions)
+        print(f"{impl:<10}{mo:>10.1f}{secondes * 1e3:>10.0f}{secondes / args.rows * 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/bench_user_service.py
+"""
+Requêtes SQL et checkouts de connexion par appel des recherches utilisateur.
+
+Compare les chemins actuels de user_service à l'ancienne implémentation
+(seconde session de repli sur échec de recherche, vérifications email et
+username séparées), sur une base SQLite en mémoire.
+
+Usage:
+    python benchmarks/bench_user_service.py [--iterations N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.db.database import Base  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services import user_service  # noqa: E402
+
+
+class Compteur:
+    def __init__(self, engine):
+        self.requetes = 0
+        self.checkouts = 0
+        event.listen(engine, "before_cursor_execute", self._requete)
+        event.listen(engine.pool, "checkout", self._checkout)
+
+    def _requete(self, *args):
+        self.requetes += 1
+
+    def _checkout(self, *args):
+        self.checkouts += 1
+
+    def reset(self):
+        self.requetes = self.checkouts = 0
+
+
+# ---------- Ancienne implémentation (référence) ----------
+
+def legacy_get_user_by_id(db, fallback_factory, user_id):
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        with fallback_factory() as alt_db:
+            user = alt_db.query(User).filter(User.id == user_id).first()
+    return user
+
+
+def legacy_get_user_by_email(db, fallback_factory, email):
+    user = db.query(User).filter(User.email == email).first()
+    if user:
+        return user
+    with fallback_factory() as alt_db:
+        return alt_db.query(User).filter(User.email == email).first()
+
+
+def legacy_unicite(db, fallback_factory, email, username):
+    def existe(champ, valeur):
+        with fallback_factory() as alt_db:
+            return alt_db.query(User).filter(champ == valeur).first() is not None
+    email_pris = db.query(User).filter(User.email == email).first() or existe(User.email, email)
+    username_pris = db.query(User).filter(User.username == username).first() or existe(User.username, username)
+    return bool(email_pris), bool(username_pris)
+
+
+def nouveau_get_user_by_id(db, user_id):
+    try:
+        return user_service.get_user_by_id(db, user_id)
+    except Exception:
+        return None
+
+
+def mesurer(compteur, factory, fn, iterations):
+    compteur.reset()
+    debut = time.perf_counter()
+    for _ in range(iterations):
+        # Nouvelle session par appel, comme une requête HTTP
+        with factory() as db:
+            fn(db)
+    duree = time.perf_counter() - debut
+    return compteur.requetes / iterations, compteur.checkouts / iterations, duree / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    # QueuePool par défaut impossible en mémoire : StaticPool compte tout de même les checkouts
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    with factory() as db:
+        db.add(User(username="existant", email="existant@example.com", hashed_password="x",
+                    role=UserRole.client, is_active=True))
+        db.commit()
+    compteur = Compteur(engine)
+
+    scenarios = [
+        ("get_user_by_id (absent)",
+         lambda db: legacy_get_user_by_id(db, factory, 999999),
+         lambda db: nouveau_get_user_by_id(db, 999999)),
+        ("get_user_by_email (absent)",
+         lambda db: legacy_get_user_by_email(db, factory, "absent@example.com"),
+         lambda db: user_service.get_user_by_email(db, "absent@example.com")),
+        ("unicité création (libre)",
+         lambda db: legacy_unicite(db, factory, "nouveau@example.com", "nouveau"),
+         lambda db: user_service._find_identity_conflicts(db, "nouveau@example.com", "nouveau")),
+    ]
+
+    print(f"{'scénario':<30}{'impl.':<10}{'requêtes':>10}{'checkouts':>11}{'µs/appel':>11}")
+    for nom, legacy, nouveau in scenarios:
+        for impl, fn in (("avant", legacy), ("après", nouveau)):
+            requetes, checkouts, us = mesurer(compteur, factory, fn, args.iterations)
+            print(f"{nom:<30}{impl:<10}{requetes:>10.1f}{checkouts:>11.1f}{us:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()